@@ -0,0 +1,218 @@
+"""
+Kalıcı yanıt önbelleği (SQLite) - maç durumuna göre TTL
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import config
+
+# Süresiz saklanacak kayıtlar için TTL
+FOREVER = float('inf')
+
+LIVE_STATUSES = {'1H', 'HT', '2H', 'ET', 'BT', 'P', 'LIVE', 'INT', 'SUSP'}
+SCHEDULED_STATUSES = {'NS', 'TBD', 'PST'}
+FINISHED_STATUSES = {'FT', 'AET', 'PEN', 'AWD', 'WO'}
+
+
+def cache_key(url, params=None):
+    """URL ve parametrelerden deterministik anahtar"""
+    if not params:
+        return url
+    query = '&'.join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{url}?{query}"
+
+
+class ResponseCache:
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or config.CACHE_DB_PATH
+        self.max_bytes = max_bytes or config.CACHE_MAX_BYTES
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                body BLOB,
+                size INTEGER,
+                created REAL,
+                expires REAL,
+                last_access REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access);
+            CREATE TABLE IF NOT EXISTS fixture_status (
+                fixture_id INTEGER PRIMARY KEY,
+                status TEXT,
+                kickoff INTEGER
+            );
+        """)
+        self._conn.commit()
+
+    def get(self, key, allow_stale=False):
+        """Geçerli kaydı döndür; yoksa veya süresi dolmuşsa None
+
+        allow_stale=True ise (ör. kota bittiğinde) süresi dolmuş kayıt da
+        döndürülür.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, expires FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, expires = row
+            if expires is not None and expires <= now and not allow_stale:
+                return None
+            self._conn.execute(
+                'UPDATE responses SET last_access = ? WHERE key = ?', (now, key)
+            )
+            self._conn.commit()
+        return json.loads(zlib.decompress(body))
+
+    def set(self, key, payload, ttl, endpoint=None):
+        """Yanıtı kaydet; ttl=FOREVER ise süresiz saklanır"""
+        if ttl is not None and ttl <= 0:
+            return
+
+        now = time.time()
+        body = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        expires = None if ttl == FOREVER else now + ttl
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, body, len(body), now, expires, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def update_fixture_status(self, fixtures):
+        """(fixture_id, status, kickoff) kayıtlarını güncelle"""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO fixture_status VALUES (?, ?, ?)', fixtures
+            )
+            self._conn.commit()
+
+    def fixture_statuses(self, fixture_ids):
+        """Bilinen maç durumları: fixture_id -> status"""
+        fixture_ids = list(fixture_ids)
+        if not fixture_ids:
+            return {}
+        placeholders = ','.join('?' * len(fixture_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT fixture_id, status FROM fixture_status WHERE fixture_id IN ({placeholders})',
+                fixture_ids
+            ).fetchall()
+        return dict(rows)
+
+    def size(self):
+        """Önbellekteki toplam (sıkıştırılmış) bayt"""
+        with self._lock:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        return total
+
+    def clear(self):
+        """Tüm yanıtları sil"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Boyut sınırı aşılırsa önce süresi dolanları, sonra LRU kayıtları sil
+
+        Süresi dolan kayıtlar sınır aşılana kadar tutulur; kota bittiğinde
+        eski veri olarak sunulabilirler.
+        """
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        self._conn.execute(
+            'DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?', (now,)
+        )
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            'SELECT key, size FROM responses ORDER BY last_access'
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+
+def response_ttl(endpoint, params, payload, cache=None):
+    """Yanıt içeriğine göre TTL (saniye) belirle
+
+    Canlı maç içeren yanıtlar kısa, başlamamış maçlar ilk başlama saatine
+    kadar, bitmiş maçlar ve onların istatistik/oranları süresiz saklanır.
+    Günlük toplu oran sayfaları CACHE_TTL_ODDS_DATE kadar tutulur.
+    """
+    items = payload.get('response') or []
+    if params and 'live' in params:
+        return config.CACHE_TTL_LIVE
+    if endpoint == 'odds' and params and 'date' in params:
+        # Günlük sayfalar onlarca istek tutar; her st.cache_data kaçırmasında
+        # yeniden çekilmesinler
+        return config.CACHE_TTL_ODDS_DATE
+
+    if endpoint == 'fixtures':
+        statuses = [item['fixture']['status']['short'] for item in items]
+        kickoffs = [
+            item['fixture'].get('timestamp') for item in items
+            if item['fixture']['status']['short'] in SCHEDULED_STATUSES
+        ]
+    else:
+        # İstatistik/oran yanıtları maç durumunu taşımaz; bilinen durumlara bak
+        fixture_id = (params or {}).get('fixture')
+        if fixture_id is None or cache is None:
+            return config.CACHE_TTL
+        statuses = list(cache.fixture_statuses([int(fixture_id)]).values())
+        kickoffs = []
+
+    if not statuses:
+        return config.CACHE_TTL
+    if any(status in LIVE_STATUSES for status in statuses):
+        return config.CACHE_TTL_LIVE
+    if all(status in FINISHED_STATUSES for status in statuses):
+        return FOREVER
+
+    ttl = config.CACHE_TTL_SCHEDULED
+    kickoffs = [kickoff for kickoff in kickoffs if kickoff]
+    if kickoffs:
+        until_kickoff = min(kickoffs) - time.time()
+        ttl = min(ttl, max(config.CACHE_TTL_LIVE, until_kickoff))
+    return ttl
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Süreç genelinde paylaşılan ResponseCache örneği"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
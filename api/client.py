@@ -0,0 +1,241 @@
+"""
+Paylaşılan HTTP istemcisi - bağlantı havuzu, tekrar deneme ve metrikler
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+import config
+from api.cache import cache_key, get_cache, response_ttl
+from api.scheduler import PRIORITY_UPCOMING, QuotaExceededError, get_scheduler
+from api.streaming import read_payload
+
+# Tekrar denenecek durum kodları
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class APIClient:
+    def __init__(self):
+        self.headers = {
+            'x-rapidapi-key': config.API_FOOTBALL_KEY,
+            'x-rapidapi-host': 'v3.football.api-sports.io'
+        }
+        self.max_retries = config.HTTP_MAX_RETRIES
+        self.backoff_base = config.HTTP_BACKOFF_BASE
+        self.backoff_max = config.HTTP_BACKOFF_MAX
+        self.timeouts = config.API_TIMEOUTS
+        self.scheduler = get_scheduler()
+        self.recorder = None
+        if config.API_RECORD_DIR:
+            from api.mock_server import ResponseRecorder
+            self.recorder = ResponseRecorder(config.API_RECORD_DIR)
+
+        # Kalıcı bağlantı havuzu (keep-alive)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=config.HTTP_POOL_SIZE,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._adapter = adapter
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'retries': 0,
+            'errors': 0,
+            'total_latency': 0.0,
+            'max_latency': 0.0,
+            'cache_hits': 0,
+            'cache_misses': 0
+        }
+
+    def get(self, url, params=None, endpoint=None, priority=PRIORITY_UPCOMING, stream=False,
+            max_wait=None):
+        """GET isteği gönder; 429/5xx için jitter'lı üstel geri çekilme uygula
+
+        Her deneme zamanlayıcıdan token alır. Başarılı (veya tekrar
+        denenemeyen) yanıtı döndürür, tüm denemeler bağlantı hatasıyla
+        biterse son hatayı yükseltir. stream=True ise gövde okunmadan döner.
+        max_wait: token için bekleme sınırı (varsayılan SCHEDULER_MAX_WAIT).
+        """
+        timeout = self.timeout_for(endpoint)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self._sleep_backoff(attempt, last_response=last_error)
+
+            self.scheduler.acquire(priority, max_wait)
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, stream=stream)
+            except requests.RequestException as e:
+                self._record(time.perf_counter() - started, error=True, retry=attempt > 0)
+                last_error = e
+                continue
+
+            self._record(time.perf_counter() - started, retry=attempt > 0)
+            self.scheduler.update_from_headers(response.headers)
+            # Akışlı yanıtlar get_json'da okunurken kaydedilir
+            if self.recorder is not None and response.status_code == 200 and not stream:
+                self.recorder.record(url, params, response)
+            if response.status_code == 429:
+                self.scheduler.throttle()
+
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+
+            # Okunmamış gövdeyi bırak ki bağlantı havuza dönsün
+            response.close()
+            last_error = response
+
+        if isinstance(last_error, requests.Response):
+            print(f"HTTP {last_error.status_code}: {url} ({self.max_retries} tekrar sonrası)")
+            return last_error
+        raise last_error
+
+    def get_json(self, url, params=None, endpoint=None, ttl=None, priority=PRIORITY_UPCOMING,
+                 project=None, max_wait=None):
+        """Önbellek üzerinden JSON yanıtı getir
+
+        Önce kalıcı önbelleğe bakar; yoksa isteği gönderir ve yanıtı maç
+        durumuna göre belirlenen TTL ile saklar. Başarısız yanıtta None.
+        Kota bittiğinde varsa süresi dolmuş kaydı döndürür.
+
+        project verilirse gövde akış halinde okunur ve her 'response'
+        öğesi yalnızca gereken alanlara daraltılır; önbelleğe de daraltılmış
+        yük yazılır.
+        """
+        cache = get_cache()
+        key = cache_key(url, params)
+
+        payload = cache.get(key)
+        with self._lock:
+            self._stats['cache_hits' if payload is not None else 'cache_misses'] += 1
+        if payload is not None:
+            return payload
+
+        try:
+            response = self.get(url, params=params, endpoint=endpoint, priority=priority,
+                                stream=project is not None, max_wait=max_wait)
+        except QuotaExceededError as e:
+            stale = cache.get(key, allow_stale=True)
+            if stale is None:
+                raise
+            print(f"Kota uyarısı: {e} - önbellekteki eski veri kullanılıyor")
+            return stale
+
+        if response.status_code != 200:
+            response.close()
+            return None
+
+        body = [] if self.recorder is not None else None
+        try:
+            payload = read_payload(response, project, tee=None if body is None else body.append)
+        finally:
+            response.close()
+        if body is not None:
+            self.recorder.record(url, params, response, b''.join(body))
+        if payload.get('errors'):
+            print(f"API Error: {payload['errors']}")
+            return None
+
+        if endpoint == 'fixtures':
+            cache.update_fixture_status([
+                (item['fixture']['id'], item['fixture']['status']['short'],
+                 item['fixture'].get('timestamp'))
+                for item in payload.get('response', [])
+            ])
+
+        if ttl is None:
+            ttl = response_ttl(endpoint, params, payload, cache)
+        cache.set(key, payload, ttl, endpoint=endpoint)
+        return payload
+
+    def timeout_for(self, endpoint):
+        """Endpoint'e özel zaman aşımı"""
+        return self.timeouts.get(endpoint, self.timeouts['default'])
+
+    def stats(self):
+        """Gecikme, bağlantı yeniden kullanım ve kota sayaçları"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        connections = 0
+        pooled_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools[key]
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+
+        stats['connections_opened'] = connections
+        stats['connections_reused'] = max(0, pooled_requests - connections)
+        stats['avg_latency'] = (
+            stats['total_latency'] / stats['requests'] if stats['requests'] else 0.0
+        )
+        stats['quota'] = self.scheduler.metrics()
+        return stats
+
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+    def _record(self, latency, error=False, retry=False):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['total_latency'] += latency
+            self._stats['max_latency'] = max(self._stats['max_latency'], latency)
+            if error:
+                self._stats['errors'] += 1
+            if retry:
+                self._stats['retries'] += 1
+
+    def _sleep_backoff(self, attempt, last_response=None):
+        """Full-jitter üstel bekleme; Retry-After başlığı varsa ona uy"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        delay = random.uniform(0, delay)
+
+        if isinstance(last_response, requests.Response):
+            retry_after = last_response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = min(self.backoff_max, max(delay, float(retry_after)))
+
+        time.sleep(delay)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Süreç genelinde paylaşılan APIClient örneği"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = APIClient()
+    return _client
+
+
+def fan_out(func, items, max_workers=None):
+    """func'ı her öğe için sınırlı eşzamanlılıkla çalıştır, sırayı koru"""
+    items = list(items)
+    if not items:
+        return []
+
+    max_workers = min(max_workers or config.FETCH_MAX_WORKERS, len(items))
+    if max_workers <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
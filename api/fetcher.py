@@ -0,0 +1,60 @@
+"""
+Eşzamanlı veri çekme motoru - canlı/yaklaşan maçlar ve oranlar
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import config
+from api.client import fan_out
+from api.matches import MatchAPI, merge_match_frames
+from api.odds import OddsAPI
+from api.scheduler import PRIORITY_PREFETCH, get_scheduler
+
+
+class FetchEngine:
+    def __init__(self, match_api=None, odds_api=None, max_workers=None):
+        self.match_api = match_api or MatchAPI()
+        self.odds_api = odds_api or OddsAPI()
+        self.max_workers = max_workers or config.FETCH_MAX_WORKERS
+
+    def fetch_matches(self):
+        """Canlı ve yaklaşan maçları aynı anda çek, birleştir"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            live_future = executor.submit(self.match_api.get_live_matches)
+            upcoming_future = executor.submit(self.match_api.get_upcoming_matches)
+            live_matches = live_future.result()
+            upcoming_matches = upcoming_future.result()
+
+        all_matches = merge_match_frames([live_matches, upcoming_matches])
+        all_matches = all_matches.drop_duplicates('fixture_id', keep='first')
+        return all_matches.reset_index(drop=True)
+
+    def fetch_odds(self, fixture_ids, dates=(), leagues=None):
+        """Maçların oranlarını çek
+
+        Verilen günler için önce sayfalı toplu oran yüklemesi yapılır
+        (leagues verilirse yalnızca o ligler); tabloda olmayan maçlar tek
+        tek, sınırlı eşzamanlılıkla çekilir. Bütün ön yükleme istekleri
+        token beklemez (max_wait=0): kota yetmeyen sayfa/maç atlanır ve
+        PREFETCH_MIN_TOKENS kullanıcı istekleri için ayrılır. Demo orana
+        düşen maçlar sonuçta yer almaz. fixture_id -> oran sözlüğü döndürür.
+        """
+        fixture_ids = list(dict.fromkeys(fixture_ids))
+        for date in dict.fromkeys(dates):
+            self.odds_api.get_odds_by_date(date, leagues, max_wait=0)
+
+        odds = self.odds_api.lookup_odds(fixture_ids)
+        missing = [fixture_id for fixture_id in fixture_ids if fixture_id not in odds]
+        budget = get_scheduler().metrics()['minute_remaining'] - config.PREFETCH_MIN_TOKENS
+        missing = missing[:max(0, budget)]
+        # Ön yükleme, seçili maçın oran isteğinin önüne geçmesin
+        fetched = fan_out(
+            lambda fixture_id: self.odds_api.get_match_odds(fixture_id, priority=PRIORITY_PREFETCH,
+                                                            max_wait=0),
+            missing,
+            self.max_workers
+        )
+        odds.update(zip(missing, fetched))
+        return {
+            fixture_id: odds[fixture_id] for fixture_id in fixture_ids
+            if fixture_id in odds and not odds[fixture_id].get('is_demo')
+        }
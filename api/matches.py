@@ -2,19 +2,33 @@
 Maç verilerini çekmek için API modülü
 """
 
-import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import config
+from api.cache import FINISHED_STATUSES, LIVE_STATUSES
+from api.client import fan_out, get_client
+from api.scheduler import PRIORITY_LIVE, PRIORITY_STATISTICS, PRIORITY_UPCOMING
+
+MATCH_COLUMNS = [
+    'fixture_id', 'date', 'status', 'elapsed', 'league_id', 'season',
+    'league', 'country', 'home_team_id', 'away_team_id',
+    'home_team', 'away_team', 'home_score', 'away_score',
+    'halftime_home', 'halftime_away'
+]
+
+STATISTICS_COLUMNS = ['fixture_id', 'team_id', 'team', 'stat', 'value']
+# İstatistiği olabilecek (başlamış) maç durumları
+STATISTICS_STATUSES = LIVE_STATUSES | FINISHED_STATUSES
 
 class MatchAPI:
     def __init__(self):
         self.api_key = config.API_FOOTBALL_KEY
         self.base_url = config.API_FOOTBALL_BASE
-        self.headers = {
-            'x-rapidapi-key': self.api_key,
-            'x-rapidapi-host': 'v3.football.api-sports.io'
-        }
+        self.client = get_client()
+        # Canlı takip modu: fixture_id -> son görülen durum imzası
+        self._live_signatures = {}
+        self._live_snapshot = self._parse_matches([])
     
     def get_live_matches(self):
         """Canlı maçları getir"""
@@ -22,10 +36,11 @@ class MatchAPI:
             endpoint = f"{self.base_url}/fixtures"
             params = {'live': 'all'}
             
-            response = requests.get(endpoint, headers=self.headers, params=params, timeout=10)
+            data = self.client.get_json(endpoint, params=params, endpoint='fixtures',
+                                         priority=PRIORITY_LIVE,
+                                         project=_project_fixture)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 return self._parse_matches(data.get('response', []))
             else:
                 return self._get_demo_matches()
@@ -33,23 +48,120 @@ class MatchAPI:
             print(f"API Error: {e}")
             return self._get_demo_matches()
     
+    def poll_live_changes(self):
+        """Canlı maçları çek, yalnızca değişenleri parse edip döndür
+
+        Önceki anlık görüntüyle fixture_id üzerinden karşılaştırır. Dönen
+        sözlük: 'new', 'updated', 'finished' (fixture_id listeleri),
+        'changes' (yeni + güncellenen maç satırları) ve 'finished_matches'
+        (canlı listeden düşen maçların son bilinen satırları).
+        """
+        delta = {
+            'new': [], 'updated': [], 'finished': [],
+            'changes': self._live_snapshot.iloc[0:0],
+            'finished_matches': self._live_snapshot.iloc[0:0]
+        }
+        try:
+            endpoint = f"{self.base_url}/fixtures"
+            data = self.client.get_json(endpoint, params={'live': 'all'}, endpoint='fixtures',
+                                         priority=PRIORITY_LIVE,
+                                         project=_project_fixture)
+        except Exception as e:
+            print(f"API Error: {e}")
+            return delta
+        if data is None:
+            return delta
+
+        signatures = {}
+        changed_items = []
+        for item in data.get('response', []):
+            fixture_id = item['fixture']['id']
+            signature = _live_signature(item)
+            signatures[fixture_id] = signature
+
+            previous = self._live_signatures.get(fixture_id)
+            if previous is None:
+                delta['new'].append(fixture_id)
+                changed_items.append(item)
+            elif previous != signature:
+                delta['updated'].append(fixture_id)
+                changed_items.append(item)
+
+        delta['finished'] = [
+            fixture_id for fixture_id in self._live_signatures if fixture_id not in signatures
+        ]
+        self._live_signatures = signatures
+
+        if not changed_items and not delta['finished']:
+            return delta
+
+        changes = self._parse_matches(changed_items)
+        snapshot = self._live_snapshot
+        dropped = snapshot['fixture_id'].isin(delta['finished'] + delta['updated'])
+        delta['changes'] = changes
+        delta['finished_matches'] = snapshot[snapshot['fixture_id'].isin(delta['finished'])]
+        self._live_snapshot = merge_match_frames([snapshot[~dropped], changes])
+        return delta
+
+    def live_snapshot(self):
+        """Canlı takip modundaki güncel maç tablosu"""
+        return self._live_snapshot
+
     def get_upcoming_matches(self, days=1):
-        """Yaklaşan maçları getir"""
+        """Yaklaşan maçları getir
+
+        Bugünden başlayarak `days` gün için desteklenen her lig/sezon ayrı
+        sorgulanır (sunucu tarafı filtre); istekler paralel gönderilir,
+        sonuçlar fixture_id'ye göre tekilleştirilip tek tabloda birleşir.
+        """
+        endpoint = f"{self.base_url}/fixtures"
+        today = datetime.now().date()
+        queries = [
+            {
+                'date': (today + timedelta(days=offset)).strftime('%Y-%m-%d'),
+                'league': league_id,
+                'season': season_for(today + timedelta(days=offset)),
+                'timezone': config.DEFAULT_TIMEZONE
+            }
+            for offset in range(max(1, days))
+            for league_id in config.SUPPORTED_LEAGUES
+        ]
+
+        def fetch(params):
+            try:
+                return self.client.get_json(endpoint, params=params, endpoint='fixtures',
+                                            priority=PRIORITY_UPCOMING,
+                                            project=_project_fixture)
+            except Exception as e:
+                print(f"API Error: {e}")
+                return None
+
+        pages = [page for page in fan_out(fetch, queries) if page is not None]
+        if not pages:
+            return self._get_demo_matches()
+
+        items = [item for page in pages for item in page.get('response', [])]
+        matches = self._parse_matches(items)
+        matches = matches.drop_duplicates('fixture_id', keep='last')
+        return matches.sort_values('date', kind='stable').reset_index(drop=True)
+    
+    def get_season_matches(self, league_id, season):
+        """Bir lig sezonunun bitmiş maçlarını getir (geçmiş deposu için)"""
         try:
             endpoint = f"{self.base_url}/fixtures"
-            date = datetime.now().strftime('%Y-%m-%d')
-            params = {'date': date}
+            params = {'league': league_id, 'season': season, 'status': 'FT-AET-PEN'}
             
-            response = requests.get(endpoint, headers=self.headers, params=params, timeout=10)
+            data = self.client.get_json(endpoint, params=params, endpoint='fixtures',
+                                         priority=PRIORITY_STATISTICS,
+                                         project=_project_fixture)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 return self._parse_matches(data.get('response', []))
             else:
-                return self._get_demo_matches()
+                return self._parse_matches([])
         except Exception as e:
             print(f"API Error: {e}")
-            return self._get_demo_matches()
+            return self._parse_matches([])
     
     def get_match_statistics(self, fixture_id):
         """Belirli bir maçın istatistiklerini getir"""
@@ -57,10 +169,10 @@ class MatchAPI:
             endpoint = f"{self.base_url}/fixtures/statistics"
             params = {'fixture': fixture_id}
             
-            response = requests.get(endpoint, headers=self.headers, params=params, timeout=10)
+            data = self.client.get_json(endpoint, params=params, endpoint='fixtures/statistics',
+                                         priority=PRIORITY_STATISTICS)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 return data.get('response', [])
             else:
                 return []
@@ -68,35 +180,168 @@ class MatchAPI:
             print(f"Statistics Error: {e}")
             return []
     
+    def get_match_statistics_bulk(self, fixture_ids):
+        """Birden çok maçın istatistiklerini toplu getir
+
+        Maçlar STATISTICS_BATCH_SIZE'lık gruplar halinde /fixtures?ids=
+        ile çekilir (yanıt istatistikleri gömülü taşır). Toplu yanıtta
+        durumu canlı veya bitmiş olup istatistiği gelmeyen maçlar için
+        /fixtures/statistics paralel sorgulanır; başlamamış maçların
+        istatistiği olmadığından sorgulanmaz.
+        Sonuç fixture_id/team_id anahtarlı uzun formatlı tablodur.
+        """
+        fixture_ids = list(dict.fromkeys(int(fixture_id) for fixture_id in fixture_ids))
+        endpoint = f"{self.base_url}/fixtures"
+        batch_size = config.STATISTICS_BATCH_SIZE
+        batches = [
+            fixture_ids[start:start + batch_size]
+            for start in range(0, len(fixture_ids), batch_size)
+        ]
+
+        def fetch_batch(batch):
+            try:
+                return self.client.get_json(
+                    endpoint, params={'ids': '-'.join(str(fixture_id) for fixture_id in batch)},
+                    endpoint='fixtures', priority=PRIORITY_STATISTICS
+                )
+            except Exception as e:
+                print(f"Statistics Error: {e}")
+                return None
+
+        statistics = {}
+        started = set()
+        for page in fan_out(fetch_batch, batches):
+            if page is None:
+                continue
+            for item in page.get('response', []):
+                if item.get('statistics'):
+                    statistics[item['fixture']['id']] = item['statistics']
+                elif item['fixture']['status']['short'] in STATISTICS_STATUSES:
+                    started.add(item['fixture']['id'])
+
+        missing = [fixture_id for fixture_id in fixture_ids if fixture_id in started]
+        for fixture_id, response in zip(missing, fan_out(self.get_match_statistics, missing)):
+            if response:
+                statistics[fixture_id] = response
+
+        return self._parse_statistics(statistics)
+    
+    def _parse_statistics(self, statistics):
+        """fixture_id -> istatistik yanıtı eşlemesini uzun tabloya çevir"""
+        fixture_id = []
+        team_id = []
+        team = []
+        stat = []
+        value = []
+
+        for fixture, teams in statistics.items():
+            for team_data in teams:
+                team_info = team_data['team']
+                for entry in team_data.get('statistics', []):
+                    fixture_id.append(fixture)
+                    team_id.append(team_info['id'])
+                    team.append(team_info['name'])
+                    stat.append(entry['type'])
+                    value.append(_stat_value(entry['value']))
+
+        return pd.DataFrame({
+            'fixture_id': np.array(fixture_id, dtype=np.int64),
+            'team_id': np.array(team_id, dtype=np.int64),
+            'team': pd.Categorical(team),
+            'stat': pd.Categorical(stat),
+            'value': np.array(value, dtype=np.float32)
+        }, columns=STATISTICS_COLUMNS)
+    
     def _parse_matches(self, matches_data):
-        """API yanıtını DataFrame'e çevir"""
-        parsed_matches = []
-        
-        for match in matches_data:
-            parsed_matches.append({
-                'fixture_id': match['fixture']['id'],
-                'date': match['fixture']['date'],
-                'status': match['fixture']['status']['short'],
-                'elapsed': match['fixture']['status'].get('elapsed', 0),
-                'league': match['league']['name'],
-                'country': match['league']['country'],
-                'home_team': match['teams']['home']['name'],
-                'away_team': match['teams']['away']['name'],
-                'home_score': match['goals']['home'],
-                'away_score': match['goals']['away'],
-                'halftime_home': match['score']['halftime']['home'],
-                'halftime_away': match['score']['halftime']['away']
-            })
-        
-        return pd.DataFrame(parsed_matches)
+        """API yanıtını DataFrame'e çevir
+
+        Maç başına sözlük üretmek yerine önceden ayrılmış sütun listelerini
+        tek geçişte doldurur; tipler _build_match_frame'de atanır.
+        """
+        n = len(matches_data)
+        fixture_id = [0] * n
+        date = [None] * n
+        status = [None] * n
+        league_id = [0] * n
+        season = [0] * n
+        league = [None] * n
+        country = [None] * n
+        home_team = [None] * n
+        away_team = [None] * n
+        home_team_id = [0] * n
+        away_team_id = [0] * n
+        # -1 = eksik değer (henüz başlamamış maç vb.)
+        elapsed = [-1] * n
+        home_score = [-1] * n
+        away_score = [-1] * n
+        halftime_home = [-1] * n
+        halftime_away = [-1] * n
+
+        for i, match in enumerate(matches_data):
+            fixture = match['fixture']
+            fixture_status = fixture['status']
+            league_data = match['league']
+            teams = match['teams']
+            goals = match['goals']
+            halftime = match['score']['halftime']
+
+            fixture_id[i] = fixture['id']
+            date[i] = fixture['date']
+            status[i] = fixture_status['short']
+            league_id[i] = league_data['id']
+            season[i] = league_data['season']
+            league[i] = league_data['name']
+            country[i] = league_data['country']
+            home_team_id[i] = teams['home']['id']
+            away_team_id[i] = teams['away']['id']
+            home_team[i] = teams['home']['name']
+            away_team[i] = teams['away']['name']
+
+            value = fixture_status.get('elapsed')
+            if value is not None:
+                elapsed[i] = value
+            value = goals['home']
+            if value is not None:
+                home_score[i] = value
+            value = goals['away']
+            if value is not None:
+                away_score[i] = value
+            value = halftime['home']
+            if value is not None:
+                halftime_home[i] = value
+            value = halftime['away']
+            if value is not None:
+                halftime_away[i] = value
+
+        return _build_match_frame({
+            'fixture_id': np.array(fixture_id, dtype=np.int64),
+            'date': date,
+            'status': status,
+            'elapsed': np.array(elapsed, dtype=np.int16),
+            'league_id': np.array(league_id, dtype=np.int32),
+            'season': np.array(season, dtype=np.int16),
+            'league': league,
+            'country': country,
+            'home_team_id': np.array(home_team_id, dtype=np.int32),
+            'away_team_id': np.array(away_team_id, dtype=np.int32),
+            'home_team': home_team,
+            'away_team': away_team,
+            'home_score': np.array(home_score, dtype=np.int8),
+            'away_score': np.array(away_score, dtype=np.int8),
+            'halftime_home': np.array(halftime_home, dtype=np.int8),
+            'halftime_away': np.array(halftime_away, dtype=np.int8)
+        })
     
     def _get_demo_matches(self):
         """Demo veriler (API çalışmazsa)"""
+        season = season_for(datetime.now().date())
         demo_data = [
             {
                 'fixture_id': 1, 'date': datetime.now().isoformat(),
                 'status': '1H', 'elapsed': 35,
+                'league_id': 39, 'season': season,
                 'league': 'Premier League', 'country': 'England',
+                'home_team_id': 50, 'away_team_id': 40,
                 'home_team': 'Manchester City', 'away_team': 'Liverpool',
                 'home_score': 1, 'away_score': 0,
                 'halftime_home': None, 'halftime_away': None
@@ -104,7 +349,9 @@ class MatchAPI:
             {
                 'fixture_id': 2, 'date': datetime.now().isoformat(),
                 'status': 'NS', 'elapsed': 0,
+                'league_id': 140, 'season': season,
                 'league': 'La Liga', 'country': 'Spain',
+                'home_team_id': 529, 'away_team_id': 541,
                 'home_team': 'Barcelona', 'away_team': 'Real Madrid',
                 'home_score': None, 'away_score': None,
                 'halftime_home': None, 'halftime_away': None
@@ -112,7 +359,9 @@ class MatchAPI:
             {
                 'fixture_id': 3, 'date': datetime.now().isoformat(),
                 'status': '2H', 'elapsed': 67,
+                'league_id': 135, 'season': season,
                 'league': 'Serie A', 'country': 'Italy',
+                'home_team_id': 505, 'away_team_id': 489,
                 'home_team': 'Inter Milan', 'away_team': 'AC Milan',
                 'home_score': 2, 'away_score': 1,
                 'halftime_home': 1, 'halftime_away': 0
@@ -120,7 +369,9 @@ class MatchAPI:
             {
                 'fixture_id': 4, 'date': datetime.now().isoformat(),
                 'status': 'NS', 'elapsed': 0,
+                'league_id': 78, 'season': season,
                 'league': 'Bundesliga', 'country': 'Germany',
+                'home_team_id': 157, 'away_team_id': 165,
                 'home_team': 'Bayern Munich', 'away_team': 'Borussia Dortmund',
                 'home_score': None, 'away_score': None,
                 'halftime_home': None, 'halftime_away': None
@@ -128,11 +379,123 @@ class MatchAPI:
             {
                 'fixture_id': 5, 'date': datetime.now().isoformat(),
                 'status': '1H', 'elapsed': 23,
+                'league_id': 61, 'season': season,
                 'league': 'Ligue 1', 'country': 'France',
+                'home_team_id': 85, 'away_team_id': 81,
                 'home_team': 'PSG', 'away_team': 'Marseille',
                 'home_score': 0, 'away_score': 0,
                 'halftime_home': None, 'halftime_away': None
             }
         ]
         
-        return pd.DataFrame(demo_data)
\ No newline at end of file
+        return _apply_match_dtypes(pd.DataFrame(demo_data))
+
+
+def season_for(date):
+    """Tarihin ait olduğu sezon (API-Football sezonu başlangıç yılıyla anar)"""
+    return date.year if date.month >= config.SEASON_START_MONTH else date.year - 1
+
+
+def _stat_value(value):
+    """'55%' / 12 / None gibi istatistik değerlerini sayıya çevir"""
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        value = value.rstrip('%')
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return float(value)
+
+
+def _project_fixture(item):
+    """Maç listesi öğesini _parse_matches ve önbellek için gereken alanlara daralt"""
+    fixture = item['fixture']
+    status = fixture['status']
+    league = item['league']
+    teams = item['teams']
+    return {
+        'fixture': {
+            'id': fixture['id'],
+            'date': fixture['date'],
+            'timestamp': fixture.get('timestamp'),
+            'status': {'short': status['short'], 'elapsed': status.get('elapsed')}
+        },
+        'league': {
+            'id': league['id'], 'season': league['season'],
+            'name': league['name'], 'country': league['country']
+        },
+        'teams': {
+            'home': {'id': teams['home']['id'], 'name': teams['home']['name']},
+            'away': {'id': teams['away']['id'], 'name': teams['away']['name']}
+        },
+        'goals': {'home': item['goals']['home'], 'away': item['goals']['away']},
+        'score': {'halftime': {
+            'home': item['score']['halftime']['home'],
+            'away': item['score']['halftime']['away']
+        }}
+    }
+
+
+def _live_signature(match):
+    """Canlı maçın değişim tespiti için durum imzası"""
+    fixture_status = match['fixture']['status']
+    halftime = match['score']['halftime']
+    return (
+        fixture_status['short'], fixture_status.get('elapsed'),
+        match['goals']['home'], match['goals']['away'],
+        halftime['home'], halftime['away']
+    )
+
+
+def merge_match_frames(frames):
+    """Maç tablolarını birleştir, kategorik sütunları koru"""
+    merged = pd.concat(frames, ignore_index=True)
+    for column in ['status', 'league', 'country']:
+        merged[column] = merged[column].astype('category')
+    return merged
+
+
+def _nullable_int(values, dtype):
+    """-1 ile işaretlenmiş eksikleri maskeleyen nullable tamsayı dizisi"""
+    return pd.arrays.IntegerArray(values.astype(dtype, copy=False), values < 0)
+
+
+def _build_match_frame(columns):
+    """Ham sütun dizilerinden tipli maç DataFrame'i oluştur"""
+    frame = pd.DataFrame({
+        'fixture_id': columns['fixture_id'],
+        'date': pd.to_datetime(columns['date'], utc=True, format='ISO8601'),
+        'status': pd.Categorical(columns['status']),
+        'elapsed': _nullable_int(columns['elapsed'], np.int16),
+        'league_id': columns['league_id'],
+        'season': columns['season'],
+        'league': pd.Categorical(columns['league']),
+        'country': pd.Categorical(columns['country']),
+        'home_team_id': columns['home_team_id'],
+        'away_team_id': columns['away_team_id'],
+        'home_team': columns['home_team'],
+        'away_team': columns['away_team'],
+        'home_score': _nullable_int(columns['home_score'], np.int8),
+        'away_score': _nullable_int(columns['away_score'], np.int8),
+        'halftime_home': _nullable_int(columns['halftime_home'], np.int8),
+        'halftime_away': _nullable_int(columns['halftime_away'], np.int8)
+    }, columns=MATCH_COLUMNS)
+    return frame
+
+
+def _apply_match_dtypes(frame):
+    """Sözlük listesinden gelen DataFrame'e aynı tipleri uygula"""
+    columns = {
+        'fixture_id': frame['fixture_id'].to_numpy(dtype=np.int64),
+        'league_id': frame['league_id'].to_numpy(dtype=np.int32),
+        'season': frame['season'].to_numpy(dtype=np.int16),
+        'home_team_id': frame['home_team_id'].to_numpy(dtype=np.int32),
+        'away_team_id': frame['away_team_id'].to_numpy(dtype=np.int32)
+    }
+    for column in ['date', 'status', 'league', 'country', 'home_team', 'away_team']:
+        columns[column] = frame[column].to_numpy(dtype=object)
+    for column in ['elapsed', 'home_score', 'away_score', 'halftime_home', 'halftime_away']:
+        columns[column] = frame[column].astype('float').fillna(-1).to_numpy(dtype=np.int16)
+    return _build_match_frame(columns)
\ No newline at end of file
@@ -0,0 +1,407 @@
+"""
+Kayıt/tekrar oynatma destekli sahte API-Football sunucusu
+
+Gerçek API olmadan MatchAPI/OddsAPI ve Streamlit akışını ölçmek için:
+  - ResponseRecorder: APIClient yanıtlarını diske yazar (API_RECORD_DIR)
+  - MockAPIServer: kayıtları yerel HTTP sunucusundan tekrar oynatır, kaydı
+    olmayan istekler için sentetik maç/oran üretir; gecikme, hata oranı ve
+    x-ratelimit-* başlıkları ayarlanabilir.
+
+Kullanım: python -m api.mock_server --port 8765 --fixtures 2000 --bookmakers 20
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import config
+
+# Sentetik lig bilgileri (id -> ad, ülke)
+LEAGUE_INFO = {
+    39: ('Premier League', 'England'),
+    140: ('La Liga', 'Spain'),
+    78: ('Bundesliga', 'Germany'),
+    135: ('Serie A', 'Italy'),
+    61: ('Ligue 1', 'France'),
+    203: ('Süper Lig', 'Turkey'),
+    88: ('Eredivisie', 'Netherlands'),
+    94: ('Primeira Liga', 'Portugal')
+}
+
+ODDS_PAGE_SIZE = 10
+RECORDED_HEADERS = [
+    'X-RateLimit-Limit', 'X-RateLimit-Remaining',
+    'x-ratelimit-requests-limit', 'x-ratelimit-requests-remaining'
+]
+
+
+def request_key(path, params):
+    """Yol ve parametrelerden kayıt anahtarı (host'tan bağımsız)"""
+    query = '&'.join(f"{key}={params[key]}" for key in sorted(params or {}))
+    return hashlib.sha1(f"{path}?{query}".encode('utf-8')).hexdigest()
+
+
+class ResponseRecorder:
+    def __init__(self, directory=None):
+        self.directory = directory or config.API_RECORD_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def record(self, url, params, response, body=None):
+        """Yanıtı tekrar oynatılabilir biçimde kaydet
+
+        body: akışla okunmuş yanıtın ham gövde baytları; verilmezse
+        response.text kullanılır.
+        """
+        path = urlparse(url).path
+        params = {key: str(value) for key, value in (params or {}).items()}
+        entry = {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'headers': {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS if name in response.headers
+            },
+            'body': response.text if body is None else body.decode(response.encoding or 'utf-8')
+        }
+        target = os.path.join(self.directory, f"{request_key(path, params)}.json")
+        with open(f'{target}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(f'{target}.tmp', target)
+
+
+def load_recordings(directory):
+    """Kayıt dizinini anahtar -> kayıt sözlüğüne yükle"""
+    recordings = {}
+    if not directory or not os.path.isdir(directory):
+        return recordings
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            entry = json.load(f)
+        recordings[request_key(entry['path'], entry['params'])] = entry
+    return recordings
+
+
+class SyntheticData:
+    def __init__(self, fixtures=500, bookmakers=10, seed=42, leagues=None):
+        self.rng = random.Random(seed)
+        self.bookmakers = bookmakers
+        self.leagues = leagues or list(config.SUPPORTED_LEAGUES)
+        self.fixtures = self._make_fixtures(fixtures)
+        self.by_id = {item['fixture']['id']: item for item in self.fixtures}
+        self._odds = {}
+
+    def _make_fixtures(self, count):
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        fixtures = []
+        for i in range(count):
+            league_id = self.leagues[i % len(self.leagues)]
+            name, country = LEAGUE_INFO.get(league_id, (f'League {league_id}', 'World'))
+            home_id = league_id * 100 + self.rng.randint(1, 20)
+            away_id = league_id * 100 + self.rng.randint(1, 20)
+            while away_id == home_id:
+                away_id = league_id * 100 + self.rng.randint(1, 20)
+
+            kickoff = now + timedelta(hours=self.rng.randint(-72, 168))
+            minutes = (now - kickoff).total_seconds() / 60
+            if minutes < 0:
+                status, elapsed = 'NS', None
+            elif minutes < 45:
+                status, elapsed = '1H', int(minutes) + 1
+            elif minutes < 60:
+                status, elapsed = 'HT', 45
+            elif minutes < 105:
+                status, elapsed = '2H', int(minutes) - 14
+            else:
+                status, elapsed = 'FT', 90
+
+            started = status != 'NS'
+            ht_known = status in ('HT', '2H', 'FT')
+            ht_home = self.rng.randint(0, 2) if ht_known else None
+            ht_away = self.rng.randint(0, 2) if ht_known else None
+            season = kickoff.year if kickoff.month >= config.SEASON_START_MONTH else kickoff.year - 1
+
+            fixtures.append({
+                'fixture': {
+                    'id': 5000000 + i,
+                    'date': kickoff.isoformat(),
+                    'timestamp': int(kickoff.timestamp()),
+                    'status': {'short': status, 'elapsed': elapsed}
+                },
+                'league': {'id': league_id, 'name': name, 'country': country, 'season': season},
+                'teams': {
+                    'home': {'id': home_id, 'name': f'{name} Team {home_id % 100}'},
+                    'away': {'id': away_id, 'name': f'{name} Team {away_id % 100}'}
+                },
+                'goals': {
+                    'home': (ht_home or 0) + self.rng.randint(0, 2) if started else None,
+                    'away': (ht_away or 0) + self.rng.randint(0, 2) if started else None
+                },
+                'score': {'halftime': {'home': ht_home, 'away': ht_away}}
+            })
+        return fixtures
+
+    def select_fixtures(self, params):
+        """/fixtures parametrelerine göre filtrele"""
+        items = self.fixtures
+        if 'ids' in params:
+            ids = [int(value) for value in params['ids'].split('-')]
+            return [self._with_statistics(self.by_id[i]) for i in ids if i in self.by_id]
+        if params.get('live') == 'all':
+            items = [item for item in items if item['fixture']['status']['short'] in ('1H', 'HT', '2H')]
+        if 'date' in params:
+            items = [item for item in items if item['fixture']['date'][:10] == params['date']]
+        if 'league' in params:
+            items = [item for item in items if str(item['league']['id']) == params['league']]
+        if 'season' in params:
+            items = [item for item in items if str(item['league']['season']) == params['season']]
+        if 'status' in params:
+            statuses = set(params['status'].split('-'))
+            items = [item for item in items if item['fixture']['status']['short'] in statuses]
+        return items
+
+    def statistics(self, fixture_id):
+        """Maç istatistikleri (/fixtures/statistics biçimi)"""
+        item = self.by_id.get(fixture_id)
+        if item is None or item['fixture']['status']['short'] == 'NS':
+            return []
+        rng = random.Random(fixture_id)
+        possession = rng.randint(35, 65)
+        return [
+            {
+                'team': {'id': item['teams'][side]['id'], 'name': item['teams'][side]['name']},
+                'statistics': [
+                    {'type': 'Shots on Goal', 'value': rng.randint(0, 10)},
+                    {'type': 'Total Shots', 'value': rng.randint(3, 25)},
+                    {'type': 'Corner Kicks', 'value': rng.randint(0, 12)},
+                    {'type': 'Ball Possession', 'value': f'{share}%'},
+                    {'type': 'Yellow Cards', 'value': rng.randint(0, 5) or None}
+                ]
+            }
+            for side, share in (('home', possession), ('away', 100 - possession))
+        ]
+
+    def odds(self, fixture_id):
+        """Bir maç için çok bahisçili oran kaydı (/odds biçimi)"""
+        if fixture_id in self._odds:
+            return self._odds[fixture_id]
+
+        item = self.by_id[fixture_id]
+        rng = random.Random(fixture_id * 7919)
+        base = {
+            'Home': rng.uniform(1.4, 4.5),
+            'Draw': rng.uniform(2.8, 4.2),
+            'Away': rng.uniform(1.6, 6.0)
+        }
+        markets = config.ODDS_MARKETS
+
+        def jitter(price):
+            return f"{max(1.01, price * rng.uniform(0.94, 1.06)):.2f}"
+
+        bookmakers = []
+        for bookmaker_id in range(1, self.bookmakers + 1):
+            bets = [
+                {'id': markets['match_winner'], 'name': 'Match Winner',
+                 'values': [{'value': side, 'odd': jitter(price)} for side, price in base.items()]},
+                {'id': markets['first_half_winner'], 'name': 'First Half Winner',
+                 'values': [{'value': side, 'odd': jitter(price * 1.4)} for side, price in base.items()]},
+                {'id': markets['halftime_fulltime'], 'name': 'HT/FT Double',
+                 'values': [{'value': f'{first}/{second}', 'odd': jitter(rng.uniform(3.0, 30.0))}
+                            for first in base for second in base]},
+                {'id': markets['correct_score'], 'name': 'Exact Score',
+                 'values': [{'value': f'{home}:{away}', 'odd': jitter(rng.uniform(6.0, 60.0))}
+                            for home in range(4) for away in range(4)]},
+                {'id': markets['goals_over_under'], 'name': 'Goals Over/Under',
+                 'values': [{'value': f'{side} {line}', 'odd': jitter(rng.uniform(1.3, 3.5))}
+                            for line in ('1.5', '2.5', '3.5') for side in ('Over', 'Under')]},
+                {'id': markets['both_teams_score'], 'name': 'Both Teams Score',
+                 'values': [{'value': side, 'odd': jitter(rng.uniform(1.6, 2.3))} for side in ('Yes', 'No')]}
+            ]
+            bookmakers.append({'id': bookmaker_id, 'name': f'Bookmaker {bookmaker_id}', 'bets': bets})
+
+        record = {
+            'league': dict(item['league']),
+            'fixture': {
+                'id': fixture_id,
+                'date': item['fixture']['date'],
+                'timestamp': item['fixture']['timestamp']
+            },
+            'bookmakers': bookmakers
+        }
+        self._odds[fixture_id] = record
+        return record
+
+    def select_odds(self, params):
+        """/odds parametrelerine göre oran kayıtları"""
+        if 'fixture' in params:
+            fixture_id = int(params['fixture'])
+            return [self.odds(fixture_id)] if fixture_id in self.by_id else []
+        fixtures = self.select_fixtures({
+            key: params[key] for key in ('date', 'league', 'season') if key in params
+        })
+        return [self.odds(item['fixture']['id']) for item in fixtures]
+
+    def _with_statistics(self, item):
+        item = dict(item)
+        item['statistics'] = self.statistics(item['fixture']['id'])
+        return item
+
+
+class MockAPIServer:
+    def __init__(self, port=0, replay_dir=None, latency=0.0, error_rate=0.0,
+                 rate_limit_per_minute=None, rate_limit_per_day=None,
+                 fixtures=500, bookmakers=10, seed=42):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.per_minute = rate_limit_per_minute or config.RATE_LIMIT_PER_MINUTE
+        self.per_day = rate_limit_per_day or config.RATE_LIMIT_PER_DAY
+        self.recordings = load_recordings(replay_dir)
+        self.data = SyntheticData(fixtures=fixtures, bookmakers=bookmakers, seed=seed)
+        self.rng = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._minute_window = []
+        self._day_count = 0
+        self.stats = {'requests': 0, 'replayed': 0, 'synthetic': 0, 'errors': 0, 'throttled': 0}
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Sunucuyu arka planda başlat, temel URL'yi döndür"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle(self, path, params):
+        """(status, headers, body) üret"""
+        with self._lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            self._minute_window = [t for t in self._minute_window if now - t < 60]
+            throttled = len(self._minute_window) >= self.per_minute or self._day_count >= self.per_day
+            if not throttled:
+                self._minute_window.append(now)
+                self._day_count += 1
+            headers = {
+                'X-RateLimit-Limit': str(self.per_minute),
+                'X-RateLimit-Remaining': str(max(0, self.per_minute - len(self._minute_window))),
+                'x-ratelimit-requests-limit': str(self.per_day),
+                'x-ratelimit-requests-remaining': str(max(0, self.per_day - self._day_count))
+            }
+            failed = not throttled and self.rng.random() < self.error_rate
+            if throttled:
+                self.stats['throttled'] += 1
+            elif failed:
+                self.stats['errors'] += 1
+
+        if self.latency:
+            time.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+
+        if throttled:
+            return 429, headers, json.dumps({'errors': {'rateLimit': 'Too many requests'}, 'response': []})
+        if failed:
+            return 500, headers, json.dumps({'errors': {'server': 'Injected failure'}, 'response': []})
+
+        recording = self.recordings.get(request_key(path, params))
+        with self._lock:
+            self.stats['replayed' if recording is not None else 'synthetic'] += 1
+        if recording is not None:
+            return recording['status'], headers, recording['body']
+
+        return 200, headers, json.dumps(self._synthetic(path, params))
+
+    def _synthetic(self, path, params):
+        paging = {'current': 1, 'total': 1}
+        if path.endswith('/fixtures/statistics'):
+            response = self.data.statistics(int(params.get('fixture', 0)))
+        elif path.endswith('/fixtures'):
+            response = self.data.select_fixtures(params)
+        elif path.endswith('/odds'):
+            response = self.data.select_odds(params)
+            page = int(params.get('page', 1))
+            total = max(1, -(-len(response) // ODDS_PAGE_SIZE))
+            response = response[(page - 1) * ODDS_PAGE_SIZE:page * ODDS_PAGE_SIZE]
+            paging = {'current': page, 'total': total}
+        else:
+            response = []
+        return {
+            'get': path.strip('/'),
+            'parameters': params,
+            'errors': [],
+            'results': len(response),
+            'paging': paging,
+            'response': response
+        }
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            status, headers, body = server.handle(parsed.path, dict(parse_qsl(parsed.query)))
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sahte API-Football sunucusu')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--replay', help='Kayıt dizini (API_RECORD_DIR)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Ortalama gecikme (sn)')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--per-minute', type=int, default=600)
+    parser.add_argument('--per-day', type=int, default=100000)
+    parser.add_argument('--fixtures', type=int, default=2000)
+    parser.add_argument('--bookmakers', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    server = MockAPIServer(
+        port=args.port, replay_dir=args.replay, latency=args.latency,
+        error_rate=args.error_rate, rate_limit_per_minute=args.per_minute,
+        rate_limit_per_day=args.per_day, fixtures=args.fixtures,
+        bookmakers=args.bookmakers, seed=args.seed
+    )
+    print(f"Sahte API {server.url} adresinde ({len(server.recordings)} kayıt, "
+          f"{args.fixtures} sentetik maç)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,74 +2,284 @@
 Bahis oranlarını çekmek için API modülü
 """
 
-import requests
+import threading
+import time
+import warnings
+from datetime import datetime
+import numpy as np
 import pandas as pd
 import config
 import random
+from api.client import fan_out, get_client
+from api.matches import season_for
+from api.scheduler import PRIORITY_ODDS, PRIORITY_PREFETCH
+from utils.odds_history import get_odds_history
+
+# Toplu yüklenen oranlar: fixture_id -> (yüklenme zamanı, oranlar);
+# CACHE_TTL_ODDS_DATE'ten eski kayıtlar yazma sırasında atılır
+_odds_table = {}
+_odds_table_lock = threading.Lock()
+
+RESULT_CODES = {'Home': '1', 'Draw': 'X', 'Away': '2'}
+HT_FT_CODES = {'Home': 'H', 'Draw': 'D', 'Away': 'A'}
+OVER_UNDER_CODES = {'Over': 'O', 'Under': 'U'}
+
+
+def _result_selection(value):
+    """'Home' -> '1'"""
+    return RESULT_CODES.get(value, value)
+
+
+def _ht_ft_selection(value):
+    """'Home/Draw' -> 'H/D'"""
+    first, _, second = value.partition('/')
+    return f"{HT_FT_CODES.get(first, first)}/{HT_FT_CODES.get(second, second)}"
+
+
+def _score_selection(value):
+    """'1:0' -> '1-0'"""
+    return value.replace(':', '-')
+
+
+def _over_under_selection(value):
+    """'Over 2.5' -> 'O2.5'"""
+    side, _, line = value.partition(' ')
+    return f"{OVER_UNDER_CODES.get(side, side)}{line}"
+
+
+def _yes_no_selection(value):
+    return value
+
+
+def _line_group(selection):
+    """'O2.5' -> '2.5'; her çizgi kendi içinde marjdan arındırılır"""
+    return selection[1:]
+
+
+# Pazar kaydı: config.ODDS_MARKETS anahtarı ->
+# (çıktı anahtarı, seçim normalleştirici, olasılık grubu veya None = tüm pazar)
+MARKET_REGISTRY = {
+    'match_winner': ('match_result', _result_selection, None),
+    'first_half_winner': ('halftime_result', _result_selection, None),
+    'halftime_fulltime': ('halftime_fulltime', _ht_ft_selection, None),
+    'correct_score': ('correct_score', _score_selection, None),
+    'goals_over_under': ('goals_over_under', _over_under_selection, _line_group),
+    'both_teams_score': ('both_teams_score', _yes_no_selection, None)
+}
+
+# Yapılandırılmış pazarlar ve bahis id'sine göre önceden derlenmiş dağıtım
+ODDS_MARKET_KEYS = [
+    MARKET_REGISTRY[name][0] for name in config.ODDS_MARKETS if name in MARKET_REGISTRY
+]
+BET_DISPATCH = {
+    bet_id: (ODDS_MARKET_KEYS.index(MARKET_REGISTRY[name][0]), MARKET_REGISTRY[name][1])
+    for name, bet_id in config.ODDS_MARKETS.items() if name in MARKET_REGISTRY
+}
+PROBABILITY_GROUPS = [
+    MARKET_REGISTRY[name][2] for name in config.ODDS_MARKETS if name in MARKET_REGISTRY
+]
+MARKET_POSITIONS = {market: position for position, market in enumerate(ODDS_MARKET_KEYS)}
+
+# (bahis id, ham seçim) -> (pazar anahtarı, normalleştirilmiş seçim); pazar
+# sözlüğü sınırlı olduğundan küçük kalır, aynı seçim dizgisi paylaşılır
+_selection_memo = {}
 
 class OddsAPI:
     def __init__(self):
         self.api_key = config.API_FOOTBALL_KEY
         self.base_url = config.API_FOOTBALL_BASE
-        self.headers = {
-            'x-rapidapi-key': self.api_key,
-            'x-rapidapi-host': 'v3.football.api-sports.io'
-        }
+        self.client = get_client()
     
-    def get_match_odds(self, fixture_id):
-        """Belirli bir maç için oranları getir"""
+    def get_match_odds(self, fixture_id, priority=PRIORITY_ODDS, max_wait=None):
+        """Belirli bir maç için oranları getir
+
+        Toplu yüklenmiş oran tablosunda güncel kayıt varsa ağa gidilmez.
+        max_wait: token için bekleme sınırı (ön yüklemede 0).
+        """
+        cached = self.lookup_odds([fixture_id])
+        if fixture_id in cached:
+            return cached[fixture_id]
+        
         try:
             endpoint = f"{self.base_url}/odds"
             params = {'fixture': fixture_id}
             
-            response = requests.get(endpoint, headers=self.headers, params=params, timeout=10)
+            data = self.client.get_json(endpoint, params=params, endpoint='odds',
+                                         priority=priority, project=_project_odds, max_wait=max_wait)
             
-            if response.status_code == 200:
-                data = response.json()
-                return self._parse_odds(data.get('response', []))
+            if data is not None and data.get('response'):
+                odds = self._parse_odds(data['response'])
+                # Açılış oranları ve hareket için anlık görüntü
+                get_odds_history().record_many({fixture_id: odds})
+                self._attach_movement({fixture_id: odds})
+                return odds
             else:
                 return self._get_demo_odds()
         except Exception as e:
             print(f"Odds API Error: {e}")
             return self._get_demo_odds()
     
+    def get_odds_by_date(self, date=None, leagues=None, max_wait=None):
+        """Bir günün tüm oranlarını lig bazında, tüm sayfalarıyla çek
+
+        Her lig için ilk sayfa paralel istenir, kalan sayfalar paging
+        bilgisine göre yine paralel çekilir. Sonuçlar fixture_id -> oran
+        tablosuna yazılır ve döndürülür. max_wait=0 ile token bulamayan
+        sayfa beklemeden atlanır.
+        """
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        leagues = leagues or config.SUPPORTED_LEAGUES
+        season = season_for(datetime.strptime(date, '%Y-%m-%d').date())
+        endpoint = f"{self.base_url}/odds"
+
+        def fetch(query):
+            league_id, page = query
+            params = {'date': date, 'league': league_id, 'season': season}
+            if page > 1:
+                params['page'] = page
+            try:
+                return self.client.get_json(endpoint, params=params, endpoint='odds',
+                                            priority=PRIORITY_PREFETCH, project=_project_odds,
+                                            max_wait=max_wait)
+            except Exception as e:
+                print(f"Odds API Error: {e}")
+                return None
+
+        first_pages = fan_out(fetch, [(league_id, 1) for league_id in leagues])
+        remaining = [
+            (league_id, page)
+            for league_id, data in zip(leagues, first_pages) if data is not None
+            for page in range(2, data.get('paging', {}).get('total', 1) + 1)
+        ]
+        pages = first_pages + fan_out(fetch, remaining)
+
+        table = {}
+        for data in pages:
+            if data is None:
+                continue
+            for item in data.get('response', []):
+                table[item['fixture']['id']] = self._parse_odds([item])
+
+        loaded_at = time.time()
+        with _odds_table_lock:
+            expired = [
+                fixture_id for fixture_id, (stored_at, _) in _odds_table.items()
+                if loaded_at - stored_at >= config.CACHE_TTL_ODDS_DATE
+            ]
+            for fixture_id in expired:
+                del _odds_table[fixture_id]
+            for fixture_id, odds in table.items():
+                _odds_table[fixture_id] = (loaded_at, odds)
+        get_odds_history().record_many(table, loaded_at)
+        self._attach_movement(table)
+        return table
+    
+    def lookup_odds(self, fixture_ids):
+        """Toplu tablodaki güncel (CACHE_TTL_ODDS_DATE içinde) oranlar"""
+        now = time.time()
+        found = {}
+        with _odds_table_lock:
+            for fixture_id in fixture_ids:
+                entry = _odds_table.get(fixture_id)
+                if entry is not None and now - entry[0] < config.CACHE_TTL_ODDS_DATE:
+                    found[fixture_id] = entry[1]
+        return found
+    
+    def _attach_movement(self, table):
+        """Oran geçmişindeki açılışa göre hareketi her maçın 'movement' alanına yaz
+
+        movement: {pazar: {seçim: {'opening', 'current', 'movement', 'sharp'}}}
+        """
+        movement = get_odds_history().movement_table(table.keys())
+        for fixture_id, market, selection, opening, current, change, sharp in zip(
+            movement['fixture_id'], movement['market'], movement['selection'],
+            movement['opening_odds'], movement['current_odds'],
+            movement['odds_movement'], movement['sharp_money_signal']
+        ):
+            odds = table.get(fixture_id)
+            if odds is None:
+                continue
+            odds.setdefault('movement', {}).setdefault(market, {})[selection] = {
+                'opening': round(float(opening), 2), 'current': round(float(current), 2),
+                'movement': round(float(change), 2), 'sharp': bool(sharp)
+            }
+
     def _parse_odds(self, odds_data):
-        """Oran verilerini parse et"""
-        parsed_odds = {
-            'match_result': {},
-            'halftime_result': {},
-            'halftime_fulltime': {},
-            'correct_score': {}
-        }
-        
+        """Oran verilerini parse et
+
+        Tüm bahisçiler ve config.ODDS_MARKETS'teki tüm pazarlar tek geçişte
+        (bahisçi x pazar x seçim) yoğun diziye yazılır; girdi _project_odds
+        çıktısındaki fiyat sütunlarıdır. Pazar sözlükleri en iyi (en
+        yüksek) fiyatı taşır. 'summary' altında her pazar için dizi yapısı
+        bulunur: selections, best, consensus (medyan), implied_probability
+        (marjı arındırılmış; çizgili pazarlarda çizgi başına) ve bookmakers.
+        """
         if not odds_data:
             return self._get_demo_odds()
         
-        for bookmaker_data in odds_data:
-            for bet in bookmaker_data.get('bookmakers', [{}])[0].get('bets', []):
-                bet_name = bet.get('name', '')
-                
-                if 'Match Winner' in bet_name:
-                    for value in bet.get('values', []):
-                        parsed_odds['match_result'][value['value']] = float(value['odd'])
-                
-                elif 'First Half Winner' in bet_name:
-                    for value in bet.get('values', []):
-                        parsed_odds['halftime_result'][value['value']] = float(value['odd'])
-                
-                elif 'Halftime/Fulltime' in bet_name:
-                    for value in bet.get('values', []):
-                        parsed_odds['halftime_fulltime'][value['value']] = float(value['odd'])
-                
-                elif 'Exact Score' in bet_name:
-                    for value in bet.get('values', []):
-                        parsed_odds['correct_score'][value['value']] = float(value['odd'])
+        selection_index = [{} for _ in ODDS_MARKET_KEYS]
+        bookmaker_rows = []
+        market_rows = []
+        selection_rows = []
+        prices = []
+        
+        bookmaker_count = 0
+        for item in odds_data:
+            # Eski biçimde (ham) önbellek kayıtları da desteklenir
+            quotes = item['quotes'] if 'quotes' in item else _project_odds(item)['quotes']
+            for row, market, selection, price in zip(quotes['rows'], quotes['markets'],
+                                                     quotes['selections'], quotes['prices']):
+                market_position = MARKET_POSITIONS.get(market)
+                if market_position is None:
+                    continue
+                selections = selection_index[market_position]
+                bookmaker_rows.append(bookmaker_count + row)
+                market_rows.append(market_position)
+                selection_rows.append(selections.setdefault(selection, len(selections)))
+                prices.append(price)
+            bookmaker_count += quotes['bookmakers']
+        
+        parsed_odds = {market: {} for market in ODDS_MARKET_KEYS}
+        parsed_odds['summary'] = {}
+        if not prices:
+            return parsed_odds
+        
+        width = max(len(selections) for selections in selection_index)
+        grid = np.full((bookmaker_count, len(ODDS_MARKET_KEYS), width), np.nan)
+        grid[bookmaker_rows, market_rows, selection_rows] = np.asarray(prices, dtype=float)
+        
+        quoted = ~np.isnan(grid)
+        best = np.where(quoted, grid, -np.inf).max(axis=0)
+        with warnings.catch_warnings(), np.errstate(all='ignore'):
+            # Fiyatlanmamış hücreler NaN kalır
+            warnings.simplefilter('ignore', RuntimeWarning)
+            consensus = np.nanmedian(grid, axis=0)
+            inverse = 1.0 / consensus
+            groups = _probability_groups(selection_index, width)
+            totals = np.bincount(groups.ravel(), weights=np.nan_to_num(inverse).ravel())
+            implied = inverse / totals[groups]
+        bookmakers = quoted.any(axis=2).sum(axis=0)
+        
+        for row, market in enumerate(ODDS_MARKET_KEYS):
+            selections = list(selection_index[row])
+            if not selections:
+                continue
+            count = len(selections)
+            parsed_odds[market] = dict(zip(selections, best[row, :count].tolist()))
+            parsed_odds['summary'][market] = {
+                'selections': selections,
+                'best': best[row, :count],
+                'consensus': consensus[row, :count],
+                'implied_probability': implied[row, :count],
+                'bookmakers': int(bookmakers[row])
+            }
         
         return parsed_odds
     
     def _get_demo_odds(self):
-        """Demo oranlar"""
+        """Demo oranlar ('is_demo' ile işaretli; önbelleğe alınmamalı)"""
         return {
+            'is_demo': True,
             'match_result': {
                 '1': 2.10,
                 'X': 3.40,
@@ -81,11 +291,9 @@ class OddsAPI:
                 '2': 4.00
             },
             'halftime_fulltime': {
-                '1/1': 3.50, '1/X': 8.50, '1/2': 15.00,
-                'X/1': 6.50, 'X/X': 5.00, 'X/2': 7.00,
-                '2/1': 18.00, '2/X': 12.00, '2/2': 6.00,
-                '1/0': 25.00, '2/0': 30.00,
-                '0/1': 10.00, '0/2': 12.00, '0/0': 15.00
+                'H/H': 3.50, 'H/D': 8.50, 'H/A': 15.00,
+                'D/H': 6.50, 'D/D': 5.00, 'D/A': 7.00,
+                'A/H': 18.00, 'A/D': 12.00, 'A/A': 6.00
             },
             'correct_score': {
                 '0-0': 9.00, '1-0': 7.00, '0-1': 7.50,
@@ -93,5 +301,61 @@ class OddsAPI:
                 '1-2': 7.00, '3-0': 15.00, '0-3': 18.00,
                 '3-1': 12.00, '1-3': 14.00, '2-2': 11.00,
                 '3-2': 16.00, '2-3': 20.00
+            },
+            'goals_over_under': {
+                'O1.5': 1.30, 'U1.5': 3.40,
+                'O2.5': 1.90, 'U2.5': 1.90,
+                'O3.5': 3.10, 'U3.5': 1.35
+            },
+            'both_teams_score': {
+                'Yes': 1.80,
+                'No': 2.00
             }
-        }
\ No newline at end of file
+        }
+
+
+def _project_odds(item):
+    """Oran öğesini _parse_odds'un doğrudan okuduğu fiyat sütunlarına daralt
+
+    Yalnızca BET_DISPATCH'teki pazarların (bahisçi sırası, pazar, seçim,
+    fiyat) değerleri tutulur; bahisçi/bahis adları ve iç içe sözlükler
+    atılır. Sütunlar JSON'a yazılabilir, önbelleğe de bu biçim girer.
+    """
+    rows, markets, selections, prices = [], [], [], []
+    bookmaker_count = 0
+    for bookmaker in item.get('bookmakers', []):
+        quoted = False
+        for bet in bookmaker.get('bets', []):
+            bet_id = bet.get('id')
+            if bet_id not in BET_DISPATCH:
+                continue
+            for value in bet.get('values', []):
+                key = (bet_id, value['value'])
+                selection = _selection_memo.get(key)
+                if selection is None:
+                    position, normalize = BET_DISPATCH[bet_id]
+                    selection = (ODDS_MARKET_KEYS[position], normalize(value['value']))
+                    _selection_memo[key] = selection
+                rows.append(bookmaker_count)
+                markets.append(selection[0])
+                selections.append(selection[1])
+                prices.append(float(value['odd']))
+                quoted = True
+        bookmaker_count += quoted
+    return {
+        'fixture': {'id': item['fixture']['id']},
+        'quotes': {'bookmakers': bookmaker_count, 'rows': rows, 'markets': markets,
+                   'selections': selections, 'prices': prices}
+    }
+
+
+def _probability_groups(selection_index, width):
+    """(pazar x seçim) hücreleri için marj arındırma grup numaraları"""
+    groups = np.zeros((len(selection_index), width), dtype=np.int64)
+    labels = {}
+    for row, selections in enumerate(selection_index):
+        group = PROBABILITY_GROUPS[row]
+        for selection, position in selections.items():
+            key = (row, group(selection) if group is not None else None)
+            groups[row, position] = labels.setdefault(key, len(labels))
+    return groups
@@ -0,0 +1,182 @@
+"""
+Kota farkındalıklı istek zamanlayıcı - token bucket ve öncelik sınıfları
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import config
+
+# Öncelik sınıfları (küçük değer önce çalışır)
+PRIORITY_LIVE = 0
+PRIORITY_ODDS = 1
+PRIORITY_UPCOMING = 2
+PRIORITY_STATISTICS = 3
+PRIORITY_PREFETCH = 4
+
+
+class QuotaExceededError(Exception):
+    """Günlük kota bitti ya da istek izin verilen süreden fazla bekledi"""
+
+
+class RequestScheduler:
+    def __init__(self, per_minute=None, per_day=None, max_wait=None):
+        self.per_minute = per_minute or config.RATE_LIMIT_PER_MINUTE
+        self.per_day = per_day or config.RATE_LIMIT_PER_DAY
+        self.max_wait = config.SCHEDULER_MAX_WAIT if max_wait is None else max_wait
+
+        # Dakikalık token bucket
+        self._tokens = float(self.per_minute)
+        self._refilled_at = time.monotonic()
+
+        # Günlük kota (UTC gece yarısı sıfırlanır)
+        self._day_remaining = self.per_day
+        self._day_resets_at = self._next_day_reset()
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._stats = {
+            'granted': 0,
+            'deferred': 0,
+            'rejected': 0,
+            'total_wait': 0.0
+        }
+
+    def acquire(self, priority=PRIORITY_UPCOMING, max_wait=None):
+        """Token al; yoksa öncelik sırasına göre kuyrukta bekle
+
+        Günlük kota bittiğinde veya bekleme max_wait'i aştığında
+        QuotaExceededError yükseltir (max_wait=0: beklemeden dene). Ön
+        yükleme istekleri dakikalık bucket'ta PREFETCH_MIN_TOKENS token'ı
+        kullanıcı isteklerine bırakır.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        reserve = config.PREFETCH_MIN_TOKENS if priority >= PRIORITY_PREFETCH else 0
+        started = time.monotonic()
+        deadline = started + max_wait
+        ticket = (priority, next(self._sequence))
+        deferred = False
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if self._day_remaining <= 0:
+                        self._stats['rejected'] += 1
+                        raise QuotaExceededError('Günlük API kotası doldu')
+
+                    if self._queue[0] == ticket and self._tokens >= 1 + reserve:
+                        heapq.heappop(self._queue)
+                        self._tokens -= 1
+                        self._day_remaining -= 1
+                        self._stats['granted'] += 1
+                        self._stats['total_wait'] += now - started
+                        return now - started
+
+                    if now >= deadline:
+                        self._stats['rejected'] += 1
+                        raise QuotaExceededError(
+                            f'İstek {max_wait:.0f} sn içinde kota alamadı'
+                        )
+
+                    if not deferred:
+                        deferred = True
+                        self._stats['deferred'] += 1
+
+                    needed = 1 + reserve - self._tokens
+                    next_token = needed / self._rate() if needed > 0 else 0.05
+                    self._cond.wait(min(max(next_token, 0.01), deadline - now))
+            finally:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def update_from_headers(self, headers):
+        """x-ratelimit-* başlıklarıyla yerel sayaçları senkronize et"""
+        with self._cond:
+            minute_limit = _header_int(headers, 'X-RateLimit-Limit')
+            minute_remaining = _header_int(headers, 'X-RateLimit-Remaining')
+            day_limit = _header_int(headers, 'x-ratelimit-requests-limit')
+            day_remaining = _header_int(headers, 'x-ratelimit-requests-remaining')
+
+            if minute_limit:
+                self.per_minute = minute_limit
+            if minute_remaining is not None:
+                self._tokens = min(self._tokens, float(minute_remaining))
+            if day_limit:
+                self.per_day = day_limit
+            if day_remaining is not None:
+                self._day_remaining = day_remaining
+            self._cond.notify_all()
+
+    def throttle(self):
+        """429 sonrası dakikalık bucket'ı boşalt"""
+        with self._cond:
+            self._tokens = 0.0
+
+    def metrics(self):
+        """Kalan kota ve kuyruk metrikleri"""
+        with self._cond:
+            self._refill(time.monotonic())
+            metrics = dict(self._stats)
+            metrics.update({
+                'minute_limit': self.per_minute,
+                'minute_remaining': int(self._tokens),
+                'day_limit': self.per_day,
+                'day_remaining': self._day_remaining,
+                'queued': len(self._queue),
+                'avg_wait': (
+                    self._stats['total_wait'] / self._stats['granted']
+                    if self._stats['granted'] else 0.0
+                )
+            })
+        return metrics
+
+    def _rate(self):
+        return self.per_minute / 60.0
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.per_minute), self._tokens + elapsed * self._rate())
+        self._refilled_at = now
+
+        if datetime.now(timezone.utc) >= self._day_resets_at:
+            self._day_remaining = self.per_day
+            self._day_resets_at = self._next_day_reset()
+
+    @staticmethod
+    def _next_day_reset():
+        now = datetime.now(timezone.utc)
+        return datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(days=1)
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Süreç genelinde paylaşılan RequestScheduler örneği"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
@@ -0,0 +1,139 @@
+"""
+Akışlı JSON ayrıştırma - büyük yanıtları parça parça okur
+
+API-Football yanıtlarındaki 'response' dizisinin her öğesi ayrı ayrı
+oluşturulur, projeksiyon fonksiyonundan geçirilir ve hemen bırakılır.
+Böylece tüm yükün iç içe sözlükleri aynı anda bellekte tutulmaz.
+Küçük yanıtlar (STREAM_MIN_BYTES altı) ve ijson kurulu değilse yanıt
+bütün olarak okunup aynı projeksiyon uygulanır.
+"""
+
+import config
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Akış sırasında bütün olarak toplanan üst düzey alanlar
+META_FIELDS = ['errors', 'paging']
+CHUNK_SIZE = 64 * 1024
+
+
+class _Sink:
+    """ijson coroutine hedefi - gelen her nesneyi callback'e iletir"""
+
+    def __init__(self, callback):
+        self.send = callback
+
+
+class _ChunkReader:
+    """Bayt parçası üretecini ijson'un okuyabileceği dosya nesnesine çevir
+
+    Okunan her parça, üst düzey alanlar bulunana kadar meta
+    coroutine'lerine de beslenir. API-Football bu alanları 'response'
+    dizisinden önce gönderdiğinden genellikle ilk parçada tamamlanır.
+    """
+
+    def __init__(self, chunks, payload):
+        self._chunks = iter(chunks)
+        self._payload = payload
+        self._coroutines = [
+            ijson.items_coro(_Sink(self._setter(field)), field, use_float=True)
+            for field in META_FIELDS
+        ]
+
+    def read(self, size=-1):
+        if size == 0:
+            return b''
+        for chunk in self._chunks:
+            if chunk:
+                self._feed(chunk)
+                return chunk
+        return b''
+
+    def close(self):
+        for coroutine in self._coroutines:
+            coroutine.close()
+        self._coroutines = []
+
+    def _feed(self, chunk):
+        if not self._coroutines:
+            return
+        for coroutine in self._coroutines:
+            coroutine.send(chunk)
+        if all(field in self._payload for field in META_FIELDS):
+            self._coroutines = []
+
+    def _setter(self, field):
+        def set_value(value):
+            self._payload[field] = value
+        return set_value
+
+
+def read_payload(response, project=None, tee=None):
+    """HTTP yanıtını, 'response' öğelerini project ile daraltarak oku
+
+    Akış yalnızca büyük yanıtlarda kullanılır; küçük sayfalarda
+    response.json() hem daha hızlıdır hem de bellek kazancı önemsizdir.
+    tee verilirse ham gövde baytları okundukça ona da iletilir (kayıt).
+    """
+    if ijson is None or project is None or not is_large(response):
+        payload = response.json()
+        if tee is not None:
+            tee(response.content)
+        return project_payload(payload, project)
+
+    chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+    if tee is None:
+        return stream_payload(chunks, project)
+    chunks = _tee(chunks, tee)
+    payload = stream_payload(chunks, project)
+    # 'response' dizisinden sonra kalan baytlar da kayda girsin
+    for _ in chunks:
+        pass
+    return payload
+
+
+def _tee(chunks, sink):
+    for chunk in chunks:
+        sink(chunk)
+        yield chunk
+
+
+def is_large(response):
+    """Content-Length STREAM_MIN_BYTES'ı aşıyor mu (başlık yoksa boyut bilinmez, akış)"""
+    length = response.headers.get('Content-Length')
+    if length is None or not length.isdigit():
+        return True
+    return int(length) >= config.STREAM_MIN_BYTES
+
+
+def stream_payload(chunks, project=None):
+    """Bayt parçalarından API yükünü kur
+
+    Her 'response' öğesi tamamlandığında project(öğe) sonucu eklenir;
+    project None döndürürse öğe atlanır.
+    """
+    payload = {}
+    items = []
+    reader = _ChunkReader(chunks, payload)
+
+    for item in ijson.items(reader, 'response.item', use_float=True):
+        if project is not None:
+            item = project(item)
+        if item is not None:
+            items.append(item)
+
+    reader.close()
+    payload['response'] = items
+    return payload
+
+
+def project_payload(payload, project):
+    """Bütün olarak okunmuş yüke aynı projeksiyonu uygula"""
+    if project is None or not isinstance(payload.get('response'), list):
+        return payload
+    projected = [project(item) for item in payload['response']]
+    payload['response'] = [item for item in projected if item is not None]
+    return payload
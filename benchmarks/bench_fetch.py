@@ -0,0 +1,73 @@
+"""
+Veri çekme benchmark'ı - sahte API sunucusuna karşı, ağ gerektirmez
+
+Kullanım: python benchmarks/bench_fetch.py [--latency 0.08] [--odds 20] [--replay DIR]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from api.mock_server import MockAPIServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.08)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', type=int, default=2000)
+    parser.add_argument('--bookmakers', type=int, default=20)
+    parser.add_argument('--odds', type=int, default=20, help='Oranı çekilecek maç sayısı')
+    parser.add_argument('--replay', help='Kayıt dizini')
+    args = parser.parse_args()
+
+    # Singleton'lar oluşmadan önce yapılandırmayı benchmark'a göre ayarla
+    config.CACHE_DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    config.RATE_LIMIT_PER_MINUTE = 100000
+    config.RATE_LIMIT_PER_DAY = 1000000
+    config.API_RECORD_DIR = None
+
+    server = MockAPIServer(
+        replay_dir=args.replay, latency=args.latency, error_rate=args.error_rate,
+        rate_limit_per_minute=100000, rate_limit_per_day=1000000,
+        fixtures=args.fixtures, bookmakers=args.bookmakers
+    )
+    config.API_FOOTBALL_BASE = server.start()
+
+    from api.cache import get_cache
+    from api.client import get_client
+    from api.fetcher import FetchEngine
+
+    engine = FetchEngine()
+    fixture_ids = [item['fixture']['id'] for item in server.data.fixtures[:args.odds]]
+
+    def timed(label, func):
+        get_cache().clear()
+        started = time.perf_counter()
+        result = func()
+        print(f"{label:<32}{(time.perf_counter() - started) * 1000:>10.1f} ms")
+        return result
+
+    print(f"gecikme={args.latency}s, {args.fixtures} maç, {args.bookmakers} bahisçi")
+    timed('maçlar (sıralı)', lambda: (engine.match_api.get_live_matches(),
+                                      engine.match_api.get_upcoming_matches()))
+    timed('maçlar (paralel)', engine.fetch_matches)
+    timed(f'{args.odds} maç oranı (sıralı)',
+          lambda: [engine.odds_api.get_match_odds(fixture_id) for fixture_id in fixture_ids])
+    timed(f'{args.odds} maç oranı (paralel)', lambda: engine.fetch_odds(fixture_ids))
+
+    stats = get_client().stats()
+    print(f"istek={stats['requests']} tekrar={stats['retries']} "
+          f"bağlantı={stats['connections_opened']} yeniden_kullanım={stats['connections_reused']} "
+          f"ort_gecikme={stats['avg_latency'] * 1000:.1f} ms")
+    print(f"sunucu: {server.stats}")
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
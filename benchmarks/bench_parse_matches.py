@@ -0,0 +1,112 @@
+"""
+_parse_matches benchmark - 1000 maç başına süre ve bellek
+
+Kullanım: python benchmarks/bench_parse_matches.py [maç_sayısı]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.matches import MatchAPI
+
+LEAGUES = [
+    (39, 'Premier League', 'England'), (140, 'La Liga', 'Spain'),
+    (78, 'Bundesliga', 'Germany'), (135, 'Serie A', 'Italy'),
+    (61, 'Ligue 1', 'France'), (203, 'Süper Lig', 'Turkey'),
+    (88, 'Eredivisie', 'Netherlands'), (94, 'Primeira Liga', 'Portugal')
+]
+STATUSES = ['NS', '1H', 'HT', '2H', 'FT']
+
+
+def make_fixtures(count, seed=42):
+    """API-Football /fixtures yanıtı biçiminde sentetik maçlar"""
+    rng = random.Random(seed)
+    fixtures = []
+    for i in range(count):
+        league_id, league, country = rng.choice(LEAGUES)
+        status = rng.choice(STATUSES)
+        started = status != 'NS'
+        home_id, away_id = rng.randint(1, 400), rng.randint(1, 400)
+        fixtures.append({
+            'fixture': {
+                'id': 1000000 + i,
+                'date': f'2024-03-{rng.randint(1, 28):02d}T{rng.randint(12, 21):02d}:00:00+00:00',
+                'status': {'short': status, 'elapsed': rng.randint(1, 90) if started else None}
+            },
+            'league': {'id': league_id, 'season': 2023, 'name': league, 'country': country},
+            'teams': {
+                'home': {'id': home_id, 'name': f'Team {home_id}'},
+                'away': {'id': away_id, 'name': f'Team {away_id}'}
+            },
+            'goals': {
+                'home': rng.randint(0, 4) if started else None,
+                'away': rng.randint(0, 4) if started else None
+            },
+            'score': {'halftime': {
+                'home': rng.randint(0, 2) if status in ('HT', '2H', 'FT') else None,
+                'away': rng.randint(0, 2) if status in ('HT', '2H', 'FT') else None
+            }}
+        })
+    return fixtures
+
+
+def legacy_parse(matches_data):
+    """Eski sözlük listesi tabanlı parse (karşılaştırma için)"""
+    parsed_matches = []
+    for match in matches_data:
+        parsed_matches.append({
+            'fixture_id': match['fixture']['id'],
+            'date': match['fixture']['date'],
+            'status': match['fixture']['status']['short'],
+            'elapsed': match['fixture']['status'].get('elapsed', 0),
+            'league': match['league']['name'],
+            'country': match['league']['country'],
+            'home_team': match['teams']['home']['name'],
+            'away_team': match['teams']['away']['name'],
+            'home_score': match['goals']['home'],
+            'away_score': match['goals']['away'],
+            'halftime_home': match['score']['halftime']['home'],
+            'halftime_away': match['score']['halftime']['away']
+        })
+    return pd.DataFrame(parsed_matches)
+
+
+def measure(parse, fixtures, repeat=5):
+    """En iyi süre, tracemalloc tepe belleği ve sonuç DataFrame boyutu"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(fixtures)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    frame = parse(fixtures)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, frame.memory_usage(deep=True).sum()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    fixtures = make_fixtures(count)
+    per_1k = 1000 / count
+    api = MatchAPI.__new__(MatchAPI)
+
+    print(f"{count} maç, değerler 1000 maç başına")
+    print(f"{'parser':<10}{'süre (ms)':>12}{'tepe (KB)':>12}{'frame (KB)':>12}")
+    for name, parse in [('legacy', legacy_parse), ('columnar', api._parse_matches)]:
+        elapsed, peak, size = measure(parse, fixtures)
+        print(f"{name:<10}{elapsed * 1000 * per_1k:>12.2f}"
+              f"{peak / 1024 * per_1k:>12.1f}{size / 1024 * per_1k:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Toplu tahmin benchmark'ı - maç başına predict_* çağrıları ve predict_many
+
+Kullanım: python benchmarks/bench_predict_many.py [maç_sayısı]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.odds import OddsAPI
+from models.predictor import FootballPredictor
+from models.score_matrix import fixture_probabilities, odds_arrays
+
+SINGLE_METHODS = [
+    'predict_halftime_fulltime', 'predict_halftime_score', 'predict_fulltime_score',
+    'predict_match_winner', 'predict_over_under', 'predict_both_teams_score'
+]
+
+
+def make_fixtures(count, seed=42):
+    rng = np.random.default_rng(seed)
+    fixtures = pd.DataFrame({
+        'fixture_id': np.arange(1, count + 1),
+        'home_team_id': rng.integers(1, 500, count),
+        'away_team_id': rng.integers(500, 1000, count)
+    })
+    home = pd.DataFrame({
+        'first_half_goals_avg': rng.uniform(0.3, 1.1, count),
+        'goals_scored_avg': rng.uniform(0.8, 2.4, count),
+        'home_advantage': np.full(count, 0.15)
+    })
+    away = pd.DataFrame({
+        'first_half_goals_avg': rng.uniform(0.3, 1.0, count),
+        'goals_scored_avg': rng.uniform(0.6, 2.0, count),
+        'home_advantage': np.full(count, -0.10)
+    })
+    odds = [OddsAPI()._get_demo_odds() for _ in range(count)]
+    return fixtures, home, away, odds
+
+
+def loop_predictions(predictor, home, away, odds):
+    fixture_probabilities.cache_clear()
+    home_rows, away_rows = home.to_dict('records'), away.to_dict('records')
+    return [
+        [getattr(predictor, name)(home_stats, away_stats, odds_data) for name in SINGLE_METHODS]
+        for home_stats, away_stats, odds_data in zip(home_rows, away_rows, odds)
+    ]
+
+
+def best_time(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    fixtures, home, away, odds = make_fixtures(count)
+    predictor = FootballPredictor()
+    arrays = odds_arrays(odds)
+
+    loop_time, _ = best_time(lambda: loop_predictions(predictor, home, away, odds))
+    batch_time, result = best_time(lambda: predictor.predict_many(fixtures, home, away, arrays))
+    print(f"{count} maç, {len(result)} tahmin satırı")
+    print(f"döngü {loop_time * 1000:8.2f} ms   predict_many {batch_time * 1000:7.2f} ms   "
+          f"hızlanma {loop_time / batch_time:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Dixon-Coles benchmark'ı - çok lig/sezon soğuk fit ve günlük sıcak güncelleme
+
+Kullanım: python benchmarks/bench_ratings.py [lig_sayısı] [sezon_sayısı]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.ratings import DixonColesModel
+
+
+def make_poisson_history(leagues=8, seasons=10, teams=20, seed=0):
+    """Bilinen hücum/savunma güçleriyle Poisson skorlu çok sezonluk maç tablosu"""
+    rng = np.random.default_rng(seed)
+    attack = rng.normal(0, 0.3, (leagues, teams))
+    defence = rng.normal(0, 0.3, (leagues, teams))
+    base = np.log(rng.uniform(1.1, 1.5, leagues))
+    advantage = rng.uniform(0.15, 0.35, leagues)
+
+    home, away = np.nonzero(~np.eye(teams, dtype=bool))
+    league = np.repeat(np.arange(leagues), len(home))
+    home, away = np.tile(home, leagues), np.tile(away, leagues)
+    season = np.repeat(np.arange(seasons), len(home))
+    league, home, away = np.tile(league, seasons), np.tile(home, seasons), np.tile(away, seasons)
+
+    home_rate = np.exp(base[league] + advantage[league] + attack[league, home] - defence[league, away])
+    away_rate = np.exp(base[league] + attack[league, away] - defence[league, home])
+    halftime_home, halftime_away = rng.poisson(home_rate * 0.45), rng.poisson(away_rate * 0.45)
+    days = season * 365 + rng.integers(0, 300, len(season))
+
+    matches = pd.DataFrame({
+        'fixture_id': np.arange(len(season)),
+        'date': pd.Timestamp('2015-08-01', tz='UTC') + pd.to_timedelta(days, unit='D'),
+        'league_id': league,
+        'home_team_id': league * 1000 + home,
+        'away_team_id': league * 1000 + away,
+        'home_score': halftime_home + rng.poisson(home_rate * 0.55),
+        'away_score': halftime_away + rng.poisson(away_rate * 0.55),
+        'halftime_home': halftime_home,
+        'halftime_away': halftime_away
+    }).sort_values('date', kind='stable')
+    truth = pd.Series(attack.reshape(-1), index=(np.arange(leagues)[:, None] * 1000 + np.arange(teams)).reshape(-1))
+    return matches, truth
+
+
+def main():
+    leagues = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seasons = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    matches, truth = make_poisson_history(leagues, seasons)
+
+    # Son maç günü hariç geçmişle soğuk fit, sonra o günle sıcak güncelleme
+    last_day = matches['date'].dt.normalize() == matches['date'].dt.normalize().max()
+    model = DixonColesModel()
+    started = time.perf_counter()
+    model.fit(matches[~last_day])
+    cold_time = time.perf_counter() - started
+    cold_iterations = model.iterations
+
+    started = time.perf_counter()
+    model.fit(matches, warm_start=True)
+    warm_time = time.perf_counter() - started
+
+    attack = model.ratings()['attack']
+    centered = attack - attack.groupby(attack.index // 1000).transform('mean')
+    expected = truth - truth.groupby(truth.index // 1000).transform('mean')
+    correlation = np.corrcoef(centered.sort_index(), expected.sort_index())[0, 1]
+
+    print(f"{leagues} lig, {seasons} sezon, {len(matches)} maç, {len(model.teams)} takım")
+    print(f"soğuk fit {cold_time * 1000:8.1f} ms ({cold_iterations} iterasyon)   "
+          f"sıcak güncelleme {warm_time * 1000:7.1f} ms ({model.iterations} iterasyon)")
+    print(f"hücum reytingi korelasyonu {correlation:.3f}   ρ {model.rho:+.3f}   "
+          f"ilk yarı payı {model.first_half_share:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Skor matrisi benchmark'ı - maç başına çift döngü ve toplu (N, G, G) hesaplama
+
+Kullanım: python benchmarks/bench_score_matrix.py [maç_sayısı]
+"""
+
+import os
+import sys
+import time
+from math import exp, factorial
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.score_matrix import rank_correct_scores, score_matrices
+
+
+def loop_probabilities(home_avg, away_avg, max_goals=5):
+    """Eski _poisson_probabilities: hücre başına factorial/exp ve f-string"""
+    def poisson(expected, actual):
+        return (expected ** actual * exp(-expected)) / factorial(actual)
+
+    probabilities = {}
+    for home_goals in range(max_goals + 1):
+        for away_goals in range(max_goals + 1):
+            prob = poisson(home_avg, home_goals) * poisson(away_avg, away_goals)
+            probabilities[f"{home_goals}-{away_goals}"] = prob * 100
+    return probabilities
+
+
+def loop_ranking(home_rates, away_rates, max_goals=5, top_k=20):
+    ranked = []
+    for home_avg, away_avg in zip(home_rates, away_rates):
+        rows = []
+        for score, probability in loop_probabilities(home_avg, away_avg, max_goals).items():
+            odds = max(1.01, round(100 / probability * 0.9, 2)) if probability > 0 else 50.0
+            rows.append((score, probability, odds, probability / 100 * odds))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        ranked.append(rows[:top_k])
+    return ranked
+
+
+def best_time(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    fixtures = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rng = np.random.default_rng(42)
+    home_rates = rng.uniform(0.5, 2.5, fixtures)
+    away_rates = rng.uniform(0.3, 2.0, fixtures)
+
+    loop_time, expected = best_time(lambda: loop_ranking(home_rates, away_rates))
+    batch_time, actual = best_time(lambda: rank_correct_scores(home_rates, away_rates))
+
+    matrices = score_matrices(home_rates, away_rates).reshape(fixtures, -1) * 100
+    reference = np.array([list(loop_probabilities(h, a).values()) for h, a in zip(home_rates, away_rates)])
+    same = np.allclose(matrices, reference) and len(actual) == sum(len(rows) for rows in expected)
+
+    print(f"{fixtures} maç, 6x6 skor matrisi, ilk 20 skor")
+    print(f"döngü {loop_time * 1000:8.2f} ms   toplu {batch_time * 1000:7.2f} ms   "
+          f"hızlanma {loop_time / batch_time:6.1f}x   aynı={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Akışlı JSON ayrıştırma benchmark'ı - json.loads + projeksiyon ile karşılaştırma
+
+'auto' satırı istemcinin kullandığı read_payload yoludur: Content-Length
+STREAM_MIN_BYTES altındaysa json, üstündeyse akış.
+
+Kullanım: python benchmarks/bench_stream_parse.py [--fixtures 300] [--bookmakers 30]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.matches import _project_fixture
+from api.mock_server import SyntheticData
+from api.odds import _project_odds
+from api.streaming import project_payload, read_payload, stream_payload
+
+
+def make_body(items):
+    return json.dumps({
+        'parameters': {}, 'errors': [], 'results': len(items),
+        'paging': {'current': 1, 'total': 1}, 'response': items
+    }).encode()
+
+
+def chunked(body, size=64 * 1024):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+class BodyResponse:
+    """read_payload için Content-Length başlıklı yanıt taklidi"""
+
+    def __init__(self, body):
+        self.body = body
+        self.headers = {'Content-Length': str(len(body))}
+
+    def json(self):
+        return json.loads(self.body)
+
+    def iter_content(self, chunk_size=64 * 1024):
+        return chunked(self.body, chunk_size)
+
+
+def measure(parse, repeat=3):
+    """En iyi süre, tracemalloc tepe belleği ve GC toplama sayısı"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse()
+        best = min(best, time.perf_counter() - started)
+
+    collections = sum(stats['collections'] for stats in gc.get_stats())
+    parse()
+    collections = sum(stats['collections'] for stats in gc.get_stats()) - collections
+
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, collections
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', type=int, default=300)
+    parser.add_argument('--bookmakers', type=int, default=30)
+    args = parser.parse_args()
+
+    data = SyntheticData(fixtures=args.fixtures, bookmakers=args.bookmakers)
+    payloads = [
+        ('odds', make_body([data.odds(item['fixture']['id']) for item in data.fixtures]),
+         _project_odds),
+        ('fixtures', make_body(data.fixtures), _project_fixture)
+    ]
+
+    print(f"{'yük':<10}{'yöntem':<10}{'MB':>8}{'süre (ms)':>12}{'tepe (MB)':>12}{'gc':>6}")
+    for name, body, project in payloads:
+        for method, parse in [
+            ('json', lambda: project_payload(json.loads(body), project)),
+            ('stream', lambda: stream_payload(chunked(body), project)),
+            ('auto', lambda: read_payload(BodyResponse(body), project))
+        ]:
+            elapsed, peak, collections = measure(parse)
+            print(f"{name:<10}{method:<10}{len(body) / 1e6:>8.1f}{elapsed * 1000:>12.1f}"
+                  f"{peak / 1e6:>12.1f}{collections:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Takım istatistikleri benchmark'ı - takım başına döngü ve toplu hesaplama
+
+Kullanım: python benchmarks/bench_team_stats.py [takım_sayısı] [sezon_sayısı]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.features import FeatureEngineer
+
+
+def make_season(teams=20, seasons=1, seed=42):
+    """Çift devreli lig sezonu, bitmiş maçlar"""
+    rng = random.Random(seed)
+    rows = []
+    kickoff = pd.Timestamp('2023-08-01', tz='UTC')
+    for _ in range(seasons):
+        fixtures = [(home, away) for home in range(1, teams + 1)
+                    for away in range(1, teams + 1) if home != away]
+        rng.shuffle(fixtures)
+        for home, away in fixtures:
+            kickoff += pd.Timedelta(hours=rng.randint(1, 30))
+            ht_home, ht_away = rng.randint(0, 2), rng.randint(0, 2)
+            rows.append({
+                'date': kickoff,
+                'home_team_id': home, 'away_team_id': away,
+                'home_team': f'Team {home}', 'away_team': f'Team {away}',
+                'home_score': ht_home + rng.randint(0, 2),
+                'away_score': ht_away + rng.randint(0, 2),
+                'halftime_home': ht_home, 'halftime_away': ht_away
+            })
+    matches = pd.DataFrame(rows)
+    for column in ['home_score', 'away_score', 'halftime_home', 'halftime_away']:
+        matches[column] = matches[column].astype('Int8')
+    return matches
+
+
+def loop_stats(engineer, matches, venue):
+    """Takım başına filtre + calculate_team_stats"""
+    is_home = venue != 'away'
+    column = 'home_team_id' if is_home else 'away_team_id'
+    rows = {}
+    for team_id in np.unique(matches[column]):
+        team_matches = matches[matches[column] == team_id].sort_values('date', ascending=False)
+        rows[team_id] = engineer.calculate_team_stats(team_matches, f'Team {team_id}', is_home=is_home)
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def best_time(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    seasons = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    matches = make_season(teams, seasons)
+    engineer = FeatureEngineer()
+
+    print(f"{teams} takım, {len(matches)} maç")
+    for venue in ['home', 'away']:
+        loop_time, expected = best_time(lambda: loop_stats(engineer, matches, venue))
+        batch_time, actual = best_time(lambda: engineer.calculate_all_team_stats(matches, venue=venue))
+        same = np.allclose(expected.sort_index()[actual.columns].to_numpy(dtype=float),
+                           actual.to_numpy(dtype=float))
+        print(f"{venue:<6} döngü {loop_time * 1000:8.2f} ms   toplu {batch_time * 1000:7.2f} ms   "
+              f"hızlanma {loop_time / batch_time:6.1f}x   aynı={same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Eğitim matrisi benchmark'ı - çok lig/sezon için süre ve sızıntı kontrolü
+
+Kullanım: python benchmarks/bench_training_matrix.py [lig_sayısı] [sezon_sayısı]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_team_stats import make_season
+from models.training import TrainingSetBuilder
+from utils.features import FeatureEngineer
+
+
+def make_history(leagues, seasons, teams=20):
+    """Her lig ayrı takım id aralığıyla, çok sezonluk maç tablosu"""
+    frames = []
+    for league in range(leagues):
+        frame = make_season(teams, seasons, seed=league)
+        frame['home_team_id'] += league * 1000
+        frame['away_team_id'] += league * 1000
+        frame['league_id'] = league
+        frames.append(frame)
+    matches = pd.concat(frames, ignore_index=True)
+    matches['fixture_id'] = np.arange(len(matches))
+    return matches
+
+
+def check_leakage(matches, X, samples=30, seed=0):
+    """Örnek maçlarda özellikler yalnızca önceki maçlardan mı geliyor"""
+    engineer = FeatureEngineer()
+    rng = np.random.default_rng(seed)
+    for position in rng.choice(len(matches), samples, replace=False):
+        match = matches.iloc[position]
+        earlier = matches[matches['date'] < match['date']]
+        home = engineer.calculate_all_team_stats(earlier, venue='home')
+        away = engineer.calculate_all_team_stats(earlier, venue='away')
+        row = X.loc[match['fixture_id']]
+        if match['home_team_id'] in home.index:
+            if not np.isclose(row['home_goals_avg'], home.loc[match['home_team_id'], 'goals_scored_avg']):
+                return False
+        if match['away_team_id'] in away.index:
+            if not np.isclose(row['away_conceded_avg'], away.loc[match['away_team_id'], 'goals_conceded_avg']):
+                return False
+    return True
+
+
+def main():
+    leagues = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seasons = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    matches = make_history(leagues, seasons)
+
+    started = time.perf_counter()
+    X, y = TrainingSetBuilder().build(matches)
+    elapsed = time.perf_counter() - started
+
+    print(f"{leagues} lig x {seasons} sezon, {len(matches)} maç")
+    print(f"süre {elapsed:.2f} s ({elapsed / len(matches) * 1e6:.1f} us/maç), X={X.shape}, y={y.shape}")
+    print(f"sızıntı kontrolü: {'geçti' if check_leakage(matches, X) else 'BAŞARISIZ'}")
+    print(y['ht_ft'].value_counts(normalize=True).round(3).to_dict())
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,62 @@ import os
 API_FOOTBALL_KEY = os.getenv('API_FOOTBALL_KEY', 'YOUR_API_KEY_HERE')
 API_FOOTBALL_BASE_URL = 'https://v3.football.api-sports.io'
 
+# HTTP İstemci Ayarları
+HTTP_POOL_CONNECTIONS = 4   # Host başına havuz sayısı
+HTTP_POOL_SIZE = 20         # Havuz başına açık tutulan bağlantı
+HTTP_MAX_RETRIES = 3        # 429/5xx için tekrar deneme
+HTTP_BACKOFF_BASE = 0.5     # Saniye, üstel geri çekilme tabanı
+HTTP_BACKOFF_MAX = 8.0      # Saniye, tek bekleme için üst sınır
+STREAM_MIN_BYTES = 1024 * 1024  # Bu boyuttan (Content-Length) büyük yanıtlar akışla ayrıştırılır
+
+# Endpoint bazlı zaman aşımları (saniye)
+API_TIMEOUTS = {
+    'fixtures': 10,
+    'fixtures/statistics': 10,
+    'odds': 15,
+    'default': 10
+}
+
+# API kota sınırları (plan limitlerine göre ayarlayın)
+RATE_LIMIT_PER_MINUTE = 10
+RATE_LIMIT_PER_DAY = 100
+SCHEDULER_MAX_WAIT = 30  # Saniye; token için en fazla bu kadar beklenir
+PREFETCH_MIN_TOKENS = 3  # Tek tek oran ön yüklemesi bu kadar dakikalık token'ı kullanıcıya bırakır
+
+# Yanıt kayıt dizini; doluysa her başarılı yanıt api/mock_server ile
+# tekrar oynatılmak üzere diske yazılır (None = kapalı)
+API_RECORD_DIR = None
+
+# Eşzamanlı istek sınırı (HTTP_POOL_SIZE'ı aşmamalı)
+FETCH_MAX_WORKERS = 8
+
+# /fixtures?ids= ile tek istekte sorgulanacak maç sayısı (API sınırı 20)
+STATISTICS_BATCH_SIZE = 20
+
 # Cache Ayarları
 CACHE_TTL = 300  # 5 dakika
+CACHE_TTL_LIVE = 30           # Canlı maçlar (1H/HT/2H)
+CACHE_TTL_SCHEDULED = 1800    # Başlamamış maçlar (en geç başlama saatine kadar)
+CACHE_TTL_ODDS_DATE = 3600    # Günlük toplu oran sayfaları (/odds?date=)
+CACHE_DB_PATH = os.path.join('.cache', 'responses.sqlite')
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # Kalıcı önbellek boyut sınırı
+
+# Geçmiş maç deposu (lig/sezon bölümlü NumPy dosyaları)
+HISTORY_DIR = os.path.join('data', 'history')
+
+# Oran geçmişi (açılış oranı ve hareket özellikleri için)
+ODDS_HISTORY_PATH = os.path.join('data', 'odds_history.npz')
+ODDS_HISTORY_CAPACITY = 64        # Seri başına saklanan gözlem
+ODDS_HISTORY_SAVE_INTERVAL = 60   # Saniye; diske yazma aralığı
+ODDS_HISTORY_RETENTION = 3 * 24 * 3600  # Saniye; bu süredir oranı gelmeyen maçlar atılır
+
+# Takım durum motoru (son 5/10 maç formu, artımlı)
+TEAM_STATE_PATH = os.path.join('data', 'team_state.npz')
+TEAM_STATE_SAVE_INTERVAL = 60     # Saniye; diske yazma aralığı
+
+# Özellik önbelleği (takım, saha, pencere anahtarlı LRU)
+FEATURE_CACHE_SIZE = 2048
+FEATURE_CACHE_SPILL_PATH = None   # ör. os.path.join('.cache', 'features.sqlite')
 
 # Uygulama Ayarları
 MAX_MATCHES_DISPLAY = 20
@@ -29,6 +83,15 @@ MODEL_FEATURES = [
     'recent_form'
 ]
 
+# Dixon-Coles reyting modeli (models/ratings.py)
+DIXON_COLES_DECAY = 0.0019        # Günlük zaman ağırlığı katsayısı (yarı ömür ~1 yıl)
+DIXON_COLES_PENALTY = 1.0         # Hücum/savunma reytinglerine L2 cezası (maç ağırlığı ölçeğinde)
+
+# Model deposu (sürümlü model dosyaları, models/persistence.py)
+MODEL_DIR = os.path.join('data', 'models')
+MODEL_KEEP_VERSIONS = 5           # Diskte tutulan sürüm sayısı
+MODEL_RELOAD_INTERVAL = 60        # Saniye; yeni sürüm kontrol aralığı
+
 # Desteklenen Ligler
 SUPPORTED_LEAGUES = [
     39,   # Premier League
@@ -41,11 +104,16 @@ SUPPORTED_LEAGUES = [
     94,   # Primeira Liga
 ]
 
+# Sezon başlangıç ayı (ör. 2024/25 sezonu API'de 2024 olarak geçer)
+SEASON_START_MONTH = 7
+
 # Oran Tipleri
+# API-Football bahis id'leri (api/odds.py MARKET_REGISTRY ile eşlenir)
 ODDS_MARKETS = {
     'match_winner': 1,
-    'halftime_fulltime': 6,
-    'correct_score': 9,
+    'first_half_winner': 13,
+    'halftime_fulltime': 7,
+    'correct_score': 10,
     'goals_over_under': 5,
     'both_teams_score': 8
 }
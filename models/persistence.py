@@ -0,0 +1,221 @@
+"""
+Model deposu - sürümlü model dosyaları ve süreç başına tek yükleme
+
+Her eğitim sonucu MODEL_DIR/version=<sürüm>/ altına yazılır:
+  - components.joblib: RandomForest/LogisticRegression ve Dixon-Coles reytingleri
+  - manifest.json: içerik özeti (sha256), özellik listesi, eğitim penceresi
+CURRENT dosyası etkin sürümü gösterir. Dizi verisi salt okunur bellek
+eşlemeyle yüklenir; aynı makinedeki işçi süreçler tek kopyayı paylaşır.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import joblib
+
+import config
+from models.predictor import FootballPredictor
+
+COMPONENTS_FILE = 'components.joblib'
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+
+class ModelStore:
+    def __init__(self, root=None):
+        self.root = root or config.MODEL_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def save(self, predictor, training_window=None):
+        """Eğitilmiş modeli yeni sürüm olarak yaz ve etkin sürüm yap
+
+        training_window: (başlangıç, bitiş, maç sayısı). İçeriği etkin
+        sürümle aynı olan model yeniden yazılmaz. Sürüm adını döndürür.
+        """
+        start, end, matches = training_window or (None, None, None)
+        manifest = {
+            'features': list(predictor.feature_names),
+            'training_window': {
+                'start': None if start is None else str(start),
+                'end': None if end is None else str(end),
+                'matches': None if matches is None else int(matches)
+            },
+            'is_trained': predictor.is_trained,
+            'ratings': None if predictor.ratings is None else {
+                'teams': len(predictor.ratings.teams),
+                'fitted_at': str(predictor.ratings.fitted_at)
+            }
+        }
+
+        staging = os.path.join(self.root, f'staging-{os.getpid()}-{threading.get_ident()}')
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        # Sıkıştırmasız: yüklemede diziler bellek eşlenebilsin
+        joblib.dump({
+            'rf_model': predictor.rf_model,
+            'lr_model': predictor.lr_model,
+            'ratings': predictor.ratings
+        }, os.path.join(staging, COMPONENTS_FILE))
+
+        content_hash = _content_hash(os.path.join(staging, COMPONENTS_FILE), manifest)
+        current = self.manifest()
+        if current is not None and current['content_hash'] == content_hash:
+            shutil.rmtree(staging, ignore_errors=True)
+            return current['version']
+
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at:%Y%m%dT%H%M%S}-{content_hash[:12]}"
+        manifest.update(version=version, content_hash=content_hash, created_at=created_at.isoformat())
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.replace(staging, self._version_path(version))
+        self._set_current(version)
+        self._prune()
+        return version
+
+    def load(self, version=None, verify=True):
+        """Sürümü (varsayılan etkin sürüm) FootballPredictor olarak yükle
+
+        Sürüm yoksa None döner. verify ile içerik özeti doğrulanır.
+        """
+        manifest = self.manifest(version)
+        if manifest is None:
+            return None
+
+        path = os.path.join(self._version_path(manifest['version']), COMPONENTS_FILE)
+        if verify and _content_hash(path, _hashed_fields(manifest)) != manifest['content_hash']:
+            raise ValueError(f"Model dosyası bozuk: {manifest['version']}")
+
+        components = joblib.load(path, mmap_mode='r')
+        predictor = FootballPredictor(ratings=components['ratings'])
+        predictor.rf_model = components['rf_model']
+        predictor.lr_model = components['lr_model']
+        predictor.is_trained = manifest['is_trained']
+        predictor.feature_names = manifest['features']
+        predictor.version = manifest['version']
+        return predictor
+
+    def manifest(self, version=None):
+        version = version or self.current_version()
+        if version is None:
+            return None
+        path = os.path.join(self._version_path(version), MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def current_version(self):
+        path = os.path.join(self.root, CURRENT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip() or None
+
+    def versions(self):
+        """Diskteki sürümler, eskiden yeniye"""
+        return sorted(
+            name.split('=', 1)[1] for name in os.listdir(self.root)
+            if name.startswith('version=') and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+
+    def _set_current(self, version):
+        path = os.path.join(self.root, CURRENT_FILE)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(f'{path}.tmp', path)
+
+    def _prune(self):
+        """Etkin sürüm hariç en yeni MODEL_KEEP_VERSIONS sürümü tut"""
+        current = self.current_version()
+        old = [version for version in self.versions() if version != current]
+        for version in old[:max(0, len(old) - config.MODEL_KEEP_VERSIONS + 1)]:
+            shutil.rmtree(self._version_path(version), ignore_errors=True)
+
+    def _version_path(self, version):
+        return os.path.join(self.root, f'version={version}')
+
+
+def _hashed_fields(manifest):
+    return {name: manifest[name] for name in ['features', 'training_window', 'is_trained', 'ratings']}
+
+
+def _content_hash(path, manifest):
+    """Model dosyası ve manifestin içerik alanlarının sha256 özeti"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    digest.update(json.dumps(_hashed_fields(manifest), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class PredictorRegistry:
+    """Süreç başına tek FootballPredictor; yeni sürüm yayımlanınca yeniden yükler
+
+    Etkin sürüm en fazla MODEL_RELOAD_INTERVAL saniyede bir kontrol edilir.
+    Kayıtlı model yoksa eğitilmemiş bir FootballPredictor döner.
+    """
+
+    def __init__(self, store=None, reload_interval=None):
+        self.store = store or ModelStore()
+        self.reload_interval = (config.MODEL_RELOAD_INTERVAL if reload_interval is None
+                                else reload_interval)
+        self._lock = threading.Lock()
+        self._predictor = None
+        self._version = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self):
+        if self._predictor is None or time.time() - self._checked_at >= self.reload_interval:
+            self.reload()
+        return self._predictor
+
+    def reload(self, force=False):
+        """Etkin sürümü hemen kontrol et; değiştiyse (veya force ile) yükle"""
+        with self._lock:
+            self._checked_at = time.time()
+            version = self.store.current_version()
+            if not force and self._predictor is not None and version == self._version:
+                return self._predictor
+
+            try:
+                predictor = self.store.load(version)
+            except Exception as e:
+                print(f"Model yükleme hatası ({version}): {e}")
+                predictor = None
+
+            if predictor is not None:
+                self._predictor, self._version = predictor, version
+            elif self._predictor is None:
+                self._predictor, self._version = FootballPredictor(), None
+            return self._predictor
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_predictor_registry():
+    """Süreç genelinde paylaşılan PredictorRegistry örneği"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PredictorRegistry()
+    return _registry
+
+
+def get_predictor():
+    """Etkin model sürümüyle yüklenmiş, süreç genelinde paylaşılan tahminci"""
+    return get_predictor_registry().get()
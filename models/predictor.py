@@ -2,13 +2,47 @@
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
+import pandas as pd
 import config
+from models.score_matrix import (
+    MARKET_SELECTIONS, MarketProbabilities, confidence_levels, estimate_odds,
+    fixture_probabilities, odds_grid, rank_scores
+)
+from utils.team_state import get_team_state
+
+# Pazar -> güven eşikleri (yüksek, orta), olasılık yüzdesi
+CONFIDENCE_THRESHOLDS = {
+    'halftime_fulltime': (20, 10),
+    'match_result': (40, 25),
+    'goals_over_under': (60, 45),
+    'both_teams_score': (60, 45),
+    'halftime_score': (20, 10),
+    'fulltime_score': (15, 8)
+}
+# Skor pazarları -> (listelenecek skor sayısı, en düşük olasılık)
+SCORE_MARKETS = {
+    'halftime_score': (15, 2.0),
+    'fulltime_score': (20, 1.5)
+}
+DEFAULT_HT_FT_ODDS = {
+    'H/H': 3.5, 'H/D': 8.0, 'H/A': 15.0,
+    'D/H': 4.5, 'D/D': 3.2, 'D/A': 4.5,
+    'A/H': 15.0, 'A/D': 8.0, 'A/A': 3.8
+}
+DEFAULT_RESULT_ODDS = 2.5
+PREDICTION_COLUMNS = ['fixture_id', 'market', 'outcome', 'probability', 'odds', 'expected_value', 'confidence']
 
 class FootballPredictor:
-    def __init__(self):
+    def __init__(self, ratings=None):
         self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.lr_model = LogisticRegression(random_state=42)
         self.is_trained = False
+        # Eğitilmiş DixonColesModel; iki takımı da bilinen maçlarda gol
+        # beklentileri form ortalamaları yerine reytinglerden gelir
+        self.ratings = ratings
+        # Eğitimde kullanılan özellik sütunları ve yüklendiği model sürümü
+        self.feature_names = []
+        self.version = None
     
     def train(self, X, y):
         """Modeli eğit"""
@@ -18,6 +52,7 @@ class FootballPredictor:
         try:
             self.rf_model.fit(X, y)
             self.lr_model.fit(X, y)
+            self.feature_names = [str(name) for name in getattr(X, 'columns', [])]
             self.is_trained = True
             return True
         except Exception as e:
@@ -33,8 +68,8 @@ class FootballPredictor:
             'A/H', 'A/D', 'A/A'   # Deplasman önde
         ]
         
-        # Temel olasılıklar hesapla
-        base_probs = self._calculate_ht_ft_probabilities(home_stats, away_stats)
+        # Yarı gol matrislerinin ortak dağılımından
+        base_probs = self.market_probabilities(home_stats, away_stats).markets()['halftime_fulltime']
         
         predictions = []
         
@@ -51,12 +86,8 @@ class FootballPredictor:
             expected_value = (probability / 100) * odds
             
             # Güven seviyesi
-            if probability > 20:
-                confidence = 'high'
-            elif probability > 10:
-                confidence = 'medium'
-            else:
-                confidence = 'low'
+            high, medium = CONFIDENCE_THRESHOLDS['halftime_fulltime']
+            confidence = 'high' if probability > high else 'medium' if probability > medium else 'low'
             
             # Outcome'u açıklamalı hale getir
             outcome_text = self._format_ht_ft_outcome(outcome)
@@ -76,143 +107,187 @@ class FootballPredictor:
     
     def predict_halftime_score(self, home_stats, away_stats, odds_data):
         """İlk yarı skor tahminleri"""
-        # İlk yarı gol ortalamaları (genelde daha düşük)
-        home_ht_avg = home_stats.get('first_half_goals_avg', 0.7)
-        away_ht_avg = away_stats.get('first_half_goals_avg', 0.6)
-        
-        # Poisson ile olasılıklar
-        score_probs = self._poisson_probabilities(home_ht_avg, away_ht_avg, max_goals=3)
-        
-        predictions = []
-        
-        for score, probability in score_probs.items():
-            if probability < 2.0:  # Çok düşük olasılıkları atla
-                continue
-            
-            # Oran verisinden al veya hesapla
-            if 'correct_score' in odds_data and score in odds_data['correct_score']:
-                odds = odds_data['correct_score'][score]
-            else:
-                odds = self._estimate_score_odds(probability)
-            
-            expected_value = (probability / 100) * odds
-            
-            # Güven seviyesi
-            if probability > 20:
-                confidence = 'high'
-            elif probability > 10:
-                confidence = 'medium'
-            else:
-                confidence = 'low'
-            
-            predictions.append({
-                'outcome': score,
-                'probability': probability,
-                'odds': odds,
-                'expected_value': expected_value,
-                'confidence': confidence
-            })
-        
-        predictions.sort(key=lambda x: x['expected_value'], reverse=True)
-        
-        return predictions[:15]  # İlk 15 tahmini döndür
+        probabilities = self.market_probabilities(home_stats, away_stats)
+        return self._score_predictions('halftime_score', probabilities.halftime, odds_data)
     
     def predict_fulltime_score(self, home_stats, away_stats, odds_data):
         """Maç sonu skor tahminleri"""
-        # Tam maç gol ortalamaları
-        home_avg = home_stats.get('goals_scored_avg', 1.5)
-        away_avg = away_stats.get('goals_scored_avg', 1.3)
-        
-        # Ev sahibi avantajını ekle
-        home_avg = home_avg * (1 + home_stats.get('home_advantage', 0.15))
-        
-        # Poisson ile olasılıklar
-        score_probs = self._poisson_probabilities(home_avg, away_avg, max_goals=5)
+        probabilities = self.market_probabilities(home_stats, away_stats)
+        return self._score_predictions('fulltime_score', probabilities.fulltime, odds_data)
+    
+    def predict_over_under(self, home_stats, away_stats, odds_data):
+        """Alt/üst gol çizgisi tahminleri"""
+        return self._market_predictions('goals_over_under', home_stats, away_stats, odds_data)
+    
+    def predict_both_teams_score(self, home_stats, away_stats, odds_data):
+        """Karşılıklı gol tahminleri"""
+        return self._market_predictions('both_teams_score', home_stats, away_stats, odds_data)
+    
+    def predict_many(self, fixtures, home_features=None, away_features=None, odds=None):
+        """Maç tablosundaki tüm maçlar için tüm pazar tahminleri - vektörel
+        
+        home_features / away_features: maçlarla aynı sıradaki takım
+        özellikleri (TeamStateEngine.feature_matrix çıktısı veya sütun ->
+        dizi sözlüğü); verilmezse durum motorundan okunur. odds: pazar ->
+        (N, seçim) oran dizileri (score_matrix.odds_arrays), eksik oranlar
+        tekli tahminlerdeki varsayılanlarla doldurulur. Maç × seçim başına
+        bir satır içeren uzun tablo (PREDICTION_COLUMNS) döner.
+        """
+        count = len(fixtures)
+        if count == 0:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        
+        state = get_team_state()
+        if home_features is None:
+            home_features = state.feature_matrix(fixtures['home_team_id'], venue='home')
+        if away_features is None:
+            away_features = state.feature_matrix(fixtures['away_team_id'], venue='away')
+        
+        def column(features, name, default):
+            values = features.get(name)
+            if values is None:
+                return np.full(count, default)
+            return np.asarray(values, dtype=float)
+        
+        rates = self._expected_goals(
+            column(home_features, 'first_half_goals_avg', 0.7),
+            column(away_features, 'first_half_goals_avg', 0.6),
+            column(home_features, 'goals_scored_avg', 1.5),
+            column(home_features, 'home_advantage', 0.15),
+            column(away_features, 'goals_scored_avg', 1.3)
+        )
+        if self.ratings is not None and self.ratings.is_fitted:
+            home_ids = fixtures['home_team_id'].to_numpy()
+            away_ids = fixtures['away_team_id'].to_numpy()
+            leagues = fixtures['league_id'].to_numpy() if 'league_id' in fixtures else None
+            known = self.ratings.known(home_ids, away_ids)
+            rating_rates = self.ratings.half_rates(home_ids, away_ids, leagues)
+            rates = [np.where(known, rating, rate) for rating, rate in zip(rating_rates, rates)]
+        probabilities = MarketProbabilities(*rates)
+        odds = odds or {}
+        fixture_ids = fixtures['fixture_id'].to_numpy()
+        frames = []
+        
+        for market, values in probabilities.arrays().items():
+            selections = MARKET_SELECTIONS[market]
+            percentages = values * 100
+            prices = self._default_odds(market, percentages)
+            if odds.get(market) is not None:
+                prices = np.where(np.isnan(odds[market]), prices, odds[market])
+            high, medium = CONFIDENCE_THRESHOLDS[market]
+            frames.append(pd.DataFrame({
+                'fixture_id': np.repeat(fixture_ids, len(selections)),
+                'market': market,
+                'outcome': np.tile(selections, count),
+                'probability': percentages.reshape(-1),
+                'odds': prices.reshape(-1),
+                'expected_value': (percentages * prices / 100).reshape(-1),
+                'confidence': confidence_levels(percentages, high, medium).reshape(-1)
+            }))
+        
+        for market, matrix in [('halftime_score', probabilities.halftime),
+                               ('fulltime_score', probabilities.fulltime)]:
+            top_k, min_probability = SCORE_MARKETS[market]
+            high, medium = CONFIDENCE_THRESHOLDS[market]
+            size = matrix.shape[-1]
+            score_odds = odds.get('correct_score')
+            if score_odds is not None:
+                score_odds = score_odds[:, :size, :size]
+            ranked = rank_scores(matrix * 100, score_odds, top_k, min_probability, high, medium)
+            ranked.insert(0, 'market', market)
+            ranked.insert(0, 'fixture_id', fixture_ids[ranked.pop('fixture').to_numpy()])
+            frames.append(ranked)
+        
+        return pd.concat(frames, ignore_index=True)[PREDICTION_COLUMNS]
+    
+    def expected_goals(self, home_stats, away_stats):
+        """İlk yarı ve ikinci yarı gol beklentileri (ev, deplasman)
+        
+        İstatistiklerde team_id (ve isteğe bağlı league_id) varsa ve
+        reyting modeli iki takımı da tanıyorsa Dixon-Coles beklentileri
+        kullanılır.
+        """
+        if self._rated(home_stats, away_stats):
+            rates = self.ratings.half_rates(
+                [home_stats['team_id']], [away_stats['team_id']],
+                None if home_stats.get('league_id') is None else [home_stats['league_id']]
+            )
+            return tuple(float(rate[0]) for rate in rates)
+        
+        rates = self._expected_goals(
+            home_stats.get('first_half_goals_avg', 0.7), away_stats.get('first_half_goals_avg', 0.6),
+            home_stats.get('goals_scored_avg', 1.5), home_stats.get('home_advantage', 0.15),
+            away_stats.get('goals_scored_avg', 1.3)
+        )
+        return tuple(float(rate) for rate in rates)
+    
+    def _rated(self, home_stats, away_stats):
+        if self.ratings is None or not self.ratings.is_fitted:
+            return False
+        if home_stats.get('team_id') is None or away_stats.get('team_id') is None:
+            return False
+        return bool(self.ratings.known([home_stats['team_id']], [away_stats['team_id']])[0])
+    
+    def _expected_goals(self, home_ht_avg, away_ht_avg, home_avg, home_advantage, away_avg):
+        """Gol ortalamalarından yarı beklentileri - skaler veya dizi"""
+        # Tam maç beklentisine ev sahibi avantajını ekle
+        home_avg = home_avg * (1 + home_advantage)
+        
+        # İkinci yarı = maç - ilk yarı (en az 0.05)
+        return (
+            home_ht_avg, away_ht_avg,
+            np.maximum(home_avg - home_ht_avg, 0.05), np.maximum(away_avg - away_ht_avg, 0.05)
+        )
+    
+    def market_probabilities(self, home_stats, away_stats):
+        """Maçın ortak olasılık çekirdeği (MarketProbabilities), önbellekli
         
+        Tüm pazarlar aynı yarı gol matrislerinden türetildiği için
+        birbiriyle tutarlıdır; aynı maç için tekrar hesaplanmaz.
+        """
+        return fixture_probabilities(*self.expected_goals(home_stats, away_stats))
+    
+    def _score_predictions(self, market, matrix, odds_data):
+        """Skor matrisinden beklenen değere göre ilk skorlar"""
+        top_k, min_probability = SCORE_MARKETS[market]
+        high, medium = CONFIDENCE_THRESHOLDS[market]
+        odds = odds_grid([odds_data.get('correct_score')], matrix.shape[-1] - 1)
+        ranked = rank_scores(matrix * 100, odds, top_k, min_probability, high, medium)
+        return ranked.drop(columns='fixture').to_dict('records')
+    
+    def _market_predictions(self, market, home_stats, away_stats, odds_data):
+        """Pazarın seçimleri için beklenen değere göre tahminler"""
+        probabilities = self.market_probabilities(home_stats, away_stats).markets()[market]
+        market_odds = odds_data.get(market, {})
+        high, medium = CONFIDENCE_THRESHOLDS[market]
         predictions = []
         
-        for score, probability in score_probs.items():
-            if probability < 1.5:  # Çok düşük olasılıkları atla
-                continue
-            
-            # Oran verisinden al veya hesapla
-            if 'correct_score' in odds_data and score in odds_data['correct_score']:
-                odds = odds_data['correct_score'][score]
-            else:
-                odds = self._estimate_score_odds(probability)
-            
-            expected_value = (probability / 100) * odds
-            
-            # Güven seviyesi
-            if probability > 15:
-                confidence = 'high'
-            elif probability > 8:
-                confidence = 'medium'
-            else:
-                confidence = 'low'
-            
+        for outcome, probability in probabilities.items():
+            odds = market_odds.get(outcome) or self._estimate_score_odds(probability)
             predictions.append({
-                'outcome': score,
+                'outcome': outcome,
                 'probability': probability,
                 'odds': odds,
-                'expected_value': expected_value,
-                'confidence': confidence
+                'expected_value': (probability / 100) * odds,
+                'confidence': 'high' if probability > high else 'medium' if probability > medium else 'low'
             })
         
         predictions.sort(key=lambda x: x['expected_value'], reverse=True)
         
-        return predictions[:20]  # İlk 20 tahmini döndür
-    
-    def _calculate_ht_ft_probabilities(self, home_stats, away_stats):
-        """İlk yarı / Maç sonucu olasılıkları hesapla"""
-        # Basitleştirilmiş model
-        home_strength = home_stats.get('form', 0.5) + home_stats.get('home_advantage', 0.15)
-        away_strength = away_stats.get('form', 0.5)
-        
-        probs = {
-            'H/H': 18 + home_strength * 10,  # Ev önde başlar, ev kazanır
-            'H/D': 8 + home_strength * 5,    # Ev önde başlar, berabere
-            'H/A': 4,                          # Ev önde başlar, deplasman kazanır
-            'D/H': 15 + home_strength * 8,   # Berabere başlar, ev kazanır
-            'D/D': 20,                         # Berabere başlar, berabere biter
-            'D/A': 12 + away_strength * 8,   # Berabere başlar, deplasman kazanır
-            'A/H': 3,                          # Deplasman önde, ev kazanır
-            'A/D': 7 + away_strength * 5,    # Deplasman önde, berabere
-            'A/A': 13 + away_strength * 10   # Deplasman önde, deplasman kazanır
-        }
-        
-        # Normalize et
-        total = sum(probs.values())
-        for key in probs:
-            probs[key] = (probs[key] / total) * 100
-        
-        return probs
+        return predictions
     
-    def _poisson_probabilities(self, home_avg, away_avg, max_goals=5):
-        """Poisson dağılımı ile skor olasılıkları"""
-        from math import exp, factorial
-        
-        def poisson(expected, actual):
-            return (expected ** actual * exp(-expected)) / factorial(actual)
-        
-        probabilities = {}
-        
-        for home_goals in range(max_goals + 1):
-            for away_goals in range(max_goals + 1):
-                prob = poisson(home_avg, home_goals) * poisson(away_avg, away_goals)
-                score = f"{home_goals}-{away_goals}"
-                probabilities[score] = prob * 100
-        
-        return probabilities
+    def _default_odds(self, market, probabilities):
+        """Oranı olmayan seçimler için (N, seçim) varsayılan oranlar"""
+        if market == 'halftime_fulltime':
+            defaults = [self._get_default_ht_ft_odds(outcome) for outcome in MARKET_SELECTIONS[market]]
+            return np.broadcast_to(defaults, probabilities.shape)
+        if market == 'match_result':
+            return np.full(probabilities.shape, DEFAULT_RESULT_ODDS)
+        return estimate_odds(probabilities)
     
     def _get_default_ht_ft_odds(self, outcome):
         """Varsayılan İY/MS oranları"""
-        default_odds = {
-            'H/H': 3.5, 'H/D': 8.0, 'H/A': 15.0,
-            'D/H': 4.5, 'D/D': 3.2, 'D/A': 4.5,
-            'A/H': 15.0, 'A/D': 8.0, 'A/A': 3.8
-        }
-        return default_odds.get(outcome, 10.0)
+        return DEFAULT_HT_FT_ODDS.get(outcome, 10.0)
     
     def _estimate_score_odds(self, probability):
         """Olasılıktan oran tahmini"""
@@ -244,36 +319,25 @@ class FootballPredictor:
     
     def predict_match_winner(self, home_stats, away_stats, odds_data):
         """Maç sonucu tahmini"""
-        # Güç hesapla
-        home_strength = (
-            home_stats['goals_scored_avg'] * 0.3 +
-            (3 - home_stats['goals_conceded_avg']) * 0.3 +
-            home_stats['form'] * 0.2 +
-            home_stats['home_advantage'] * 0.2
-        )
-        
-        away_strength = (
-            away_stats['goals_scored_avg'] * 0.3 +
-            (3 - away_stats['goals_conceded_avg']) * 0.3 +
-            away_stats['form'] * 0.3
+        # Maç sonu skor matrisinden 1X2
+        home_win_prob, draw_prob, away_win_prob = (
+            self.market_probabilities(home_stats, away_stats).markets()['match_result'].values()
         )
         
-        total = home_strength + away_strength
-        
-        home_win_prob = (home_strength / total) * 55  # Ev avantajı
-        away_win_prob = (away_strength / total) * 45
-        draw_prob = 100 - home_win_prob - away_win_prob
-        
         predictions = []
         
         outcomes = {
-            'home_win': ('Ev Sahibi Kazanır', home_win_prob),
-            'draw': ('Beraberlik', draw_prob),
-            'away_win': ('Deplasman Kazanır', away_win_prob)
+            '1': ('home_win', 'Ev Sahibi Kazanır', home_win_prob),
+            'X': ('draw', 'Beraberlik', draw_prob),
+            '2': ('away_win', 'Deplasman Kazanır', away_win_prob)
         }
         
-        for key, (label, prob) in outcomes.items():
-            odds = odds_data.get(key, 2.5)
+        # Bahisçiler arasındaki en iyi fiyat
+        match_result = odds_data.get('match_result', {})
+        high, medium = CONFIDENCE_THRESHOLDS['match_result']
+        
+        for selection, (key, label, prob) in outcomes.items():
+            odds = match_result.get(selection, odds_data.get(key, DEFAULT_RESULT_ODDS))
             ev = (prob / 100) * odds
             
             predictions.append({
@@ -281,7 +345,7 @@ class FootballPredictor:
                 'probability': prob,
                 'odds': odds,
                 'expected_value': ev,
-                'confidence': 'high' if prob > 40 else 'medium' if prob > 25 else 'low'
+                'confidence': 'high' if prob > high else 'medium' if prob > medium else 'low'
             })
         
         predictions.sort(key=lambda x: x['probability'], reverse=True)
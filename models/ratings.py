@@ -0,0 +1,232 @@
+"""
+Dixon-Coles reyting modeli - zaman ağırlıklı hücum/savunma gücü
+
+log λ_ev = lig_taban + lig_ev_avantajı + hücum[ev] - savunma[deplasman]
+log λ_dep = lig_taban + hücum[deplasman] - savunma[ev]
+
+Düşük skorlu maçlar (0-0, 1-0, 0-1, 1-1) ρ ile düzeltilir. Maç-parametre
+tasarım matrisi seyrektir; log-olabilirlik ve gradyanı tamamen vektöreldir.
+Önceki çözümden sıcak başlangıç, günlük güncellemeyi birkaç iterasyona indirir.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, sparse
+
+import config
+
+RHO_BOUNDS = (-0.2, 0.2)
+DEFAULT_FIRST_HALF_SHARE = 0.45
+
+
+class DixonColesModel:
+    def __init__(self, decay=None, penalty=None):
+        self.decay = config.DIXON_COLES_DECAY if decay is None else decay
+        self.penalty = config.DIXON_COLES_PENALTY if penalty is None else penalty
+        self.teams = np.array([], dtype=np.int64)
+        self.leagues = np.array([], dtype=np.int64)
+        self.attack = np.array([])
+        self.defence = np.array([])
+        self.base = np.array([])
+        self.home = np.array([])
+        self.rho = 0.0
+        self.first_half_share = DEFAULT_FIRST_HALF_SHARE
+        self.fitted_at = None
+        self.iterations = 0
+
+    @property
+    def is_fitted(self):
+        return self.fitted_at is not None
+
+    def fit(self, matches, as_of=None, warm_start=True):
+        """Biten maçlardan reytingleri tahmin et
+
+        as_of: zaman ağırlıklarının referans anı (varsayılan son maç).
+        warm_start: önceki çözümdeki takım/lig parametrelerinden başla.
+        Başarılıysa True döner.
+        """
+        matches = matches.dropna(subset=['home_score', 'away_score'])
+        if matches.empty:
+            return False
+
+        dates = pd.to_datetime(matches['date'], utc=True)
+        as_of = dates.max() if as_of is None else pd.Timestamp(as_of)
+        if as_of.tzinfo is None:
+            as_of = as_of.tz_localize('UTC')
+        days = (as_of - dates).dt.total_seconds().to_numpy() / 86400.0
+        weights = np.exp(-self.decay * np.maximum(days, 0.0))
+
+        home_ids = matches['home_team_id'].to_numpy(dtype=np.int64)
+        away_ids = matches['away_team_id'].to_numpy(dtype=np.int64)
+        league_ids = (matches['league_id'].to_numpy(dtype=np.int64) if 'league_id' in matches
+                      else np.zeros(len(matches), dtype=np.int64))
+        home_goals = matches['home_score'].to_numpy(dtype=float)
+        away_goals = matches['away_score'].to_numpy(dtype=float)
+
+        teams = np.unique(np.concatenate([home_ids, away_ids]))
+        leagues = np.unique(league_ids)
+        home_rows, away_rows = self._design(
+            np.searchsorted(teams, home_ids), np.searchsorted(teams, away_ids),
+            np.searchsorted(leagues, league_ids), len(teams), len(leagues)
+        )
+
+        start = self._initial_params(teams, leagues, league_ids, home_goals, away_goals, warm_start)
+        bounds = [(None, None)] * (len(start) - 1) + [RHO_BOUNDS]
+        result = optimize.minimize(
+            _negative_log_likelihood, start, jac=True, method='L-BFGS-B', bounds=bounds,
+            args=(home_rows, away_rows, home_goals, away_goals, weights / weights.sum(),
+                  self.penalty / weights.sum(), len(leagues))
+        )
+        if not np.all(np.isfinite(result.x)):
+            print(f"Dixon-Coles optimizasyon hatası: {result.message}")
+            return False
+
+        leagues_count, teams_count = len(leagues), len(teams)
+        self.teams, self.leagues = teams, leagues
+        self.base = result.x[:leagues_count]
+        self.home = result.x[leagues_count:2 * leagues_count]
+        self.attack = result.x[2 * leagues_count:2 * leagues_count + teams_count]
+        self.defence = result.x[2 * leagues_count + teams_count:-1]
+        self.rho = float(result.x[-1])
+        self.first_half_share = _first_half_share(matches, weights)
+        self.fitted_at = as_of
+        self.iterations = int(result.nit)
+        return True
+
+    def known(self, home_team_ids, away_team_ids):
+        """İki takımı da modelde olan eşleşmeler (maske)"""
+        return self._positions(self.teams, home_team_ids)[1] & self._positions(self.teams, away_team_ids)[1]
+
+    def expected_goals(self, home_team_ids, away_team_ids, league_ids=None):
+        """Maç sonu gol beklentileri (λ_ev, λ_deplasman) dizileri
+
+        Modelde olmayan takımın reytingi 0 (lig ortalaması), olmayan ligin
+        tabanı ve ev avantajı liglerin ortalamasıdır.
+        """
+        home, home_known = self._positions(self.teams, home_team_ids)
+        away, away_known = self._positions(self.teams, away_team_ids)
+        attack_home = np.where(home_known, self.attack[home], 0.0)
+        defence_home = np.where(home_known, self.defence[home], 0.0)
+        attack_away = np.where(away_known, self.attack[away], 0.0)
+        defence_away = np.where(away_known, self.defence[away], 0.0)
+
+        if league_ids is None:
+            base, advantage = self.base.mean(), self.home.mean()
+        else:
+            league, league_known = self._positions(self.leagues, league_ids)
+            base = np.where(league_known, self.base[league], self.base.mean())
+            advantage = np.where(league_known, self.home[league], self.home.mean())
+
+        return (np.exp(base + advantage + attack_home - defence_away),
+                np.exp(base + attack_away - defence_home))
+
+    def half_rates(self, home_team_ids, away_team_ids, league_ids=None):
+        """Skor çekirdeği için (İY ev, İY dep, 2Y ev, 2Y dep) beklentileri"""
+        home, away = self.expected_goals(home_team_ids, away_team_ids, league_ids)
+        share = self.first_half_share
+        return home * share, away * share, home * (1 - share), away * (1 - share)
+
+    def ratings(self):
+        """Takım reytingleri tablosu, team_id indeksli"""
+        return pd.DataFrame({'attack': self.attack, 'defence': self.defence},
+                            index=pd.Index(self.teams, name='team_id'))
+
+    def _positions(self, ids, values):
+        values = np.atleast_1d(np.asarray(values, dtype=np.int64))
+        if len(ids) == 0:
+            return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+        positions = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+        return positions, ids[positions] == values
+
+    def _design(self, home, away, league, teams_count, leagues_count):
+        """Ev ve deplasman log-λ satırları için seyrek tasarım matrisleri
+
+        Sütunlar: lig tabanı, lig ev avantajı, hücum, savunma.
+        """
+        count = len(home)
+        size = 2 * leagues_count + 2 * teams_count
+        attack, defence = 2 * leagues_count, 2 * leagues_count + teams_count
+
+        def matrix(columns, values):
+            rows = np.repeat(np.arange(count), columns.shape[1])
+            return sparse.csr_matrix((np.tile(values, count), (rows, columns.reshape(-1))),
+                                     shape=(count, size))
+
+        home_rows = matrix(np.column_stack([league, leagues_count + league, attack + home, defence + away]),
+                           [1.0, 1.0, 1.0, -1.0])
+        away_rows = matrix(np.column_stack([league, attack + away, defence + home]), [1.0, 1.0, -1.0])
+        return home_rows, away_rows
+
+    def _initial_params(self, teams, leagues, league_ids, home_goals, away_goals, warm_start):
+        """Sıcak başlangıç: önceki çözüm, yoksa lig gol ortalamaları"""
+        league = np.searchsorted(leagues, league_ids)
+        goals = np.bincount(league, weights=(home_goals + away_goals) / 2, minlength=len(leagues))
+        base = np.log(np.maximum(goals / np.bincount(league, minlength=len(leagues)), 0.1))
+        home = np.full(len(leagues), 0.2)
+        attack = np.zeros(len(teams))
+        defence = np.zeros(len(teams))
+        rho = 0.0
+
+        if warm_start and self.is_fitted:
+            positions, known = self._positions(self.leagues, leagues)
+            base[known], home[known] = self.base[positions[known]], self.home[positions[known]]
+            positions, known = self._positions(self.teams, teams)
+            attack[known], defence[known] = self.attack[positions[known]], self.defence[positions[known]]
+            rho = self.rho
+        return np.concatenate([base, home, attack, defence, [rho]])
+
+
+def _negative_log_likelihood(params, home_rows, away_rows, home_goals, away_goals, weights,
+                             penalty, leagues_count):
+    """Ağırlıklı negatif log-olabilirlik ve gradyanı (faktöriyel terimleri hariç)"""
+    theta, rho = params[:-1], params[-1]
+    home_log = home_rows @ theta
+    away_log = away_rows @ theta
+    home_rate, away_rate = np.exp(home_log), np.exp(away_log)
+
+    # Dixon-Coles düşük skor düzeltmesi τ ve türevleri
+    zero_zero = (home_goals == 0) & (away_goals == 0)
+    zero_one = (home_goals == 0) & (away_goals == 1)
+    one_zero = (home_goals == 1) & (away_goals == 0)
+    one_one = (home_goals == 1) & (away_goals == 1)
+    tau = np.ones_like(home_rate)
+    tau = np.where(zero_zero, 1 - home_rate * away_rate * rho, tau)
+    tau = np.where(zero_one, 1 + home_rate * rho, tau)
+    tau = np.where(one_zero, 1 + away_rate * rho, tau)
+    tau = np.where(one_one, 1 - rho, tau)
+    tau = np.maximum(tau, 1e-10)
+
+    log_likelihood = (np.log(tau) + home_goals * home_log - home_rate
+                      + away_goals * away_log - away_rate)
+
+    # d log τ / d log λ, d log τ / d log μ, d log τ / dρ
+    tau_home = np.where(zero_zero, -home_rate * away_rate * rho, np.where(zero_one, home_rate * rho, 0.0)) / tau
+    tau_away = np.where(zero_zero, -home_rate * away_rate * rho, np.where(one_zero, away_rate * rho, 0.0)) / tau
+    tau_rho = np.select(
+        [zero_zero, zero_one, one_zero, one_one],
+        [-home_rate * away_rate, home_rate, away_rate, -np.ones_like(home_rate)], 0.0
+    ) / tau
+
+    gradient_home = weights * (home_goals - home_rate + tau_home)
+    gradient_away = weights * (away_goals - away_rate + tau_away)
+    gradient = -(home_rows.T @ gradient_home + away_rows.T @ gradient_away)
+
+    # Hücum/savunma reytinglerine L2 cezası (tanımlanabilirlik)
+    ratings = theta[2 * leagues_count:]
+    value = -np.dot(weights, log_likelihood) + penalty * np.dot(ratings, ratings)
+    gradient[2 * leagues_count:] += 2 * penalty * ratings
+    return value, np.append(gradient, -np.dot(weights, tau_rho))
+
+
+def _first_half_share(matches, weights):
+    """İlk yarıda atılan gollerin maç toplamına oranı (ağırlıklı)"""
+    if 'halftime_home' not in matches or 'halftime_away' not in matches:
+        return DEFAULT_FIRST_HALF_SHARE
+    first_half = (matches['halftime_home'].to_numpy(dtype=float, na_value=np.nan)
+                  + matches['halftime_away'].to_numpy(dtype=float, na_value=np.nan))
+    total = matches['home_score'].to_numpy(dtype=float) + matches['away_score'].to_numpy(dtype=float)
+    known = ~np.isnan(first_half)
+    goals = np.dot(weights[known], total[known])
+    if goals <= 0:
+        return DEFAULT_FIRST_HALF_SHARE
+    return float(np.dot(weights[known], first_half[known]) / goals)
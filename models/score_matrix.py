@@ -0,0 +1,278 @@
+"""
+Skor matrisi motoru - Poisson PMF vektörlerinin dış çarpımıyla skor olasılıkları
+
+Tek maç için (G, G), N maç için (N, G, G) olasılık matrisi tek seferde
+hesaplanır (G = max_goals + 1; satır ev sahibi, sütun deplasman golü).
+Skor etiketleri ('2-1') yalnızca seçilen hücreler için üretilir.
+
+MarketProbabilities ilk ve ikinci yarı gol matrislerinden tüm pazarları
+(İY/MS, İY skoru, MS skoru, 1X2, alt/üst, KG) aynı ortak dağılımdan türetir.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+RESULT_SELECTIONS = ['1', 'X', '2']
+HT_FT_SELECTIONS = [f'{first}/{second}' for first in 'HDA' for second in 'HDA']
+OVER_UNDER_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+OVER_UNDER_SELECTIONS = [f'{side}{line}' for line in OVER_UNDER_LINES for side in 'OU']
+BTTS_SELECTIONS = ['Yes', 'No']
+HALF_MAX_GOALS = 5
+
+# Oran anahtarlarıyla (api/odds.py) aynı pazar -> seçim sırası
+MARKET_SELECTIONS = {
+    'match_result': RESULT_SELECTIONS,
+    'halftime_fulltime': HT_FT_SELECTIONS,
+    'goals_over_under': OVER_UNDER_SELECTIONS,
+    'both_teams_score': BTTS_SELECTIONS
+}
+# Eski oran anahtarları (demo verisi)
+LEGACY_RESULT_KEYS = {'1': 'home_win', 'X': 'draw', '2': 'away_win'}
+
+_LOG_FACTORIALS = {}
+
+
+def _log_factorials(max_goals):
+    table = _LOG_FACTORIALS.get(max_goals)
+    if table is None:
+        table = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))])
+        _LOG_FACTORIALS[max_goals] = table
+    return table
+
+
+def poisson_pmf(rates, max_goals=5):
+    """0..max_goals gol olasılıkları; rates (N,) için (N, G) döner"""
+    rates = np.maximum(np.asarray(rates, dtype=float), 1e-9)
+    goals = np.arange(max_goals + 1)
+    log_rates = np.log(rates)[..., None]
+    return np.exp(goals * log_rates - rates[..., None] - _log_factorials(max_goals))
+
+
+def score_matrix(home_rate, away_rate, max_goals=5):
+    """Tek maçın (G, G) skor olasılık matrisi"""
+    return np.outer(poisson_pmf(home_rate, max_goals), poisson_pmf(away_rate, max_goals))
+
+
+def score_matrices(home_rates, away_rates, max_goals=5):
+    """N maçın (N, G, G) skor olasılık tensörü"""
+    home = poisson_pmf(np.atleast_1d(home_rates), max_goals)
+    away = poisson_pmf(np.atleast_1d(away_rates), max_goals)
+    return home[:, :, None] * away[:, None, :]
+
+
+@lru_cache(maxsize=8)
+def _score_label_table(max_goals):
+    goals = np.arange(max_goals + 1).astype(str)
+    return np.char.add(np.char.add(goals[:, None], '-'), goals[None, :]).reshape(-1).astype(object)
+
+
+def score_labels(cells, max_goals=5):
+    """Düz hücre indekslerinden skor etiketleri ('ev-deplasman')"""
+    return _score_label_table(max_goals)[np.asarray(cells)]
+
+
+def odds_grid(odds_dicts, max_goals=5):
+    """Doğru skor oran sözlüklerini (N, G, G) diziye çevir; eksik oran NaN"""
+    size = max_goals + 1
+    grid = np.full((len(odds_dicts), size, size), np.nan)
+    for i, odds in enumerate(odds_dicts):
+        for score, price in (odds or {}).items():
+            home, _, away = score.partition('-')
+            if home.isdigit() and away.isdigit() and int(home) < size and int(away) < size:
+                grid[i, int(home), int(away)] = price
+    return grid
+
+
+def odds_arrays(odds_dicts):
+    """Maç başına oran sözlüklerinden pazar -> (N, seçim) oran dizileri
+
+    Seçimler MARKET_SELECTIONS sırasındadır; 'correct_score' tam maç skor
+    matrisi boyutunda (odds_grid) döner. Eksik oran NaN.
+    """
+    odds_dicts = [odds or {} for odds in odds_dicts]
+    arrays = {}
+    for market, selections in MARKET_SELECTIONS.items():
+        grid = np.full((len(odds_dicts), len(selections)), np.nan)
+        for i, odds in enumerate(odds_dicts):
+            prices = odds.get(market) or {}
+            for j, selection in enumerate(selections):
+                price = prices.get(selection)
+                if price is None and market == 'match_result':
+                    price = odds.get(LEGACY_RESULT_KEYS[selection])
+                if price is not None:
+                    grid[i, j] = price
+        arrays[market] = grid
+    arrays['correct_score'] = odds_grid([odds.get('correct_score') for odds in odds_dicts],
+                                        2 * HALF_MAX_GOALS)
+    return arrays
+
+
+def estimate_odds(probabilities):
+    """Olasılıktan (%) %10 marjlı oran tahmini - vektörel"""
+    probabilities = np.asarray(probabilities, dtype=float)
+    with np.errstate(divide='ignore'):
+        odds = np.round(90.0 / probabilities, 2)
+    return np.where(probabilities > 0, np.maximum(1.01, odds), 50.0)
+
+
+def confidence_levels(probabilities, high, medium):
+    return np.where(probabilities > high, 'high', np.where(probabilities > medium, 'medium', 'low'))
+
+
+def rank_correct_scores(home_rates, away_rates, odds=None, max_goals=5, top_k=20,
+                        min_probability=0.0, high=15, medium=8):
+    """Bir maç gününün doğru skor pazarlarını tek çağrıda sırala
+
+    odds: (N, G, G) oran dizisi (odds_grid) veya None; eksik oranlar
+    olasılıktan tahmin edilir. Her maç için beklenen değere göre ilk top_k
+    skor, uzun biçimli tablo olarak döner (fixture: girdi sırası).
+    """
+    probabilities = score_matrices(home_rates, away_rates, max_goals) * 100
+    return rank_scores(probabilities, odds, top_k, min_probability, high, medium)
+
+
+def rank_scores(probabilities, odds=None, top_k=20, min_probability=0.0, high=15, medium=8):
+    """Hazır (N, G, G) skor olasılıklarını (%) beklenen değere göre sırala"""
+    count, size = len(probabilities), probabilities.shape[-1]
+    cells = size * size
+    probabilities = probabilities.reshape(count, cells)
+
+    prices = estimate_odds(probabilities)
+    if odds is not None:
+        odds = np.asarray(odds, dtype=float).reshape(count, cells)
+        prices = np.where(np.isnan(odds), prices, odds)
+
+    expected_value = probabilities / 100 * prices
+    # Eşiğin altındaki skorlar sıralamaya girmez
+    ranking = np.where(probabilities >= min_probability, expected_value, -np.inf)
+
+    top_k = min(top_k, cells)
+    if top_k < cells:
+        top = np.argpartition(-ranking, top_k - 1, axis=1)[:, :top_k]
+    else:
+        top = np.broadcast_to(np.arange(cells), (count, cells))
+    order = np.argsort(-np.take_along_axis(ranking, top, axis=1), axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+
+    fixtures = np.repeat(np.arange(count), top_k)
+    cells_flat = top.reshape(-1)
+    keep = np.isfinite(ranking[fixtures, cells_flat])
+    fixtures, cells_flat = fixtures[keep], cells_flat[keep]
+    selected = probabilities[fixtures, cells_flat]
+    return pd.DataFrame({
+        'fixture': fixtures,
+        'outcome': score_labels(cells_flat, size - 1),
+        'probability': selected,
+        'odds': prices[fixtures, cells_flat],
+        'expected_value': expected_value[fixtures, cells_flat],
+        'confidence': confidence_levels(selected, high, medium)
+    })
+
+
+@lru_cache(maxsize=8)
+def _half_projections(max_goals):
+    """İki yarının ortak hücrelerinden (G^4) MS skoruna ve İY/MS'ye, MS
+    skorundan toplam gole 0/1 eşleme matrisleri"""
+    size = max_goals + 1
+    ht_home, ht_away, sh_home, sh_away = np.indices((size,) * 4).reshape(4, -1)
+    ft_home, ft_away = ht_home + sh_home, ht_away + sh_away
+    ft_size = 2 * size - 1
+
+    def outcome(home, away):
+        # 0: ev önde (H), 1: berabere (D), 2: deplasman önde (A)
+        return 1 - np.sign(home - away)
+
+    fulltime = np.zeros((len(ft_home), ft_size * ft_size))
+    fulltime[np.arange(len(ft_home)), ft_home * ft_size + ft_away] = 1.0
+    ht_ft = np.zeros((len(ft_home), len(HT_FT_SELECTIONS)))
+    ht_ft[np.arange(len(ft_home)), outcome(ht_home, ht_away) * 3 + outcome(ft_home, ft_away)] = 1.0
+    goals = np.arange(ft_size)
+    totals = (goals[:, None] + goals[None, :]).reshape(-1)
+    total_goals = np.zeros((len(totals), 2 * ft_size - 1))
+    total_goals[np.arange(len(totals)), totals] = 1.0
+    return fulltime, ht_ft, total_goals
+
+
+class MarketProbabilities:
+    """N maçın yarı gol matrislerinden türetilen tüm pazar olasılıkları (0-1)
+
+    Yarılar bağımsız Poisson kabul edilir; her yarıda en fazla
+    HALF_MAX_GOALS gol hesaba katılır ve kesilen kuyruk normalize edilir.
+    """
+
+    def __init__(self, ht_home, ht_away, sh_home, sh_away, max_goals=HALF_MAX_GOALS):
+        count = len(np.atleast_1d(ht_home))
+        size = max_goals + 1
+
+        def half(home_rates, away_rates):
+            home = poisson_pmf(np.atleast_1d(home_rates), max_goals)
+            away = poisson_pmf(np.atleast_1d(away_rates), max_goals)
+            home /= home.sum(axis=1, keepdims=True)
+            away /= away.sum(axis=1, keepdims=True)
+            return home[:, :, None] * away[:, None, :]
+
+        self.halftime = half(ht_home, ht_away)
+        self.second_half = half(sh_home, sh_away)
+
+        # İki yarının ortak dağılımı (N, G^4) -> MS skoru ve İY/MS
+        joint = (self.halftime.reshape(count, -1, 1) * self.second_half.reshape(count, 1, -1)).reshape(count, -1)
+        to_fulltime, to_ht_ft, to_total_goals = _half_projections(max_goals)
+        ft_size = 2 * size - 1
+        self.fulltime = (joint @ to_fulltime).reshape(count, ft_size, ft_size)
+        self.ht_ft = joint @ to_ht_ft
+
+        goals = np.arange(ft_size)
+        difference = goals[:, None] - goals[None, :]
+        self.match_result = np.stack([
+            self.fulltime[:, difference > 0].sum(axis=1),
+            self.fulltime[:, difference == 0].sum(axis=1),
+            self.fulltime[:, difference < 0].sum(axis=1)
+        ], axis=1)
+        self.total_goals = self.fulltime.reshape(count, -1) @ to_total_goals
+        both_score = self.fulltime[:, 1:, 1:].sum(axis=(1, 2))
+        self.both_teams_score = np.stack([both_score, 1 - both_score], axis=1)
+
+    def __len__(self):
+        return len(self.halftime)
+
+    def arrays(self):
+        """Pazar -> (N, seçim) olasılık dizileri, MARKET_SELECTIONS sırasıyla"""
+        over_under = self.over_under()
+        return {
+            'match_result': self.match_result,
+            'halftime_fulltime': self.ht_ft,
+            'goals_over_under': np.column_stack([over_under[key] for key in OVER_UNDER_SELECTIONS]),
+            'both_teams_score': self.both_teams_score
+        }
+
+    def over_under(self, lines=OVER_UNDER_LINES):
+        """{'O2.5': (N,), 'U2.5': (N,), ...} - oran anahtarlarıyla aynı"""
+        cumulative = np.cumsum(self.total_goals, axis=1)
+        markets = {}
+        for line in lines:
+            under = cumulative[:, int(np.floor(line))]
+            markets[f'O{line}'] = 1 - under
+            markets[f'U{line}'] = under
+        return markets
+
+    def markets(self, index=0):
+        """Tek maçın pazar olasılıkları (%), odds_data ile aynı seçim anahtarlarıyla"""
+        return {
+            market: dict(zip(MARKET_SELECTIONS[market], (values[index] * 100).tolist()))
+            for market, values in self.arrays().items()
+        }
+
+
+@lru_cache(maxsize=1024)
+def fixture_probabilities(ht_home, ht_away, sh_home, sh_away, max_goals=HALF_MAX_GOALS):
+    """Tek maçın MarketProbabilities nesnesi, gol beklentileri anahtarlı önbellekle
+
+    Aynı maçın tüm sekmeleri (aynı beklentilerle) tek hesabı paylaşır.
+    Dönen nesne paylaşıldığı için dizileri değiştirilmemelidir.
+    """
+    probabilities = MarketProbabilities([ht_home], [ht_away], [sh_home], [sh_away], max_goals)
+    for values in vars(probabilities).values():
+        values.flags.writeable = False
+    return probabilities
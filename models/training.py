@@ -0,0 +1,174 @@
+"""
+Eğitim matrisi - her maç için başlama anındaki bilgiyle X ve etiketler
+
+Geçmiş maçlar kronolojik sırayla tek geçişte işlenir. Her maçın özellik
+vektörü, maç takım durum motoruna eklenmeden hemen önce okunur; böylece
+yalnızca daha önce oynanmış maçlar kullanılır (sızıntı yok).
+"""
+
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import config
+from api.matches import MatchAPI, season_for
+from models.persistence import ModelStore
+from models.predictor import FootballPredictor
+from models.ratings import DixonColesModel
+from utils.history import get_history_store
+from utils.team_state import (
+    FEATURE_COLUMNS, METRICS, PAIR_VIEWS, WINDOWS, TeamStateEngine, features_from_sums, kickoffs
+)
+
+# pair_state satırları
+HOME_ALL, HOME_HOME, AWAY_ALL, AWAY_AWAY = range(len(PAIR_VIEWS))
+COLUMN = {name: position for position, name in enumerate(FEATURE_COLUMNS)}
+
+
+def _goal_difference(features, side, window):
+    scored = features[:, side, COLUMN[f'goals_scored_{window}']]
+    conceded = features[:, side, COLUMN[f'goals_conceded_{window}']]
+    return scored - conceded
+
+
+# config.MODEL_FEATURES adı -> (maç, görünüm, özellik) dizisinden sütun
+MODEL_FEATURE_BUILDERS = {
+    'home_goals_avg': lambda f: f[:, HOME_HOME, COLUMN['goals_scored_avg']],
+    'away_goals_avg': lambda f: f[:, AWAY_AWAY, COLUMN['goals_scored_avg']],
+    'home_conceded_avg': lambda f: f[:, HOME_HOME, COLUMN['goals_conceded_avg']],
+    'away_conceded_avg': lambda f: f[:, AWAY_AWAY, COLUMN['goals_conceded_avg']],
+    # Ev sahibinin iç saha averajı ile genel averajı arasındaki fark
+    'home_advantage': lambda f: _goal_difference(f, HOME_HOME, 10) - _goal_difference(f, HOME_ALL, 10),
+    # Son 5 maç averaj farkı (ev - deplasman)
+    'recent_form': lambda f: _goal_difference(f, HOME_ALL, 5) - _goal_difference(f, AWAY_ALL, 5)
+}
+
+LABEL_COLUMNS = ['result', 'ht_ft', 'halftime_score', 'fulltime_score']
+
+
+class TrainingSetBuilder:
+    def __init__(self, store=None, features=None, min_history=0):
+        self.store = store
+        self.features = list(features or config.MODEL_FEATURES)
+        # Her iki takımın da en az bu kadar önceki maçı olmalı (en fazla 10)
+        self.min_history = min_history
+
+        unknown = [name for name in self.features if name not in MODEL_FEATURE_BUILDERS]
+        if unknown:
+            raise ValueError(f"Tanımsız model özellikleri: {unknown}")
+
+    def build(self, matches=None, leagues=None, seasons=None):
+        """(X, y) üret
+
+        matches verilmezse geçmiş deposu (MatchHistoryStore.to_frame)
+        kullanılır. X: config.MODEL_FEATURES sütunları, y: result ('1',
+        'X', '2'), ht_ft ('H/D' biçimi), halftime_score ve fulltime_score
+        ('2-1' biçimi). İkisi de fixture_id indekslidir, tarih sırasındadır.
+        """
+        if matches is None:
+            store = self.store or get_history_store()
+            matches = store.to_frame(leagues, seasons)
+
+        matches = matches.dropna(subset=['home_score', 'away_score'])
+        matches = matches.sort_values('date', kind='stable')
+        if matches.empty:
+            return (pd.DataFrame(columns=self.features, index=pd.Index([], name='fixture_id')),
+                    pd.DataFrame(columns=LABEL_COLUMNS, index=pd.Index([], name='fixture_id')))
+
+        fixture_ids = matches['fixture_id'].to_numpy(dtype=np.int64)
+        home_ids = matches['home_team_id'].to_numpy(dtype=np.int64)
+        away_ids = matches['away_team_id'].to_numpy(dtype=np.int64)
+        scores = [
+            matches[name].to_numpy(dtype=float, na_value=np.nan)
+            for name in ['home_score', 'away_score', 'halftime_home', 'halftime_away']
+        ]
+
+        # Tek geçiş: önce başlama anı durumu, sonra maçı duruma ekle
+        engine = TeamStateEngine(load=False)
+        count = len(fixture_ids)
+        sums = np.empty((count, len(PAIR_VIEWS), len(WINDOWS), len(METRICS)))
+        valid = np.empty(sums.shape, dtype=np.int32)
+        for i, values in enumerate(zip(fixture_ids, home_ids, away_ids, *scores, kickoffs(matches['date']))):
+            sums[i], valid[i] = engine.pair_state(values[1], values[2])
+            engine.update(*values)
+
+        views = np.tile(PAIR_VIEWS, count)
+        features = features_from_sums(
+            sums.reshape((-1,) + sums.shape[2:]), valid.reshape((-1,) + valid.shape[2:]), views
+        ).reshape(count, len(PAIR_VIEWS), len(FEATURE_COLUMNS))
+
+        index = pd.Index(fixture_ids, name='fixture_id')
+        X = pd.DataFrame({name: MODEL_FEATURE_BUILDERS[name](features) for name in self.features},
+                         index=index)
+        y = pd.DataFrame(_labels(*scores), index=index)
+
+        if self.min_history:
+            # pair_state'te 10 maçlık penceredeki skoru bilinen maç sayısı
+            long, goals_for = WINDOWS.index(10), METRICS.index('goals_for')
+            history = np.minimum(valid[:, HOME_ALL, long, goals_for], valid[:, AWAY_ALL, long, goals_for])
+            keep = history >= self.min_history
+            X, y = X[keep], y[keep]
+        return X, y
+
+
+def _labels(home_score, away_score, halftime_home, halftime_away):
+    """Skor dizilerinden etiket sütunları"""
+    def outcome(home, away, codes):
+        return np.where(home > away, codes[0], np.where(home < away, codes[2], codes[1]))
+
+    ht_known = ~(np.isnan(halftime_home) | np.isnan(halftime_away))
+    fulltime = outcome(home_score, away_score, 'HDA')
+    halftime = outcome(halftime_home, halftime_away, 'HDA')
+
+    def score(home, away):
+        return pd.Series(home).astype('Int64').astype(str) + '-' + pd.Series(away).astype('Int64').astype(str)
+
+    return {
+        'result': outcome(home_score, away_score, '1X2'),
+        'ht_ft': np.where(ht_known, np.char.add(np.char.add(halftime, '/'), fulltime), None),
+        'halftime_score': np.where(ht_known, score(halftime_home, halftime_away).to_numpy(), None),
+        'fulltime_score': score(home_score, away_score).to_numpy()
+    }
+
+
+def train_and_save(matches=None, leagues=None, seasons=None, target='result', min_history=5,
+                   model_store=None, backfill=False):
+    """Geçmişten modeli eğit, Dixon-Coles reytinglerini fit et ve yeni sürüm kaydet
+
+    backfill=True ise eğitimden önce lig/sezonların (sezon verilmezse
+    içinde bulunulan sezon) bitmiş maçları API'den geçmiş deposuna
+    çekilir. Çalışan uygulama yeni sürümü PredictorRegistry üzerinden
+    yeniden başlatma gerekmeden alır. Sürüm adını (başarısızsa None)
+    döndürür.
+    """
+    if matches is None:
+        store = get_history_store()
+        if backfill:
+            store.backfill(MatchAPI(), leagues, seasons or [season_for(datetime.now())])
+        matches = store.to_frame(leagues, seasons)
+    X, y = TrainingSetBuilder(min_history=min_history).build(matches)
+    if X.empty:
+        print("Eğitim için yeterli maç yok")
+        return None
+
+    ratings = DixonColesModel()
+    predictor = FootballPredictor(ratings=ratings if ratings.fit(matches) else None)
+    if not predictor.train(X, y[target]):
+        return None
+
+    dates = pd.to_datetime(matches.loc[matches['fixture_id'].isin(X.index), 'date'], utc=True)
+    store = model_store or ModelStore()
+    return store.save(predictor, training_window=(dates.min(), dates.max(), len(X)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modeli geçmiş maçlardan eğit')
+    parser.add_argument('--backfill', action='store_true', help='Önce bitmiş maçları API\'den çek')
+    parser.add_argument('--leagues', type=int, nargs='*', help='Lig id\'leri (varsayılan: desteklenenler)')
+    parser.add_argument('--seasons', type=int, nargs='*', help='Sezonlar (varsayılan: tümü)')
+    args = parser.parse_args()
+    version = train_and_save(leagues=args.leagues or None, seasons=args.seasons or None,
+                             backfill=args.backfill)
+    print(f"Model sürümü: {version}")
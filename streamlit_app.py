@@ -19,8 +19,14 @@ DEMO_MODE = False
 try:
     from api.matches import MatchAPI
     from api.odds import OddsAPI
+    from api.fetcher import FetchEngine
+    from api.scheduler import get_scheduler
     from utils.features import FeatureEngineer
+    from utils.history import get_history_store
+    from utils.team_state import get_team_state
+    from utils.feature_cache import get_feature_cache
     from models.predictor import FootballPredictor
+    from models.persistence import get_predictor, get_predictor_registry
     import config
 except ImportError as e:
     st.warning(f"⚠️ Bazı modüller yüklenemedi. Demo modunda çalışıyor...")
@@ -59,6 +65,15 @@ except ImportError as e:
                 'under_2_5': 2.0
             }
     
+    class FetchEngine:
+        def fetch_matches(self):
+            match_api = MatchAPI()
+            return pd.concat([match_api.get_live_matches(), match_api.get_upcoming_matches()], ignore_index=True)
+        
+        def fetch_odds(self, fixture_ids, dates=(), leagues=None):
+            odds_api = OddsAPI()
+            return {fixture_id: odds_api.get_match_odds(fixture_id) for fixture_id in fixture_ids}
+    
     class FeatureEngineer:
         def _get_default_stats(self):
             return {
@@ -234,21 +249,55 @@ if 'last_refresh' not in st.session_state:
 def load_matches():
     """Maçları yükle"""
     try:
-        match_api = MatchAPI()
-        live_matches = match_api.get_live_matches()
-        upcoming_matches = match_api.get_upcoming_matches()
-        all_matches = pd.concat([live_matches, upcoming_matches], ignore_index=True)
+        # Canlı ve yaklaşan maçlar paralel çekilir
+        all_matches = FetchEngine().fetch_matches()
+        if not DEMO_MODE:
+            # Biten maçlar geçmiş deposuna ve takım durum motoruna eklenir
+            store = get_history_store()
+            store.ingest(all_matches)
+            team_state = get_team_state()
+            # Depoda olup motora ulaşmamış tüm maçlar (bu ingest, backfill, diğer işçiler);
+            # motor, durumu değişen takımları özellik önbelleğinden kendisi düşürür
+            team_state.sync(store)
         return all_matches.head(config.MAX_MATCHES_DISPLAY)
     except Exception as e:
         st.error(f"❌ Maç verileri yüklenemedi: {e}")
         return pd.DataFrame()
 
+class DemoOddsFallback(Exception):
+    """Oran isteği demo veriye düştü; st.cache_data hata sonucunu önbelleğe almaz"""
+
+    def __init__(self, odds):
+        super().__init__('Demo oranlar')
+        self.odds = odds
+
 @st.cache_data(ttl=config.CACHE_TTL)
+def load_all_odds(fixture_ids, dates=(), leagues=None):
+    """Listedeki maçların oranlarını (gün bazında toplu) yükle
+
+    Demo orana düşen maçlar tabloda yer almaz; seçildiklerinde load_odds
+    ile yeniden denenir.
+    """
+    try:
+        return FetchEngine().fetch_odds(fixture_ids, dates, leagues)
+    except Exception as e:
+        st.warning(f"⚠️ Oran verileri yüklenemedi: {e}")
+        return {}
+
+@st.cache_data(ttl=config.CACHE_TTL)
+def fetch_cached_odds(fixture_id):
+    """Gerçek oranları önbelleğe al; demo yedek önbelleğe girmez"""
+    odds = OddsAPI().get_match_odds(fixture_id)
+    if odds.get('is_demo'):
+        raise DemoOddsFallback(odds)
+    return odds
+
 def load_odds(fixture_id):
     """Oranları yükle"""
     try:
-        odds_api = OddsAPI()
-        return odds_api.get_match_odds(fixture_id)
+        return fetch_cached_odds(fixture_id)
+    except DemoOddsFallback as e:
+        return e.odds
     except Exception as e:
         st.warning(f"⚠️ Oran verileri yüklenemedi: {e}")
         return {}
@@ -257,12 +306,22 @@ def get_match_predictions(match_row, odds_data):
     """Maç tahminlerini al"""
     try:
         feature_eng = FeatureEngineer()
-        predictor = FootballPredictor()
+        # Süreç başına bir kez yüklenen, sürümlü model
+        predictor = FootballPredictor() if DEMO_MODE else get_predictor()
         
         home_stats = feature_eng._get_default_stats()
         away_stats = feature_eng._get_default_stats()
         away_stats['home_advantage'] = -0.10
         
+        # Durum motorundaki güncel form, (takım, saha) anahtarlı önbellek üzerinden
+        if not DEMO_MODE:
+            feature_cache = get_feature_cache()
+            home_stats = feature_cache.team_features(match_row['home_team_id'], venue='home')
+            away_stats = feature_cache.team_features(match_row['away_team_id'], venue='away')
+            # Reyting modeli için takım/lig kimlikleri (önbellekteki sözlük değişmez)
+            home_stats = dict(home_stats, team_id=match_row['home_team_id'], league_id=match_row['league_id'])
+            away_stats = dict(away_stats, team_id=match_row['away_team_id'], league_id=match_row['league_id'])
+        
         predictions = {
             'halftime_fulltime': predictor.predict_halftime_fulltime(home_stats, away_stats, odds_data),
             'halftime_score': predictor.predict_halftime_score(home_stats, away_stats, odds_data),
@@ -330,6 +389,9 @@ with st.sidebar:
     
     if st.button("🔄 Verileri Yenile", use_container_width=True):
         st.cache_data.clear()
+        if not DEMO_MODE:
+            # Yeni model sürümü varsa beklemeden yükle
+            get_predictor_registry().reload()
         st.session_state.last_refresh = datetime.now()
         st.rerun()
     
@@ -337,6 +399,14 @@ with st.sidebar:
     
     if DEMO_MODE:
         st.warning("🔧 Demo Modunda Çalışıyor")
+    else:
+        quota = get_scheduler().metrics()
+        st.caption(
+            f"📡 API Kotası: {quota['day_remaining']}/{quota['day_limit']} (günlük) • "
+            f"{quota['minute_remaining']}/{quota['minute_limit']} (dakika)"
+        )
+        if quota['day_remaining'] <= 0:
+            st.error("🚫 Günlük API kotası doldu. Önbellekteki veya demo veriler gösteriliyor.")
     
     st.markdown("---")
     st.subheader("📊 Metodoloji")
@@ -374,6 +444,7 @@ with st.sidebar:
 
 # Ana içerik
 col1, col2 = st.columns([1, 2])
+all_odds = {}
 
 with col1:
     st.subheader("🏟️ Güncel Maçlar")
@@ -398,7 +469,7 @@ with col1:
                 
                 # Skor metni
                 score_text = ""
-                if match['home_score'] is not None:
+                if pd.notna(match['home_score']):
                     score_text = f"\n📊 {match['home_score']} - {match['away_score']}"
                 
                 button_label = f"{status_emoji} **{match['home_team']}** vs **{match['away_team']}**\n🏆 {match['league']} | {status_text}{score_text}"
@@ -409,6 +480,17 @@ with col1:
                     use_container_width=True
                 ):
                     st.session_state.selected_match = match
+            
+            # Maç listesi çizildikten sonra oranları önceden çek (beklemeyen
+            # ön yükleme); seçim anında ağ beklenmez
+            match_dates = tuple(sorted(
+                matches_df['date'].dt.tz_convert(config.DEFAULT_TIMEZONE).dt.strftime('%Y-%m-%d').unique()
+            )) if 'date' in matches_df.columns and not DEMO_MODE else ()
+            # Toplu yükleme yalnızca listelenen maçların liglerini ister
+            match_leagues = tuple(sorted(
+                matches_df['league_id'].dropna().astype(int).unique().tolist()
+            )) if 'league_id' in matches_df.columns and not DEMO_MODE else None
+            all_odds = load_all_odds(tuple(matches_df['fixture_id']), match_dates, match_leagues)
                     
     except Exception as e:
         st.error(f"❌ Maç verileri yüklenirken hata: {e}")
@@ -426,7 +508,7 @@ with col2:
         
         try:
             with st.spinner('🔄 Tahminler hesaplanıyor...'):
-                odds_data = load_odds(match['fixture_id'])
+                odds_data = all_odds.get(match['fixture_id']) or load_odds(match['fixture_id'])
                 predictions = get_match_predictions(match, odds_data)
             
             if predictions:
@@ -463,6 +545,19 @@ with col2:
                         with cols[idx % 3]:
                             st.markdown(render_prediction_card(pred), unsafe_allow_html=True)
                 
+                # Açılışa göre %10'dan fazla oynayan oranlar (oran geçmişinden)
+                sharp_moves = [
+                    (market, selection, move)
+                    for market, selections in (odds_data or {}).get('movement', {}).items()
+                    for selection, move in selections.items() if move['sharp']
+                ]
+                if sharp_moves:
+                    st.markdown("---")
+                    st.markdown("### 📈 Oran Hareketleri")
+                    for market, selection, move in sharp_moves:
+                        st.caption(f"{market} • {selection}: {move['opening']:.2f} → "
+                                   f"{move['current']:.2f} ({move['movement']:+.1f}%)")
+
                 # Ek bilgiler
                 st.markdown("---")
                 st.info("""
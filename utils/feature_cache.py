@@ -0,0 +1,169 @@
+"""
+Özellik önbelleği - (takım, son maç, saha, pencere) anahtarlı sınırlı LRU
+
+Streamlit her etkileşimde betiği baştan çalıştırır; takım özellikleri bu
+önbellekten okunur ve yalnızca takımın durumu değiştiğinde yeniden
+hesaplanır. Paylaşılan durum motorunun her değişikliği (sync, update,
+load, yeniden kurma) ilgili kayıtları düşürür. Bellekten taşan kayıtlar
+isteğe bağlı olarak SQLite'a yazılır.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import config
+from utils.team_state import CAPACITY, WINDOWS, get_team_state
+
+
+class FeatureCache:
+    def __init__(self, max_entries=None, spill_path=None):
+        self.max_entries = max_entries or config.FEATURE_CACHE_SIZE
+        self.spill_path = spill_path if spill_path is not None else config.FEATURE_CACHE_SPILL_PATH
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Takım başına geçersiz kılma sayacı; hesap sürerken gelen
+        # geçersiz kılmadan sonra eski değer saklanmaz
+        self._generations = {}
+        # clear() sayacı; tüm takımlar için aynı koruma
+        self._epoch = 0
+        self._stats = {'hits': 0, 'misses': 0, 'spilled': 0, 'invalidated': 0}
+
+        self._conn = None
+        if self.spill_path:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS features (
+                    key TEXT PRIMARY KEY,
+                    team_id INTEGER,
+                    value TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_features_team ON features(team_id);
+            """)
+            # Önceki süreçten kalan kayıtlar geçersiz kılmaları kaçırmış olabilir
+            self._conn.execute('DELETE FROM features')
+            self._conn.commit()
+
+    def get_or_compute(self, key, compute):
+        """Kayıt varsa döndür, yoksa compute() ile hesaplayıp sakla
+
+        key'in ilk öğesi team_id olmalıdır (geçersiz kılma için).
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key]
+
+            value = self._load_spilled(key)
+            if value is not None:
+                self._stats['hits'] += 1
+                self._store(key, value)
+                return value
+            self._stats['misses'] += 1
+            generation = (self._epoch, self._generations.get(key[0], 0))
+
+        value = compute()
+        with self._lock:
+            if (self._epoch, self._generations.get(key[0], 0)) == generation:
+                self._store(key, value)
+        return value
+
+    def team_features(self, team_id, venue=None):
+        """TeamStateEngine'in güncel özellikleri, önbellek üzerinden"""
+        engine = get_team_state()
+        # Motor takımın tüm liglerdeki formunu tek durumda tuttuğundan lig
+        # anahtarda yer almaz; tarih yerine takıma işlenmiş son maçın
+        # başlaması (as_of) kullanılır. Yeniden kurma gibi son maçı
+        # değiştirmeyen güncellemeleri motor bildirimi düşürür.
+        key = (int(team_id), engine.as_of(team_id), venue, WINDOWS, CAPACITY)
+        return self.get_or_compute(key, lambda: engine.features(team_id, venue))
+
+    def invalidate_teams(self, team_ids):
+        """Yeni maçı işlenen takımların tüm kayıtlarını düşür"""
+        team_ids = {int(team_id) for team_id in team_ids}
+        if not team_ids:
+            return
+        with self._lock:
+            for team_id in team_ids:
+                self._generations[team_id] = self._generations.get(team_id, 0) + 1
+            stale = [key for key in self._entries if key[0] in team_ids]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidated'] += len(stale)
+            if self._conn is not None:
+                self._conn.executemany('DELETE FROM features WHERE team_id = ?',
+                                       [(team_id,) for team_id in team_ids])
+                self._conn.commit()
+
+    def on_state_change(self, team_ids):
+        """TeamStateEngine dinleyicisi; None tüm önbelleği düşürür"""
+        if team_ids is None:
+            self.clear()
+        else:
+            self.invalidate_teams(team_ids)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM features')
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, old_value = self._entries.popitem(last=False)
+            self._spill(old_key, old_value)
+
+    def _spill(self, key, value):
+        """LRU'dan düşen kaydı diske yaz (spill kapalıysa at)"""
+        if self._conn is None:
+            return
+        self._conn.execute(
+            'INSERT OR REPLACE INTO features (key, team_id, value) VALUES (?, ?, ?)',
+            (json.dumps(key), key[0], json.dumps(value))
+        )
+        self._conn.commit()
+        self._stats['spilled'] += 1
+
+    def _load_spilled(self, key):
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            'SELECT value FROM features WHERE key = ?', (json.dumps(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute('DELETE FROM features WHERE key = ?', (json.dumps(key),))
+        return json.loads(row[0])
+
+
+_feature_cache = None
+_feature_cache_lock = threading.Lock()
+
+
+def get_feature_cache():
+    """Süreç genelinde paylaşılan FeatureCache örneği"""
+    global _feature_cache
+    if _feature_cache is None:
+        with _feature_cache_lock:
+            if _feature_cache is None:
+                cache = FeatureCache()
+                get_team_state().add_listener(cache.on_state_change)
+                _feature_cache = cache
+    return _feature_cache
@@ -36,17 +36,105 @@ class FeatureEngineer:
             'home_advantage': 0.15 if is_home else -0.10
         }
         
+        # FootballPredictor'ın okuduğu özet anahtarlar
+        stats['goals_scored_avg'] = stats['goals_scored_10']
+        stats['goals_conceded_avg'] = stats['goals_conceded_10']
+        stats['first_half_goals_avg'] = stats['ht_goals_scored_5']
+        
         return stats
     
+    def calculate_all_team_stats(self, matches, venue=None):
+        """Tüm takımların istatistiklerini tek seferde hesapla
+
+        matches: maç tablosu (home_team_id, away_team_id, date, home_score,
+        away_score, halftime_home, halftime_away). venue: 'home' yalnızca iç
+        saha, 'away' yalnızca deplasman, None tüm maçlar. Her takımın son 5
+        ve son 10 maçı takım bakışından (atılan/yenilen) gruplu toplamlarla
+        hesaplanır; takım başına Python döngüsü yoktur. Dönen tablo team_id
+        indeksli, sütunları calculate_team_stats anahtarlarıdır.
+        """
+        columns = list(self._get_default_stats()) + [
+            'goals_scored_avg', 'goals_conceded_avg', 'first_half_goals_avg'
+        ]
+        if matches.empty:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='team_id'), dtype=float)
+        
+        home_ids = matches['home_team_id'].to_numpy(dtype=np.int64)
+        away_ids = matches['away_team_id'].to_numpy(dtype=np.int64)
+        dates = pd.DatetimeIndex(matches['date']).asi8
+        scores = {
+            column: matches[column].to_numpy(dtype=float, na_value=np.nan)
+            for column in ['home_score', 'away_score', 'halftime_home', 'halftime_away']
+        }
+        
+        # Takım bakışı: ev sahibi satırları ardından deplasman satırları
+        sides = []
+        if venue != 'away':
+            sides.append((home_ids, scores['home_score'], scores['away_score'],
+                          scores['halftime_home'], scores['halftime_away']))
+        if venue != 'home':
+            sides.append((away_ids, scores['away_score'], scores['home_score'],
+                          scores['halftime_away'], scores['halftime_home']))
+        team_ids, goals_for, goals_against, ht_for, ht_against = (
+            np.concatenate(values) for values in zip(*sides)
+        )
+        dates = np.tile(dates, len(sides))
+        
+        # Takım, sonra tarih sırası; her satırın grubun sonundan uzaklığı
+        order = np.lexsort((dates, team_ids))
+        team_ids = team_ids[order]
+        first = np.concatenate(([True], team_ids[1:] != team_ids[:-1]))
+        starts = np.flatnonzero(first)
+        teams = team_ids[starts]
+        counts = np.diff(np.append(starts, len(team_ids)))
+        group = np.cumsum(first) - 1
+        from_end = counts[group] - 1 - (np.arange(len(group)) - starts[group])
+        recent_5 = from_end < 5
+        recent_10 = from_end < 10
+        
+        def mean(values, window, default):
+            values = values[order]
+            valid = window & ~np.isnan(values)
+            totals = np.bincount(group, weights=np.where(valid, values, 0.0), minlength=len(teams))
+            sizes = np.bincount(group, weights=valid, minlength=len(teams))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(sizes > 0, totals / sizes, default)
+        
+        def share(flags, window):
+            hits = np.bincount(group, weights=window & flags[order], minlength=len(teams))
+            return hits / np.bincount(group, weights=window, minlength=len(teams))
+        
+        with np.errstate(invalid='ignore'):
+            ht_lead = ht_for > ht_against
+            ht_draw = ht_for == ht_against
+        
+        goals_scored_10 = mean(goals_for, recent_10, 1.2)
+        goals_conceded_10 = mean(goals_against, recent_10, 1.2)
+        ht_goals_scored_5 = mean(ht_for, recent_5, 0.6)
+        values = np.column_stack([
+            mean(goals_for, recent_5, 1.2),
+            mean(goals_against, recent_5, 1.2),
+            ht_goals_scored_5,
+            mean(ht_against, recent_5, 0.6),
+            goals_scored_10,
+            goals_conceded_10,
+            share(ht_lead, recent_10),
+            share(ht_draw, recent_10),
+            np.full(len(teams), 0.15 if venue != 'away' else -0.10),
+            # FootballPredictor'ın okuduğu özet anahtarlar
+            goals_scored_10,
+            goals_conceded_10,
+            ht_goals_scored_5
+        ])
+        return pd.DataFrame(values, index=pd.Index(teams, name='team_id'), columns=columns)
+    
     def _calculate_avg_goals(self, matches, team_name, is_home, scored=True):
         """Ortalama gol hesapla"""
         if matches.empty:
             return 1.2
         
-        if is_home:
-            goals = matches['home_score'] if scored else matches['away_score']
-        else:
-            goals = matches['away_score'] if scored else matches['home_score']
+        goals_for, goals_against, _, _ = self._perspective(matches, team_name, is_home)
+        goals = goals_for if scored else goals_against
         
         return goals.mean() if not goals.isna().all() else 1.2
     
@@ -55,10 +143,8 @@ class FeatureEngineer:
         if matches.empty:
             return 0.6
         
-        if is_home:
-            goals = matches['halftime_home'] if scored else matches['halftime_away']
-        else:
-            goals = matches['halftime_away'] if scored else matches['halftime_home']
+        _, _, ht_for, ht_against = self._perspective(matches, team_name, is_home)
+        goals = ht_for if scored else ht_against
         
         valid_goals = goals.dropna()
         return valid_goals.mean() if not valid_goals.empty else 0.6
@@ -68,10 +154,8 @@ class FeatureEngineer:
         if matches.empty:
             return 0.3
         
-        if is_home:
-            leads = (matches['halftime_home'] > matches['halftime_away']).sum()
-        else:
-            leads = (matches['halftime_away'] > matches['halftime_home']).sum()
+        _, _, ht_for, ht_against = self._perspective(matches, team_name, is_home)
+        leads = (ht_for > ht_against).sum()
         
         return leads / len(matches) if len(matches) > 0 else 0.3
     
@@ -83,6 +167,37 @@ class FeatureEngineer:
         draws = (matches['halftime_home'] == matches['halftime_away']).sum()
         return draws / len(matches) if len(matches) > 0 else 0.35
     
+    def _perspective(self, matches, team_name, is_home):
+        """Takım bakışı (atılan, yenilen, İY atılan, İY yenilen) sütunları
+
+        Tablo goals_for/goals_against taşıyorsa (MatchHistoryStore.team_matches)
+        doğrudan onlar kullanılır. Aksi
+        halde takımın her satırdaki tarafı team_name (ad veya id) ile
+        bulunur; takım tabloda yoksa tüm satırlar is_home tarafında sayılır.
+        """
+        if 'goals_for' in matches:
+            return (matches['goals_for'], matches['goals_against'],
+                    matches['ht_for'], matches['ht_against'])
+        
+        home_side = self._home_side(matches, team_name, is_home)
+        
+        def pick(home_column, away_column):
+            return matches[home_column].where(home_side, matches[away_column])
+        
+        return (pick('home_score', 'away_score'), pick('away_score', 'home_score'),
+                pick('halftime_home', 'halftime_away'), pick('halftime_away', 'halftime_home'))
+    
+    def _home_side(self, matches, team_name, is_home):
+        """Takımın ev sahibi olduğu satırlar"""
+        if team_name is not None:
+            column = 'home_team_id' if isinstance(team_name, (int, np.integer)) else 'home_team'
+            other = column.replace('home', 'away')
+            if column in matches and other in matches:
+                home_side = matches[column] == team_name
+                if (home_side | (matches[other] == team_name)).any():
+                    return home_side
+        return pd.Series(bool(is_home), index=matches.index)
+    
     def _get_default_stats(self):
         """Varsayılan istatistikler"""
         return {
@@ -110,4 +225,5 @@ class FeatureEngineer:
             features['odds_movement'] = movement
             features['sharp_money_signal'] = abs(movement) > 10
         
-        return features
\ No newline at end of file
+        return features
+
@@ -0,0 +1,392 @@
+"""
+Geçmiş maç deposu - lig/sezon bölümlü, bellek eşlemeli NumPy sütunları
+
+Her bölüm (league=<id>/season=<yıl>) iki tablo tutar:
+  - Maç tablosu: tarih sırasına göre maç başına bir satır
+  - Takım tablosu (team_*): maç başına iki satır (ev ve deplasman bakışı),
+    takım, saha (önce deplasman, sonra iç saha) ve tarihe göre sıralı.
+    team_offsets[2i], [2i+1] ve [2i+2], i. takımın deplasman bloğunun
+    başı, iç saha bloğunun başı ve bitişidir; takımın deplasman, iç saha
+    ve tüm maçları kopyasız okunabilen bitişik birer dilimdir.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+import config
+from api.cache import FINISHED_STATUSES
+
+# Maç tablosu sütunları ve disk tipleri (-1 = eksik skor)
+MATCH_DTYPES = {
+    'fixture_id': np.int64,
+    'date': 'datetime64[ns]',
+    'home_team_id': np.int32,
+    'away_team_id': np.int32,
+    'home_score': np.int8,
+    'away_score': np.int8,
+    'halftime_home': np.int8,
+    'halftime_away': np.int8
+}
+
+# Takım bakışı tablosu sütunları
+TEAM_DTYPES = {
+    'team_id': np.int32,
+    'opponent_id': np.int32,
+    'is_home': np.bool_,
+    'date': 'datetime64[ns]',
+    'fixture_id': np.int64,
+    'goals_for': np.int8,
+    'goals_against': np.int8,
+    'ht_for': np.int8,
+    'ht_against': np.int8
+}
+
+
+class MatchHistoryStore:
+    def __init__(self, root=None):
+        self.root = root or config.HISTORY_DIR
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._partitions = {}
+        self._teams = self._load_teams()
+
+    def ingest(self, matches):
+        """Bitmiş maçları ilgili bölümlere yaz
+
+        MatchAPI çıktısı biçiminde DataFrame alır; bitmemiş maçlar atlanır.
+        Depoda aynı değerlerle bulunan maçlar yazılmaz; yalnızca yeni veya
+        değişmiş maç içeren bölümler yeniden yazılır. Bu maçlarla etkilenen
+        takım id'lerinin kümesini döndürür.
+        """
+        if matches.empty:
+            return set()
+
+        finished = matches[matches['status'].astype(str).isin(FINISHED_STATUSES)]
+        finished = finished.dropna(subset=['home_score', 'away_score'])
+        if finished.empty:
+            return set()
+
+        affected = set()
+        with self._lock:
+            names = {}
+            for row in finished[['home_team_id', 'home_team', 'away_team_id', 'away_team']].itertuples(index=False):
+                names[int(row.home_team_id)] = row.home_team
+                names[int(row.away_team_id)] = row.away_team
+            if any(self._teams.get(team_id) != name for team_id, name in names.items()):
+                self._teams.update(names)
+                self._save_teams()
+
+            for (league_id, season), group in finished.groupby(['league_id', 'season']):
+                columns = _to_match_columns(group)
+                changed = self._changed_rows(int(league_id), int(season), columns)
+                if not changed.any():
+                    continue
+                columns = {name: values[changed] for name, values in columns.items()}
+                self._write_partition(int(league_id), int(season), columns)
+                affected.update(columns['home_team_id'].tolist())
+                affected.update(columns['away_team_id'].tolist())
+
+        return affected
+
+    def backfill(self, match_api, leagues=None, seasons=()):
+        """Lig/sezonların bitmiş maçlarını API'den çekip depoya yaz"""
+        leagues = leagues or config.SUPPORTED_LEAGUES
+        teams = set()
+        for league_id in leagues:
+            for season in seasons:
+                teams |= self.ingest(match_api.get_season_matches(league_id, season))
+        return teams
+
+    def partitions(self):
+        """Mevcut (league_id, season) bölümleri"""
+        result = []
+        for league_dir in sorted(os.listdir(self.root)):
+            if not league_dir.startswith('league='):
+                continue
+            for season_dir in sorted(os.listdir(os.path.join(self.root, league_dir))):
+                if season_dir.startswith('season=') and '.' not in season_dir:
+                    result.append((int(league_dir[7:]), int(season_dir[7:])))
+        return result
+
+    def load_partition(self, league_id, season):
+        """Bölüm sütunlarını salt okunur memmap olarak yükle"""
+        path = self._partition_path(league_id, season)
+        marker = os.path.join(path, 'fixture_id.npy')
+        if not os.path.exists(marker):
+            return None
+
+        version = os.stat(marker).st_mtime_ns
+        cached = self._partitions.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in MATCH_DTYPES
+        }
+        for name in TEAM_DTYPES:
+            columns[f'team_{name}'] = np.load(os.path.join(path, f'team_{name}.npy'), mmap_mode='r')
+        columns['team_ids'] = np.load(os.path.join(path, 'team_ids.npy'), mmap_mode='r')
+        columns['team_offsets'] = np.load(os.path.join(path, 'team_offsets.npy'), mmap_mode='r')
+        if len(columns['team_offsets']) != 2 * len(columns['team_ids']) + 1:
+            # Saha blokları olmayan eski biçim: takım tablosunu bellekte yeniden kur
+            team_columns, columns['team_ids'], columns['team_offsets'] = _build_team_table(
+                {name: np.asarray(columns[name]) for name in MATCH_DTYPES}
+            )
+            columns.update({f'team_{name}': values for name, values in team_columns.items()})
+
+        self._partitions[path] = (version, columns)
+        return columns
+
+    def team_slice(self, team, league_id, season, venue=None):
+        """Takımın bir bölümdeki maçları: takım tablosu üzerinde kopyasız görünümler
+
+        venue 'home' veya 'away' ise o saha bloğu tarih sırasındadır; None
+        ise iki blok birlikte döner (deplasman, sonra iç saha).
+        """
+        columns = self.load_partition(league_id, season)
+        if columns is None:
+            return None
+
+        team_id = self.resolve_team(team)
+        team_ids = columns['team_ids']
+        position = np.searchsorted(team_ids, team_id)
+        if position >= len(team_ids) or team_ids[position] != team_id:
+            return None
+
+        offsets = columns['team_offsets']
+        start = offsets[2 * position + (1 if venue == 'home' else 0)]
+        end = offsets[2 * position + (1 if venue == 'away' else 2)]
+        return {name: columns[f'team_{name}'][start:end] for name in TEAM_DTYPES}
+
+    def team_matches(self, team, venue=None, leagues=None, seasons=None, limit=None):
+        """Takımın maçları, en yeniden eskiye
+
+        venue: 'home', 'away' veya None (tümü). Dönen tablo FeatureEngineer
+        ile uyumlu maç düzenini (home_score, halftime_home, ...) ve takım
+        bakışı sütunlarını (goals_for, goals_against, ...) birlikte taşır.
+        """
+        slices = []
+        for league_id, season in self.partitions():
+            if leagues is not None and league_id not in leagues:
+                continue
+            if seasons is not None and season not in seasons:
+                continue
+            team_slice = self.team_slice(team, league_id, season, venue)
+            if team_slice is not None and len(team_slice['fixture_id']):
+                slices.append((league_id, season, team_slice))
+
+        if not slices:
+            return pd.DataFrame(columns=['date', 'fixture_id', 'league_id', 'season', 'is_home',
+                                         'home_score', 'away_score', 'halftime_home', 'halftime_away',
+                                         'goals_for', 'goals_against', 'ht_for', 'ht_against'])
+
+        data = {
+            name: np.concatenate([team_slice[name] for _, _, team_slice in slices])
+            for name in TEAM_DTYPES
+        }
+        data['league_id'] = np.concatenate([
+            np.full(len(team_slice['fixture_id']), league_id, dtype=np.int32)
+            for league_id, _, team_slice in slices
+        ])
+        data['season'] = np.concatenate([
+            np.full(len(team_slice['fixture_id']), season, dtype=np.int16)
+            for _, season, team_slice in slices
+        ])
+
+        if venue is not None and len(slices) == 1:
+            # Tek saha bloğu zaten tarih sırasında
+            order = np.arange(len(data['date']))[::-1]
+        else:
+            order = np.argsort(data['date'], kind='stable')[::-1]
+        if limit is not None:
+            order = order[:limit]
+        data = {name: values[order] for name, values in data.items()}
+
+        is_home = data['is_home']
+        frame = pd.DataFrame({
+            'date': pd.to_datetime(data['date'], utc=True),
+            'fixture_id': data['fixture_id'],
+            'league_id': data['league_id'],
+            'season': data['season'],
+            'is_home': is_home,
+            'home_score': _nullable(np.where(is_home, data['goals_for'], data['goals_against'])),
+            'away_score': _nullable(np.where(is_home, data['goals_against'], data['goals_for'])),
+            'halftime_home': _nullable(np.where(is_home, data['ht_for'], data['ht_against'])),
+            'halftime_away': _nullable(np.where(is_home, data['ht_against'], data['ht_for'])),
+            'goals_for': _nullable(data['goals_for']),
+            'goals_against': _nullable(data['goals_against']),
+            'ht_for': _nullable(data['ht_for']),
+            'ht_against': _nullable(data['ht_against'])
+        })
+        return frame
+
+    def to_frame(self, leagues=None, seasons=None):
+        """Seçili bölümlerin maç tablolarını tek DataFrame'de birleştir"""
+        frames = []
+        for league_id, season in self.partitions():
+            if leagues is not None and league_id not in leagues:
+                continue
+            if seasons is not None and season not in seasons:
+                continue
+            columns = self.load_partition(league_id, season)
+            frame = pd.DataFrame({name: np.asarray(columns[name]) for name in MATCH_DTYPES})
+            frame.insert(1, 'league_id', np.int32(league_id))
+            frame.insert(2, 'season', np.int16(season))
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['fixture_id', 'league_id', 'season'] + list(MATCH_DTYPES)[1:])
+
+        frame = pd.concat(frames, ignore_index=True).sort_values('date', kind='stable')
+        for name in ['home_score', 'away_score', 'halftime_home', 'halftime_away']:
+            frame[name] = _nullable(frame[name].to_numpy())
+        frame['date'] = frame['date'].dt.tz_localize('UTC')
+        return frame.reset_index(drop=True)
+
+    def resolve_team(self, team):
+        """Takım adı veya id'sinden id"""
+        if isinstance(team, (int, np.integer)):
+            return int(team)
+        for team_id, name in self._teams.items():
+            if name == team:
+                return team_id
+        return -1
+
+    def team_name(self, team_id):
+        return self._teams.get(int(team_id))
+
+    def _changed_rows(self, league_id, season, columns):
+        """Bölümde olmayan veya değerleri farklı gelen maçların maskesi"""
+        existing = self.load_partition(league_id, season)
+        if existing is None or len(existing['fixture_id']) == 0:
+            return np.ones(len(columns['fixture_id']), dtype=bool)
+
+        existing_ids = np.asarray(existing['fixture_id'])
+        order = np.argsort(existing_ids, kind='stable')
+        positions = np.searchsorted(existing_ids, columns['fixture_id'], sorter=order)
+        rows = order[np.minimum(positions, len(order) - 1)]
+        changed = existing_ids[rows] != columns['fixture_id']
+        for name in MATCH_DTYPES:
+            changed |= np.asarray(existing[name])[rows] != columns[name]
+        return changed
+
+    def _write_partition(self, league_id, season, new_columns):
+        path = self._partition_path(league_id, season)
+        existing = self.load_partition(league_id, season)
+
+        if existing is not None:
+            keep = ~np.isin(existing['fixture_id'], new_columns['fixture_id'])
+            columns = {
+                name: np.concatenate([np.asarray(existing[name])[keep], new_columns[name]])
+                for name in MATCH_DTYPES
+            }
+        else:
+            columns = new_columns
+
+        order = np.argsort(columns['date'], kind='stable')
+        columns = {name: values[order] for name, values in columns.items()}
+        team_columns, team_ids, team_offsets = _build_team_table(columns)
+
+        # Yeni bölümü geçici dizine yaz, sonra yerine taşı
+        staging = f'{path}.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name, values in columns.items():
+            np.save(os.path.join(staging, f'{name}.npy'), values)
+        for name, values in team_columns.items():
+            np.save(os.path.join(staging, f'team_{name}.npy'), values)
+        np.save(os.path.join(staging, 'team_ids.npy'), team_ids)
+        np.save(os.path.join(staging, 'team_offsets.npy'), team_offsets)
+
+        retired = f'{path}.old'
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, retired)
+        os.replace(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+        self._partitions.pop(path, None)
+
+    def _partition_path(self, league_id, season):
+        return os.path.join(self.root, f'league={league_id}', f'season={season}')
+
+    def _load_teams(self):
+        path = os.path.join(self.root, 'teams.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return {int(team_id): name for team_id, name in json.load(f).items()}
+
+    def _save_teams(self):
+        path = os.path.join(self.root, 'teams.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._teams, f, ensure_ascii=False)
+        os.replace(f'{path}.tmp', path)
+
+
+def _to_match_columns(matches):
+    """MatchAPI DataFrame'inden disk sütunları"""
+    dates = pd.to_datetime(matches['date'], utc=True).dt.tz_localize(None)
+    columns = {
+        'fixture_id': matches['fixture_id'].to_numpy(dtype=np.int64),
+        'date': dates.to_numpy(dtype='datetime64[ns]'),
+        'home_team_id': matches['home_team_id'].to_numpy(dtype=np.int32),
+        'away_team_id': matches['away_team_id'].to_numpy(dtype=np.int32)
+    }
+    for name in ['home_score', 'away_score', 'halftime_home', 'halftime_away']:
+        columns[name] = matches[name].astype('float').fillna(-1).to_numpy(dtype=np.int8)
+    return columns
+
+
+def _build_team_table(columns):
+    """Maç başına iki satırlı, takım+saha+tarih sıralı tablo ve saha blok ofsetleri"""
+    n = len(columns['fixture_id'])
+    team_columns = {
+        'team_id': np.concatenate([columns['home_team_id'], columns['away_team_id']]),
+        'opponent_id': np.concatenate([columns['away_team_id'], columns['home_team_id']]),
+        'is_home': np.concatenate([np.ones(n, dtype=np.bool_), np.zeros(n, dtype=np.bool_)]),
+        'date': np.concatenate([columns['date'], columns['date']]),
+        'fixture_id': np.concatenate([columns['fixture_id'], columns['fixture_id']]),
+        'goals_for': np.concatenate([columns['home_score'], columns['away_score']]),
+        'goals_against': np.concatenate([columns['away_score'], columns['home_score']]),
+        'ht_for': np.concatenate([columns['halftime_home'], columns['halftime_away']]),
+        'ht_against': np.concatenate([columns['halftime_away'], columns['halftime_home']])
+    }
+
+    order = np.lexsort((team_columns['date'], team_columns['is_home'], team_columns['team_id']))
+    team_columns = {name: values[order] for name, values in team_columns.items()}
+
+    team_ids, starts = np.unique(team_columns['team_id'], return_index=True)
+    # Takım bloğunda ilk iç saha satırı: (takım, saha) anahtarında takım*2+1
+    keys = team_columns['team_id'].astype(np.int64) * 2 + team_columns['is_home']
+    home_starts = np.searchsorted(keys, team_ids.astype(np.int64) * 2 + 1)
+    team_offsets = np.empty(2 * len(team_ids) + 1, dtype=np.int64)
+    team_offsets[0:-1:2] = starts
+    team_offsets[1::2] = home_starts
+    team_offsets[-1] = len(keys)
+    return team_columns, team_ids.astype(np.int32), team_offsets
+
+
+def _nullable(values):
+    """-1 işaretli int8 diziyi nullable Int8'e çevir"""
+    values = np.asarray(values)
+    return pd.arrays.IntegerArray(values.astype(np.int8), values < 0)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Süreç genelinde paylaşılan MatchHistoryStore örneği"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MatchHistoryStore()
+    return _store
@@ -0,0 +1,245 @@
+"""
+Oran geçmişi - maç/pazar/seçim başına dizi tabanlı halka tampon
+
+Her (fixture_id, market, selection) serisi sabit kapasiteli bir satırdır.
+Açılış, güncel, en düşük ve en yüksek fiyat ayrı dizilerde tutulduğundan
+O(1) okunur; fiyat değiştiğinde yeni gözlem halka tampona yazılır.
+Son gözlemi ODDS_HISTORY_RETENTION'dan eski maçlar (oran verilmeyen,
+bitmiş maçlar) diske yazmadan önce atılır.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+
+SERIES_ARRAYS = ['_prices', '_times', '_opening', '_min', '_max', '_head', '_count']
+
+
+class OddsHistory:
+    def __init__(self, path=None, capacity=None):
+        self.path = path or config.ODDS_HISTORY_PATH
+        self.capacity = capacity or config.ODDS_HISTORY_CAPACITY
+        self._lock = threading.Lock()
+        self._index = {}
+        self._keys = []
+        self._allocate(256)
+        self._saved_at = time.time()
+
+        if os.path.exists(self.path):
+            self.load()
+
+    def record(self, fixture_id, odds, timestamp=None):
+        """Bir maçın ayrıştırılmış oranlarını anlık görüntü olarak ekle
+
+        odds: {market: {selection: fiyat}}. Fiyatı değişmeyen seriler için
+        yeni gözlem yazılmaz.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for market, selections in odds.items():
+                if not isinstance(selections, dict):
+                    continue
+                for selection, price in selections.items():
+                    if not isinstance(price, (int, float)):
+                        continue
+                    self._append((int(fixture_id), market, str(selection)), float(price), timestamp)
+
+    def record_many(self, odds_table, timestamp=None):
+        """fixture_id -> oranlar tablosunu kaydet, gerekirse diske yaz"""
+        for fixture_id, odds in odds_table.items():
+            self.record(fixture_id, odds, timestamp)
+        self.maybe_save()
+
+    def opening(self, fixture_id, market, selection):
+        row = self._index.get((int(fixture_id), market, str(selection)))
+        return None if row is None else float(self._opening[row])
+
+    def current(self, fixture_id, market, selection):
+        row = self._index.get((int(fixture_id), market, str(selection)))
+        if row is None:
+            return None
+        return float(self._prices[row, (self._head[row] - 1) % self.capacity])
+
+    def price_range(self, fixture_id, market, selection):
+        """(en düşük, en yüksek) fiyat"""
+        row = self._index.get((int(fixture_id), market, str(selection)))
+        if row is None:
+            return None
+        return float(self._min[row]), float(self._max[row])
+
+    def series(self, fixture_id, market, selection):
+        """Tampondaki gözlemler, eskiden yeniye (zaman, fiyat)"""
+        row = self._index.get((int(fixture_id), market, str(selection)))
+        if row is None:
+            return np.empty(0), np.empty(0, dtype=np.float32)
+        count = self._count[row]
+        order = (self._head[row] - count + np.arange(count)) % self.capacity
+        return self._times[row, order], self._prices[row, order]
+
+    def movement_table(self, fixture_ids=None):
+        """Seriler için açılış/güncel/min/max ve hareket, vektörel
+
+        Hareket FeatureEngineer.calculate_odds_features ile aynı tanımdadır:
+        açılışa göre yüzde düşüş, %10'u aşarsa sharp_money_signal.
+        """
+        with self._lock:
+            rows = len(self._keys)
+            keys = self._keys[:rows]
+            fixtures = np.array([key[0] for key in keys], dtype=np.int64)
+            selected = (np.ones(rows, dtype=bool) if fixture_ids is None
+                        else np.isin(fixtures, np.fromiter(fixture_ids, dtype=np.int64)))
+            positions = np.flatnonzero(selected)
+            current = self._prices[positions, (self._head[positions] - 1) % self.capacity]
+            opening = self._opening[positions]
+            minimum, maximum = self._min[positions], self._max[positions]
+            observations = self._count[positions]
+
+        movement = (opening - current) / opening * 100
+        return pd.DataFrame({
+            'fixture_id': fixtures[positions],
+            'market': pd.Categorical([keys[row][1] for row in positions]),
+            'selection': [keys[row][2] for row in positions],
+            'opening_odds': opening,
+            'current_odds': current,
+            'min_odds': minimum,
+            'max_odds': maximum,
+            'observations': observations,
+            'odds_movement': movement,
+            'sharp_money_signal': np.abs(movement) > 10
+        })
+
+    def prune(self, now=None):
+        """Son gözlemi ODDS_HISTORY_RETENTION'dan eski maçların serilerini at
+
+        Oranlar yalnızca maç bitene kadar verilir; bu süre boyunca yeni
+        gözlem gelmeyen maç bitmiş sayılır. Atılan satır sayısını döndürür.
+        """
+        cutoff = (time.time() if now is None else now) - config.ODDS_HISTORY_RETENTION
+        with self._lock:
+            rows = len(self._keys)
+            if rows == 0:
+                return 0
+            latest = self._times[np.arange(rows), (self._head[:rows] - 1) % self.capacity]
+            fixtures = np.array([key[0] for key in self._keys], dtype=np.int64)
+            # Maçın tüm serilerindeki en yeni gözlem
+            unique, inverse = np.unique(fixtures, return_inverse=True)
+            fixture_latest = np.full(len(unique), -np.inf)
+            np.maximum.at(fixture_latest, inverse, latest)
+            keep = fixture_latest[inverse] >= cutoff
+            if keep.all():
+                return 0
+
+            old = {name: getattr(self, name)[:rows][keep] for name in SERIES_ARRAYS}
+            self._keys = [key for key, kept in zip(self._keys, keep) if kept]
+            self._index = {key: row for row, key in enumerate(self._keys)}
+            self._allocate(max(256, len(self._keys)))
+            for name, values in old.items():
+                getattr(self, name)[:len(values)] = values
+            return int(rows - keep.sum())
+
+    def maybe_save(self):
+        """ODDS_HISTORY_SAVE_INTERVAL geçtiyse diske yaz"""
+        if time.time() - self._saved_at >= config.ODDS_HISTORY_SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        self.prune()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            rows = len(self._keys)
+            tmp_path = f'{self.path}.tmp.npz'
+            np.savez(
+                tmp_path,
+                fixture_ids=np.array([key[0] for key in self._keys], dtype=np.int64),
+                markets=np.array([key[1] for key in self._keys], dtype=str),
+                selections=np.array([key[2] for key in self._keys], dtype=str),
+                prices=self._prices[:rows],
+                times=self._times[:rows],
+                opening=self._opening[:rows],
+                minimum=self._min[:rows],
+                maximum=self._max[:rows],
+                head=self._head[:rows],
+                count=self._count[:rows]
+            )
+            os.replace(tmp_path, self.path)
+            self._saved_at = time.time()
+
+    def load(self):
+        with np.load(self.path) as data:
+            keys = list(zip(data['fixture_ids'].tolist(), data['markets'].tolist(),
+                            data['selections'].tolist()))
+            rows = len(keys)
+            stored_capacity = data['prices'].shape[1] if rows else self.capacity
+
+            with self._lock:
+                self.capacity = stored_capacity
+                self._allocate(max(256, rows))
+                self._keys = keys
+                self._index = {key: row for row, key in enumerate(keys)}
+                self._prices[:rows] = data['prices']
+                self._times[:rows] = data['times']
+                self._opening[:rows] = data['opening']
+                self._min[:rows] = data['minimum']
+                self._max[:rows] = data['maximum']
+                self._head[:rows] = data['head']
+                self._count[:rows] = data['count']
+
+    def _append(self, key, price, timestamp):
+        row = self._index.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row >= len(self._opening):
+                self._grow()
+            self._index[key] = row
+            self._keys.append(key)
+            self._opening[row] = price
+            self._min[row] = price
+            self._max[row] = price
+        elif self._prices[row, (self._head[row] - 1) % self.capacity] == np.float32(price):
+            return
+
+        position = self._head[row]
+        self._prices[row, position] = price
+        self._times[row, position] = timestamp
+        self._head[row] = (position + 1) % self.capacity
+        self._count[row] = min(self._count[row] + 1, self.capacity)
+        self._min[row] = min(self._min[row], price)
+        self._max[row] = max(self._max[row], price)
+
+    def _allocate(self, rows):
+        self._prices = np.zeros((rows, self.capacity), dtype=np.float32)
+        self._times = np.zeros((rows, self.capacity), dtype=np.float64)
+        self._opening = np.zeros(rows, dtype=np.float32)
+        self._min = np.zeros(rows, dtype=np.float32)
+        self._max = np.zeros(rows, dtype=np.float32)
+        self._head = np.zeros(rows, dtype=np.int32)
+        self._count = np.zeros(rows, dtype=np.int32)
+
+    def _grow(self):
+        """Satır kapasitesini ikiye katla"""
+        old = {name: getattr(self, name) for name in SERIES_ARRAYS}
+        self._allocate(len(self._opening) * 2)
+        for name, values in old.items():
+            getattr(self, name)[:len(values)] = values
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_odds_history():
+    """Süreç genelinde paylaşılan OddsHistory örneği"""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = OddsHistory()
+    return _history
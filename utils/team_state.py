@@ -0,0 +1,475 @@
+"""
+Takım durum motoru - biten her maçla artımlı güncellenen form özellikleri
+
+Her takımın üç görünümü (tüm maçlar, iç saha, deplasman) için son maç
+sonuçları sabit boyutlu halka tamponlarda tutulur. Son 5 ve son 10 maç
+toplamları her yeni maçta O(1) güncellenir, böylece calculate_team_stats
+özellikleri yeniden hesaplama yapmadan O(1) okunur. Durum diske yazılır;
+yeniden başlatmada baştan oynatma gerekmez.
+
+Maçlar her takım için başlama sırasıyla işlenmelidir. Takımın son
+maçından önce başlamış bir maç gelirse (geç gelen, geriye dönük
+doldurulan) o takım geçmiş deposundan yeniden kurulur; depo verilmezse
+maç reddedilir.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from api.cache import FINISHED_STATUSES
+from utils.features import FeatureEngineer
+
+VIEWS = {None: 0, 'home': 1, 'away': 2}
+# Tampondaki her maç için takım bakışı değerleri
+METRICS = ['goals_for', 'goals_against', 'ht_for', 'ht_against', 'ht_lead', 'ht_draw']
+WINDOWS = (5, 10)
+WINDOW_SIZES = np.array(WINDOWS)
+CAPACITY = max(WINDOWS)
+
+# Bir maçın güncellediği görünümler: ev sahibi (tümü, iç saha), deplasman (tümü, dış saha)
+PAIR_VIEWS = np.array([VIEWS[None], VIEWS['home'], VIEWS[None], VIEWS['away']])
+# Başlama zamanı bilinmeyen (kronolojik kontrolü yapılmayan) maç
+NO_KICKOFF = np.iinfo(np.int64).min
+
+FEATURE_COLUMNS = list(FeatureEngineer()._get_default_stats()) + [
+    'goals_scored_avg', 'goals_conceded_avg', 'first_half_goals_avg'
+]
+
+
+class TeamStateEngine:
+    def __init__(self, path=None, load=True):
+        self.path = path or config.TEAM_STATE_PATH
+        self._lock = threading.Lock()
+        self._index = {}
+        self._teams = []
+        # fixture_id -> başlama (ns); yalnızca tamponlardaki en eski maçtan yeniler
+        self._fixtures = {}
+        # Durum değişince çağrılır: callback(team_ids); None tüm takımlar demek
+        self._listeners = []
+        # Son bildirimden beri tamponu değişen satırlar
+        self._changed = set()
+        self._allocate(64)
+        self._saved_at = time.time()
+
+        if load and os.path.exists(self.path):
+            self.load()
+
+    def __len__(self):
+        return len(self._teams)
+
+    def add_listener(self, callback):
+        """Durum değişikliklerinde callback(team_ids) çağrılsın
+
+        team_ids değişen takımların kümesidir; load() sonrası None (tümü).
+        Özellik önbelleği geçersiz kılma için kullanır.
+        """
+        self._listeners.append(callback)
+
+    def as_of(self, team_id):
+        """Takıma işlenmiş son maçın başlaması (ns); bilinmiyorsa NO_KICKOFF"""
+        row = self._index.get(int(team_id))
+        return NO_KICKOFF if row is None else int(self._last_kickoff[row])
+
+    def update(self, fixture_id, home_team_id, away_team_id, home_score, away_score,
+               halftime_home=np.nan, halftime_away=np.nan, kickoff=NO_KICKOFF, store=None,
+               rebuilt=None):
+        """Biten tek maçı işle - O(1)
+
+        Aynı fixture_id ikinci kez işlenmez. kickoff: başlama zamanı (UTC
+        ns). Takımın son maçından önce başlayan maçta o takım store'dan
+        (maçı zaten içeren MatchHistoryStore) yeniden kurulur; store yoksa
+        maç reddedilir. rebuilt: bu toplu işlemde depodan kurulmuş takımlar
+        (maç zaten tamponlarında); verilmezse dinleyiciler hemen
+        bilgilendirilir, verilirse toplu işlemin sonunda. Skoru olmayan maç
+        atlanır; işlendiyse True döner.
+        """
+        fixture_id = int(fixture_id)
+        kickoff = int(kickoff)
+        if np.isnan(home_score) or np.isnan(away_score):
+            return False
+
+        with self._lock:
+            if fixture_id in self._fixtures:
+                return False
+            home = self._row(int(home_team_id))
+            away = self._row(int(away_team_id))
+            # Takım aynı anda iki maç oynamaz: eşit başlama da geç sayılır
+            late = [kickoff != NO_KICKOFF and kickoff <= self._last_kickoff[row] for row in (home, away)]
+            if any(late) and store is None:
+                return False
+            self._fixtures[fixture_id] = kickoff
+            ht_known = not (np.isnan(halftime_home) or np.isnan(halftime_away))
+            home_values = [
+                home_score, away_score, halftime_home, halftime_away,
+                ht_known and halftime_home > halftime_away,
+                ht_known and halftime_home == halftime_away
+            ]
+            away_values = [
+                away_score, home_score, halftime_away, halftime_home,
+                ht_known and halftime_away > halftime_home,
+                home_values[5]
+            ]
+            pairs = np.repeat(~np.array(late), 2)
+            self._push(
+                np.array([home, home, away, away])[pairs], PAIR_VIEWS[pairs],
+                np.array([home_values, home_values, away_values, away_values], dtype=np.float64)[pairs],
+                kickoff
+            )
+            for row, team_id, is_late in [(home, int(home_team_id), late[0]),
+                                          (away, int(away_team_id), late[1])]:
+                if is_late and (rebuilt is None or team_id not in rebuilt):
+                    self._rebuild(row, team_id, store)
+                    if rebuilt is not None:
+                        rebuilt.add(team_id)
+        if rebuilt is None:
+            self._notify()
+        return True
+
+    def pair_state(self, home_team_id, away_team_id):
+        """Bir eşleşmenin şu anki pencere toplamları, maç işlenmeden önce
+
+        Dönen (sums, valid) dizileri PAIR_VIEWS sırasıyla (ev-tümü, ev-iç
+        saha, deplasman-tümü, deplasman-dış saha) 4 satırdır; eğitim
+        matrisi kurulurken başlama anı özellikleri için kullanılır.
+        """
+        home = self._index.get(int(home_team_id))
+        away = self._index.get(int(away_team_id))
+        if home is None or away is None:
+            with self._lock:
+                home = self._row(int(home_team_id))
+                away = self._row(int(away_team_id))
+        rows = np.array([home, home, away, away])
+        return self._sums[rows, PAIR_VIEWS], self._valid[rows, PAIR_VIEWS]
+
+    def update_many(self, matches, store=None):
+        """Maç tablosundaki biten maçları tarih sırasıyla işle
+
+        MatchAPI veya MatchHistoryStore.to_frame çıktısı alır; store,
+        sırası bozuk maçların takımlarını yeniden kurmak için kullanılır.
+        Etkilenen takım id'lerinin kümesini döndürür.
+        """
+        if matches.empty:
+            return set()
+        if 'status' in matches:
+            matches = matches[matches['status'].astype(str).isin(FINISHED_STATUSES)]
+        matches = matches.sort_values('date', kind='stable')
+
+        columns = [matches['fixture_id'].to_numpy(dtype=np.int64),
+                   matches['home_team_id'].to_numpy(dtype=np.int64),
+                   matches['away_team_id'].to_numpy(dtype=np.int64)]
+        columns += [
+            matches[name].to_numpy(dtype=float, na_value=np.nan)
+            for name in ['home_score', 'away_score', 'halftime_home', 'halftime_away']
+        ]
+        columns.append(kickoffs(matches['date']))
+
+        affected = set()
+        rebuilt = set()
+        for values in zip(*columns):
+            if self.update(*values, store=store, rebuilt=rebuilt):
+                affected.update((int(values[1]), int(values[2])))
+        self._prune_fixtures()
+        self._notify()
+        self.maybe_save()
+        return affected
+
+    def sync(self, store):
+        """Geçmiş deposundaki, motora henüz ulaşmamış maçları işle
+
+        Bu süreçte ingest edilenler kadar geriye dönük doldurulan veya
+        başka bir işçinin yazdığı maçları da kapsar. Tamponlardaki en eski
+        maçtan önce başlayan izlenmeyen maç yalnızca penceresi dolmamış
+        takımları etkileyebilir; bu takımlar depodan yeniden kurulur.
+        Etkilenen takım id'lerinin kümesini döndürür.
+        """
+        matches = store.to_frame()
+        if matches.empty:
+            return set()
+
+        with self._lock:
+            horizon = self._horizon()
+            tracked = np.fromiter(self._fixtures, dtype=np.int64, count=len(self._fixtures))
+        untracked = ~np.isin(matches['fixture_id'].to_numpy(dtype=np.int64), tracked)
+        early = untracked & (kickoffs(matches['date']) < horizon)
+
+        affected = self.update_many(matches[untracked & ~early], store)
+        early = matches[early]
+        with self._lock:
+            for team_id in set(early['home_team_id'].astype(int)) | set(early['away_team_id'].astype(int)):
+                row = self._index.get(team_id)
+                if row is None or (self._count[row] < CAPACITY).any():
+                    self._rebuild(self._row(team_id), team_id, store)
+                    affected.add(team_id)
+            # Dolu takımların penceresine girmeyen, diğerlerinde yeniden kurulan maçlar
+            self._fixtures.update(zip(early['fixture_id'].astype(int), kickoffs(early['date']).tolist()))
+        self._prune_fixtures()
+        self._notify()
+        return affected
+
+    def features(self, team_id, venue=None):
+        """Takımın güncel özellikleri (calculate_team_stats anahtarları) - O(1)"""
+        row = self._index.get(int(team_id))
+        view = VIEWS[venue]
+        if row is None or self._count[row, view] == 0:
+            stats = FeatureEngineer()._get_default_stats()
+            stats['home_advantage'] = 0.15 if venue != 'away' else -0.10
+            stats['goals_scored_avg'] = stats['goals_scored_10']
+            stats['goals_conceded_avg'] = stats['goals_conceded_10']
+            stats['first_half_goals_avg'] = stats['ht_goals_scored_5']
+            return stats
+        return dict(zip(FEATURE_COLUMNS, self._feature_rows(np.array([row]), view)[0].tolist()))
+
+    def feature_matrix(self, team_ids=None, venue=None):
+        """Birden çok takımın özellikleri, team_id indeksli tablo"""
+        if team_ids is None:
+            team_ids = list(self._teams)
+        team_ids = [int(team_id) for team_id in team_ids]
+        view = VIEWS[venue]
+        rows = np.array([self._index.get(team_id, -1) for team_id in team_ids], dtype=np.int64)
+
+        known = rows >= 0
+        values = np.empty((len(team_ids), len(FEATURE_COLUMNS)))
+        values[:] = [self.features(-1, venue)[name] for name in FEATURE_COLUMNS]
+        if known.any():
+            played = known.copy()
+            played[known] = self._count[rows[known], view] > 0
+            values[played] = self._feature_rows(rows[played], view)
+        return pd.DataFrame(values, index=pd.Index(team_ids, name='team_id'), columns=FEATURE_COLUMNS)
+
+    def maybe_save(self):
+        """TEAM_STATE_SAVE_INTERVAL geçtiyse diske yaz"""
+        if time.time() - self._saved_at >= config.TEAM_STATE_SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            rows = len(self._teams)
+            tmp_path = f'{self.path}.tmp.npz'
+            np.savez(
+                tmp_path,
+                teams=np.array(self._teams, dtype=np.int64),
+                fixtures=np.fromiter(self._fixtures, dtype=np.int64, count=len(self._fixtures)),
+                fixture_kickoffs=np.fromiter(self._fixtures.values(), dtype=np.int64,
+                                             count=len(self._fixtures)),
+                buffer=self._buffer[:rows],
+                kickoffs=self._kickoffs[:rows],
+                last_kickoff=self._last_kickoff[:rows],
+                head=self._head[:rows],
+                count=self._count[:rows],
+                sums=self._sums[:rows],
+                valid=self._valid[:rows]
+            )
+            os.replace(tmp_path, self.path)
+            self._saved_at = time.time()
+
+    def load(self):
+        with np.load(self.path) as data:
+            teams = data['teams'].tolist()
+            rows = len(teams)
+            with self._lock:
+                self._allocate(max(64, rows))
+                self._teams = teams
+                self._index = {team_id: row for row, team_id in enumerate(teams)}
+                fixtures = data['fixtures'].tolist()
+                if 'kickoffs' in data:
+                    self._fixtures = dict(zip(fixtures, data['fixture_kickoffs'].tolist()))
+                    self._kickoffs[:rows] = data['kickoffs']
+                    self._last_kickoff[:rows] = data['last_kickoff']
+                else:
+                    # Başlama zamanları olmayan eski biçim: sıra kontrolü yapılamaz
+                    self._fixtures = dict.fromkeys(fixtures, NO_KICKOFF)
+                self._buffer[:rows] = data['buffer']
+                self._head[:rows] = data['head']
+                self._count[:rows] = data['count']
+                self._sums[:rows] = data['sums']
+                self._valid[:rows] = data['valid']
+                self._changed.clear()
+        # Tüm takımların durumu değişti
+        for callback in self._listeners:
+            callback(None)
+
+    def _feature_rows(self, rows, view):
+        """Toplamlardan özellik satırları (FEATURE_COLUMNS sırasıyla)"""
+        return features_from_sums(self._sums[rows, view], self._valid[rows, view],
+                                  np.full(len(rows), view))
+
+    def _push(self, rows, views, values, kickoff=NO_KICKOFF):
+        """(takım, görünüm) çiftlerinin halka tamponlarına yeni maçı ekle
+
+        Pencereden çıkan sonuç toplamlardan düşülür, yeni sonuç eklenir;
+        maç başına sabit sayıda dizi işlemi (O(1)). Çiftler tekil olmalıdır.
+        """
+        if len(rows) == 0:
+            return
+        slots = rows * len(VIEWS) + views
+        head = self._head.reshape(-1)
+        count = self._count.reshape(-1)
+        buffer = self._buffer.reshape(-1, len(METRICS))
+        sums = self._sums.reshape(-1, len(WINDOWS), len(METRICS))
+        valid = self._valid.reshape(-1, len(WINDOWS), len(METRICS))
+
+        heads = head[slots]
+        counts = count[slots]
+        base = slots * CAPACITY
+        leaving = buffer[base[:, None] + (heads[:, None] - WINDOW_SIZES) % CAPACITY]
+        leaving_known = ~np.isnan(leaving) & (counts[:, None] >= WINDOW_SIZES)[:, :, None]
+        known = ~np.isnan(values)
+
+        sums[slots] += np.where(known, values, 0.0)[:, None] - np.where(leaving_known, leaving, 0.0)
+        valid[slots] += known[:, None].astype(np.int32) - leaving_known
+        buffer[base + heads] = values
+        self._kickoffs.reshape(-1)[base + heads] = kickoff
+        head[slots] = (heads + 1) % CAPACITY
+        count[slots] = np.minimum(counts + 1, CAPACITY)
+        self._last_kickoff[rows] = np.maximum(self._last_kickoff[rows], kickoff)
+        self._changed.update(rows.tolist())
+
+    def _rebuild(self, row, team_id, store):
+        """Takımın tamponlarını depodaki son maçlarından yeniden kur
+
+        Her görünüm için en fazla CAPACITY maç okunur (saha blokları
+        depoda bitişik dilimlerdir). Kilit altında çağrılır.
+        """
+        self._buffer[row] = np.nan
+        self._kickoffs[row] = NO_KICKOFF
+        self._head[row] = 0
+        self._count[row] = 0
+        self._sums[row] = 0.0
+        self._valid[row] = 0
+        self._last_kickoff[row] = NO_KICKOFF
+        self._changed.add(row)
+
+        for venue, view in VIEWS.items():
+            matches = store.team_matches(team_id, venue=venue, limit=CAPACITY)
+            if matches.empty:
+                continue
+            goals_for, goals_against, ht_for, ht_against = [
+                matches[name].to_numpy(dtype=float, na_value=np.nan)[::-1]
+                for name in ['goals_for', 'goals_against', 'ht_for', 'ht_against']
+            ]
+            ht_known = ~(np.isnan(ht_for) | np.isnan(ht_against))
+            values = np.column_stack([
+                goals_for, goals_against, ht_for, ht_against,
+                ht_known & (ht_for > ht_against), ht_known & (ht_for == ht_against)
+            ])
+            for match_values, kickoff in zip(values, kickoffs(matches['date'])[::-1]):
+                self._push(np.array([row]), np.array([view]), match_values[None], int(kickoff))
+
+    def _notify(self):
+        """Son bildirimden beri değişen takımları dinleyicilere ilet"""
+        with self._lock:
+            team_ids = {self._teams[row] for row in self._changed}
+            self._changed.clear()
+        if team_ids:
+            for callback in self._listeners:
+                callback(team_ids)
+
+    def _horizon(self):
+        """Tamponlardaki en eski maçın başlaması; boş motorda NO_KICKOFF"""
+        rows = len(self._teams)
+        filled = self._count[:rows] > 0
+        if not filled.any():
+            return NO_KICKOFF
+        oldest = (self._head[:rows] - self._count[:rows]) % CAPACITY
+        team_rows, views = np.nonzero(filled)
+        return int(self._kickoffs[team_rows, views, oldest[team_rows, views]].min())
+
+    def _prune_fixtures(self):
+        """Tamponlardaki en eski maçtan önce başlayan fixture kayıtlarını at"""
+        with self._lock:
+            horizon = self._horizon()
+            if horizon != NO_KICKOFF:
+                self._fixtures = {
+                    fixture_id: kickoff for fixture_id, kickoff in self._fixtures.items()
+                    if kickoff >= horizon
+                }
+
+    def _row(self, team_id):
+        row = self._index.get(team_id)
+        if row is None:
+            row = len(self._teams)
+            if row >= len(self._head):
+                self._grow()
+            self._index[team_id] = row
+            self._teams.append(team_id)
+        return row
+
+    def _allocate(self, rows):
+        views = len(VIEWS)
+        self._buffer = np.full((rows, views, CAPACITY, len(METRICS)), np.nan, dtype=np.float32)
+        self._kickoffs = np.full((rows, views, CAPACITY), NO_KICKOFF, dtype=np.int64)
+        self._last_kickoff = np.full(rows, NO_KICKOFF, dtype=np.int64)
+        self._head = np.zeros((rows, views), dtype=np.int32)
+        self._count = np.zeros((rows, views), dtype=np.int32)
+        self._sums = np.zeros((rows, views, len(WINDOWS), len(METRICS)), dtype=np.float64)
+        self._valid = np.zeros((rows, views, len(WINDOWS), len(METRICS)), dtype=np.int32)
+
+    def _grow(self):
+        """Takım kapasitesini ikiye katla"""
+        old = {
+            name: getattr(self, name)
+            for name in ['_buffer', '_kickoffs', '_last_kickoff', '_head', '_count', '_sums', '_valid']
+        }
+        self._allocate(len(self._head) * 2)
+        for name, values in old.items():
+            getattr(self, name)[:len(values)] = values
+
+
+def kickoffs(dates):
+    """Tarih sütunundan UTC nanosaniye başlama zamanları"""
+    return pd.DatetimeIndex(pd.to_datetime(dates, utc=True)).as_unit('ns').asi8
+
+
+def features_from_sums(sums, valid, views):
+    """Pencere toplamlarından özellik satırları (FEATURE_COLUMNS sırasıyla)
+
+    sums/valid: (n, len(WINDOWS), len(METRICS)); views: satır başına görünüm.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / valid
+
+    def mean(window, metric, default):
+        return np.where(valid[:, window, metric] > 0, means[:, window, metric], default)
+
+    short, long = 0, 1
+    goals_for, goals_against, ht_for, ht_against, ht_lead, ht_draw = range(len(METRICS))
+    goals_scored_10 = mean(long, goals_for, 1.2)
+    goals_conceded_10 = mean(long, goals_against, 1.2)
+    ht_goals_scored_5 = mean(short, ht_for, 0.6)
+    return np.column_stack([
+        mean(short, goals_for, 1.2),
+        mean(short, goals_against, 1.2),
+        ht_goals_scored_5,
+        mean(short, ht_against, 0.6),
+        goals_scored_10,
+        goals_conceded_10,
+        means[:, long, ht_lead],
+        means[:, long, ht_draw],
+        np.where(views == VIEWS['away'], -0.10, 0.15),
+        goals_scored_10,
+        goals_conceded_10,
+        ht_goals_scored_5
+    ])
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_team_state():
+    """Süreç genelinde paylaşılan TeamStateEngine örneği"""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = TeamStateEngine()
+    return _state